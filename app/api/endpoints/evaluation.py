@@ -1,39 +1,314 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+import json
+from fastapi import APIRouter, Depends, HTTPException, Body, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Optional
 
-from app.models.schemas import EvaluationRequest, EvaluationResponse, ScoringCriteria
+from app.models.schemas import (
+    EvaluationRequest, EvaluationResponse, ScoringCriteria,
+    ApproximateEvaluationRequest, ApproximateEvaluationResponse,
+    ComparisonRequest, ComparisonResponse,
+    EvaluationSessionUpdateRequest, EvaluationSessionResponse
+)
 from app.services.evaluation_service import evaluation_service
+from app.services.evaluation_cache import evaluation_cache
+from app.services.evaluation_session_service import evaluation_session_service, EvaluationSession
+from app.services.significance_service import significance_service
+from app.services.timing_service import StageTimer, timing_service
 from app.core.config import settings
 
 router = APIRouter()
 
 
+def _resolve_metrics(metrics: Optional[List[str]]) -> List[str]:
+    """校验请求的评估指标，包含未注册的指标时返回400"""
+    try:
+        return evaluation_service.metric_registry.resolve(metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# 可能调用AI术语提取的同步端点用def定义，由FastAPI在线程池中执行，不阻塞事件循环
 @router.post("/evaluate", response_model=EvaluationResponse)
-async def evaluate_translation(request: EvaluationRequest):
+def evaluate_translation(request: EvaluationRequest, response: Response):
     """
     评估翻译质量，支持BLEU评分、术语准确性评估、句式转换和语篇连贯性分析。
     需要提供源文本、译文和至少一个参考文本才能进行完整评估。
     如果未提供参考文本，某些指标将无法准确计算。
+    各阶段耗时通过Server-Timing响应头返回，include_timings为true时同时写入结果的timings字段。
+    通过metrics只计算部分指标时，未选择的指标不计算，综合得分按所选指标的权重重新归一化。
+    指定time_budget_ms时，预算用完后返回已完成指标的结果，partial为true，跳过的指标列在skipped_metrics中。
     """
+    # 确保有至少一个参考文本
+    if not request.reference_texts:
+        raise HTTPException(status_code=400, detail="至少需要提供一个参考文本进行评估")
+    metrics = _resolve_metrics(request.metrics)
     try:
-        # 确保有至少一个参考文本
-        if not request.reference_texts:
-            raise HTTPException(status_code=400, detail="至少需要提供一个参考文本进行评估")
-        
         # 调用评估服务评估翻译质量
+        timer = StageTimer()
         evaluation_result = evaluation_service.evaluate_translation(
             source_text=request.source_text,
             translated_text=request.translated_text,
             reference_texts=request.reference_texts,
             source_language=request.source_language,
             target_language=request.target_language,
-            domain=request.domain
+            domain=request.domain,
+            include_timings=request.include_timings,
+            timer=timer,
+            metrics=metrics,
+            time_budget_ms=request.time_budget_ms
         )
+        response.headers["Server-Timing"] = timer.server_timing()
         return evaluation_result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"评估翻译时出错: {str(e)}")
 
 
+@router.post("/evaluate/stream")
+async def evaluate_translation_stream(request: EvaluationRequest):
+    """
+    流式评估翻译质量，以NDJSON（每行一个JSON对象）逐项返回结果：
+    先返回start事件，各项指标并发计算、每完成一项返回一个metric事件，
+    最后返回包含综合得分和改进建议的result事件。出错时返回error事件。
+    指定time_budget_ms时，预算用完后不再等待其余指标，result中partial为true，跳过的指标列在skipped_metrics中。
+    """
+    if not request.reference_texts:
+        raise HTTPException(status_code=400, detail="至少需要提供一个参考文本进行评估")
+    metrics = _resolve_metrics(request.metrics)
+    
+    async def generate():
+        try:
+            async for event in evaluation_service.stream_evaluation(
+                source_text=request.source_text,
+                translated_text=request.translated_text,
+                reference_texts=request.reference_texts,
+                source_language=request.source_language,
+                target_language=request.target_language,
+                domain=request.domain,
+                metrics=metrics,
+                include_timings=request.include_timings,
+                time_budget_ms=request.time_budget_ms
+            ):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "detail": f"评估翻译时出错: {str(e)}"}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.post("/evaluate/approximate", response_model=ApproximateEvaluationResponse)
+async def evaluate_translation_approximate(request: ApproximateEvaluationRequest):
+    """
+    近似评估长文档：对分层抽样的句子估计BLEU和术语准确性，返回点估计及置信区间。
+    样本量逐轮增大，直到置信区间达到target_precision、抽完全部句子或时间预算不足。
+    """
+    if not request.reference_texts:
+        raise HTTPException(status_code=400, detail="至少需要提供一个参考文本进行评估")
+    try:
+        return evaluation_service.evaluate_approximate(
+            source_text=request.source_text,
+            translated_text=request.translated_text,
+            reference_texts=request.reference_texts,
+            source_language=request.source_language,
+            target_language=request.target_language,
+            domain=request.domain,
+            target_precision=request.target_precision,
+            confidence=request.confidence,
+            time_budget_ms=request.time_budget_ms,
+            seed=request.seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"近似评估时出错: {str(e)}")
+
+
+@router.post("/compare", response_model=ComparisonResponse)
+async def compare_systems(request: ComparisonRequest):
+    """
+    用配对bootstrap重抽样比较多个系统在同一测试集上的BLEU和术语准确性，第一个系统为基线。
+    每个系统提供逐句段的充分统计量（segments），或逐句段译文（hypotheses，需同时提供references）。
+    返回各系统得分的置信区间，以及其他系统相对基线的差值、置信区间和p值。
+    """
+    try:
+        statistics = significance_service.collect_statistics(
+            [system.model_dump() for system in request.systems],
+            references=request.references,
+            sources=request.sources,
+            source_language=request.source_language,
+            target_language=request.target_language,
+            domain=request.domain
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        result = significance_service.compare(
+            [system.name for system in request.systems], statistics,
+            n_resamples=request.n_resamples, confidence=request.confidence, seed=request.seed
+        )
+        return ComparisonResponse(
+            systems=[
+                {"name": system["name"], "bleu_score": system["bleu"], "terminology_score": system.get("terminology")}
+                for system in result["systems"]
+            ],
+            comparisons=result["comparisons"],
+            segment_count=result["segment_count"],
+            n_resamples=result["n_resamples"],
+            confidence=result["confidence"]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"比较系统时出错: {str(e)}")
+
+
+def _session_response(session: EvaluationSession) -> EvaluationSessionResponse:
+    return EvaluationSessionResponse(
+        session_id=session.session_id,
+        sentence_count=len(session.records),
+        changed_sentences=session.last_changed,
+        sentences=session.sentences,
+        evaluation=session.response
+    )
+
+
+@router.post("/sessions", response_model=EvaluationSessionResponse)
+def create_evaluation_session(request: EvaluationRequest):
+    """
+    创建译后编辑评估会话并评估初始译文。
+    会话保存逐句的统计结果，之后提交修改只重新分析发生变化的句子。
+    会话只计算metrics中选择的指标，之后提交的修改沿用创建时的选择。
+    会话评估不支持time_budget_ms和include_timings，设置时返回400。
+    """
+    try:
+        if not request.reference_texts:
+            raise HTTPException(status_code=400, detail="至少需要提供一个参考文本进行评估")
+        # 会话的结果在之后的增量评估中复用，不能只包含部分指标
+        if request.time_budget_ms is not None or request.include_timings:
+            raise HTTPException(status_code=400, detail="评估会话不支持time_budget_ms和include_timings")
+        metrics = _resolve_metrics(request.metrics)
+        
+        session = evaluation_session_service.create_session(
+            source_text=request.source_text,
+            translated_text=request.translated_text,
+            reference_texts=request.reference_texts,
+            source_language=request.source_language,
+            target_language=request.target_language,
+            domain=request.domain,
+            metrics=metrics
+        )
+        return _session_response(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"创建评估会话时出错: {str(e)}")
+
+
+@router.patch("/sessions/{session_id}", response_model=EvaluationSessionResponse)
+def update_evaluation_session(session_id: str, request: EvaluationSessionUpdateRequest):
+    """
+    提交修改后的译文（完整译文或按句修改列表）并重新评估
+    """
+    if (request.translated_text is None) == (request.edits is None):
+        raise HTTPException(status_code=400, detail="translated_text和edits需要且只能提供一个")
+    try:
+        session = evaluation_session_service.update_session(
+            session_id,
+            translated_text=request.translated_text,
+            edits=[edit.model_dump() for edit in request.edits] if request.edits is not None else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"更新评估会话时出错: {str(e)}")
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"评估会话 {session_id} 不存在或已过期")
+    return _session_response(session)
+
+
+@router.get("/sessions/{session_id}", response_model=EvaluationSessionResponse)
+async def get_evaluation_session(session_id: str):
+    """
+    获取评估会话的当前译文分句和评估结果
+    """
+    session = evaluation_session_service.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"评估会话 {session_id} 不存在或已过期")
+    return _session_response(session)
+
+
+@router.delete("/sessions/{session_id}")
+async def delete_evaluation_session(session_id: str):
+    """
+    删除评估会话
+    """
+    if not evaluation_session_service.delete_session(session_id):
+        raise HTTPException(status_code=404, detail=f"评估会话 {session_id} 不存在或已过期")
+    return {"status": "success", "message": f"评估会话 {session_id} 已删除"}
+
+
+@router.get("/cache")
+async def get_evaluation_cache_stats():
+    """
+    获取评估结果缓存的统计信息，包括条目数、占用字节数和命中率
+    """
+    return evaluation_cache.get_stats()
+
+
+@router.delete("/cache")
+async def clear_evaluation_cache():
+    """
+    清空评估结果缓存
+    """
+    evaluation_cache.clear()
+    return {"status": "success", "message": "评估结果缓存已清空"}
+
+
+@router.get("/metrics")
+async def get_evaluation_metrics():
+    """
+    获取已注册的评估指标及其在综合得分中的权重
+    """
+    registry = evaluation_service.metric_registry
+    return [
+        {"name": name, "label": registry.get(name).label, "weight": registry.get(name).weight}
+        for name in registry.names()
+    ]
+
+
+@router.get("/timings")
+async def get_evaluation_timings():
+    """
+    获取评估各阶段的延迟统计（请求数、平均值、最大值、分位数和直方图）
+    """
+    return timing_service.get_stats()
+
+
+@router.delete("/timings")
+async def reset_evaluation_timings():
+    """
+    清空评估各阶段的延迟统计
+    """
+    timing_service.reset()
+    return {"status": "success", "message": "评估耗时统计已清空"}
+
+
+@router.get("/terminology-tiers")
+async def get_terminology_tier_stats():
+    """
+    获取级联术语评估（TERMINOLOGY_EVALUATION_MODE=cascade）各层的使用次数：
+    database为术语库，reference为合并参考文本术语，ai_extraction为调用AI提取，
+    ai_fallback为需要AI提取但AI不可用或提取失败、退回前两层的次数
+    """
+    return evaluation_service.get_terminology_tier_stats()
+
+
+@router.delete("/terminology-tiers")
+async def reset_terminology_tier_stats():
+    """
+    清空级联术语评估各层的使用次数
+    """
+    evaluation_service.reset_terminology_tier_stats()
+    return {"status": "success", "message": "级联术语评估统计已清空"}
+
+
 @router.get("/scoring-criteria", response_model=Dict[str, ScoringCriteria])
 async def get_scoring_criteria():
     """
@@ -104,7 +379,7 @@ async def get_scoring_criteria():
 
 
 @router.post("/extract-terms")
-async def extract_terms(
+def extract_terms(
     source_text: str = Body(..., description="源文本"),
     translated_text: str = Body(..., description="译文"),
     source_language: str = Body("zh", description="源语言代码"),
@@ -123,24 +398,21 @@ async def extract_terms(
         
         extracted_terms = {}
         
+        context = evaluation_service.build_context(
+            source_text=source_text,
+            translated_text=translated_text,
+            reference_texts=[reference_text] if reference_text else [],
+            source_language=source_language,
+            target_language=target_language,
+            domain=domain
+        )
+        
         if mode == "ai_extraction":
             # 使用AI提取术语
-            _, _, extracted_terms = evaluation_service._evaluate_terminology_with_ai(
-                source_text=source_text,
-                translated_text=translated_text,
-                domain=domain,
-                source_language=source_language,
-                target_language=target_language
-            )
+            _, _, extracted_terms = evaluation_service._evaluate_terminology_with_ai(context)
         elif mode == "reference":
             # 从参考文本提取术语
-            _, _, extracted_terms = evaluation_service._evaluate_terminology_from_reference(
-                source_text=source_text,
-                translated_text=translated_text,
-                reference_text=reference_text,
-                source_language=source_language,
-                target_language=target_language
-            )
+            _, _, extracted_terms = evaluation_service._evaluate_terminology_from_reference(context)
         
         return {"extracted_terms": extracted_terms or {}}
     except Exception as e:
@@ -1,8 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 import time
 
-from app.models.schemas import SystemHealth
+from app.models.schemas import ReadinessStatus, SystemHealth
 from app.core.config import settings
+from app.services.warmup_service import warmup_service
 
 router = APIRouter()
 
@@ -21,4 +22,18 @@ async def health_check():
         status="healthy",
         version=settings.API_VERSION,
         uptime=time.time() - start_time
-    ) 
\ No newline at end of file
+    )
+
+
+@router.get("/ready", response_model=ReadinessStatus, summary="就绪检查")
+async def readiness_check(response: Response):
+    """
+    就绪检查API端点
+    
+    启动预热完成前返回503，完成后返回200，并列出各组件的预热状态和耗时。
+    负载均衡器应以此端点而不是/health判断是否向本实例转发流量。
+    """
+    status = warmup_service.get_status()
+    if not status["ready"]:
+        response.status_code = 503
+    return ReadinessStatus(**status) 
\ No newline at end of file
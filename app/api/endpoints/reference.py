@@ -5,6 +5,7 @@ import os
 import shutil
 
 from app.services.reference_service import reference_service
+from app.services.term_alignment_service import term_alignment_service
 
 router = APIRouter()
 
@@ -55,4 +56,20 @@ async def delete_reference_file(file_id: str):
     if success:
         return {"status": "success", "message": f"文件 {file_id} 已删除"}
     else:
-        raise HTTPException(status_code=404, detail=f"文件 {file_id} 不存在或删除失败") 
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=f"文件 {file_id} 不存在或删除失败") 
+
+@router.get("/term-alignments")
+async def get_term_alignments(source_lang: str = "zh", target_lang: str = "en", limit: int = 100):
+    """获取从参考文本库句对共现统计得到的术语对齐结果"""
+    return {
+        "alignments": term_alignment_service.get_alignments(source_lang, target_lang, limit),
+        "stats": term_alignment_service.get_stats()
+    }
+
+@router.post("/term-alignments/rebuild")
+async def rebuild_term_alignments():
+    """重新扫描参考文本目录，重建术语对齐索引"""
+    try:
+        return term_alignment_service.rebuild()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重建术语对齐索引失败: {str(e)}")
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, Body, UploadFile, File, F
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel
 
-from app.services.llm_service import LLMService
+from app.services.term_extraction_service import term_extraction_service
 from app.services.terminology_service import terminology_service
 from app.models.schemas import TranslationRequest
 import logging
@@ -21,6 +21,10 @@ class TerminologyExtractionRequest(BaseModel):
 class TerminologyExtractionResponse(BaseModel):
     terms: Dict[str, str]
     message: str
+    frequencies: Dict[str, int] = {}  # 各源术语出现的文本块数
+    conflicts: Dict[str, Dict[str, int]] = {}  # 有多种译法的源术语及各译法出现的文本块数
+    chunks: int = 1
+    failed_chunks: int = 0
 
 class BatchTerminologyEntry(BaseModel):
     source_term: str
@@ -37,71 +41,32 @@ class BatchTerminologyResponse(BaseModel):
     message: str
 
 @router.post("/extract", response_model=TerminologyExtractionResponse)
-async def extract_terminology(
-    request: TerminologyExtractionRequest,
-    llm_service: LLMService = Depends(LLMService)
-):
+async def extract_terminology(request: TerminologyExtractionRequest):
     """
     从源文本和翻译文本中提取术语对照表
+    
+    长文本按句对齐切分为多个块并发提取，失败的块单独重试，各块结果合并后返回
     """
     try:
         logger.info(f"开始从文本中提取术语，领域: {request.domain}, 语言对: {request.source_language}-{request.target_language}")
         
-        # 构建提示词
-        prompt = f"""
-        请从以下材料科学领域的文本中提取专业术语，并给出对应的翻译。
-        
-        源语言({request.source_language})文本:
-        {request.source_text}
-        
-        目标语言({request.target_language})文本:
-        {request.translated_text}
-        
-        领域: {request.domain}
-        
-        请以JSON格式返回提取的术语对照表，格式为:
-        {{
-            "源语言术语1": "目标语言术语1",
-            "源语言术语2": "目标语言术语2",
-            ...
-        }}
-        
-        只返回JSON格式的结果，不要有其他文字说明。
-        """
-        
-        # 调用LLM服务提取术语
-        completion_result = llm_service.get_ai_completion(prompt)
-        
-        if not completion_result or not completion_result.get("content"):
-            logger.warning("LLM服务返回空结果")
-            return TerminologyExtractionResponse(
-                terms={},
-                message="无法从文本中提取术语"
-            )
-        
-        # 尝试解析JSON结果
-        import re
-        
-        content = completion_result.get("content", "")
-        
-        # 尝试从内容中提取JSON部分
-        json_match = re.search(r'({[\s\S]*})', content)
-        if json_match:
-            content = json_match.group(1)
+        extraction = await term_extraction_service.extract(
+            request.source_text,
+            request.translated_text,
+            request.source_language,
+            request.target_language,
+            request.domain
+        )
+        terms = extraction["terms"]
         
-        try:
-            terms = json.loads(content)
-            if not isinstance(terms, dict):
-                logger.warning(f"解析的术语不是字典格式: {type(terms)}")
-                terms = {}
-        except json.JSONDecodeError as e:
-            logger.error(f"解析术语JSON失败: {e}, 内容: {content}")
-            terms = {}
+        if extraction["failed_chunks"] == extraction["chunks"]:
+            message = "无法从文本中提取术语"
+        elif extraction["failed_chunks"]:
+            message = f"从文本中提取了 {len(terms)} 个术语，{extraction['failed_chunks']}/{extraction['chunks']} 个文本块提取失败"
+        else:
+            message = f"成功从文本中提取了 {len(terms)} 个术语"
         
-        return TerminologyExtractionResponse(
-            terms=terms,
-            message=f"成功从文本中提取了 {len(terms)} 个术语"
-        )
+        return TerminologyExtractionResponse(message=message, **extraction)
         
     except Exception as e:
         logger.error(f"提取术语时发生错误: {str(e)}")
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+import json
 import logging
 
-from app.models.schemas import TranslationRequest, TranslationResponse
+from app.models.schemas import (
+    TranslationRequest, TranslationResponse, ModelComparisonRequest, ModelComparisonResponse,
+    TranslateAndEvaluateRequest, TranslateAndEvaluateResponse, StreamTranslateAndEvaluateRequest
+)
 from app.services.llm_service import llm_service
 from app.services.data_service import data_service
+from app.services.model_comparison_service import model_comparison_service
+from app.services.translation_pipeline_service import translation_pipeline_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -61,4 +68,107 @@ async def translate_text(request: TranslationRequest):
         )
     except Exception as e:
         logger.error(f"翻译服务出错: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"翻译服务出错: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"翻译服务出错: {str(e)}")
+
+
+@router.post("/compare", response_model=ModelComparisonResponse, summary="多模型翻译比较")
+async def compare_models(request: ModelComparisonRequest):
+    """
+    多模型翻译比较API端点
+    
+    使用多个模型并发翻译同一源文本，源文本和参考译文只分析一次，所有译文基于同一份分析评估。
+    
+    - **source_text**: 源文本内容
+    - **models**: 参与比较的模型ID列表
+    - **reference_texts**: 参考译文列表
+    - **source_language**: 源语言代码
+    - **target_language**: 目标语言代码
+    - **domain**: 领域类型，默认为materials_science
+    - **metrics**: 可选，需要计算的评估指标
+    
+    返回按综合得分排序的比较表，包含各模型的译文、评估结果、翻译耗时和令牌用量。
+    """
+    try:
+        logger.info(f"收到多模型比较请求: models={request.models}")
+        return await model_comparison_service.compare(
+            request.source_text,
+            request.models,
+            request.reference_texts,
+            request.source_language,
+            request.target_language,
+            request.domain,
+            request.metrics
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"多模型比较出错: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"多模型比较出错: {str(e)}")
+
+
+@router.post("/translate-and-evaluate", response_model=TranslateAndEvaluateResponse, summary="翻译并评估")
+async def translate_and_evaluate(request: TranslateAndEvaluateRequest, response: Response):
+    """
+    翻译并评估API端点
+    
+    翻译请求进行的同时完成源文本术语查找和参考译文分析，译文返回后立即评分，
+    总耗时接近翻译和准备工作中较慢的一项加上评分耗时，而不是先后调用翻译和评估两个接口的耗时之和。
+    
+    - **source_text**: 源文本内容
+    - **source_language**: 源语言代码
+    - **target_language**: 目标语言代码
+    - **domain**: 领域类型，默认为materials_science
+    - **model**: 可选的模型ID
+    - **reference_texts**: 参考译文列表
+    - **metrics**: 可选，需要计算的评估指标
+    
+    返回翻译结果、评估结果和各阶段耗时，各阶段耗时同时通过Server-Timing响应头返回。
+    """
+    try:
+        logger.info(f"收到翻译并评估请求: source_lang={request.source_language}, target_lang={request.target_language}, model={request.model}")
+        result, timer = await translation_pipeline_service.translate_and_evaluate(
+            request.source_text,
+            request.reference_texts,
+            request.source_language,
+            request.target_language,
+            request.domain,
+            request.model,
+            request.metrics
+        )
+        response.headers["Server-Timing"] = timer.server_timing()
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"翻译并评估出错: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"翻译并评估出错: {str(e)}")
+
+
+@router.post("/translate-and-evaluate/stream", summary="流式翻译并逐句评估")
+async def stream_translate_and_evaluate(request: StreamTranslateAndEvaluateRequest):
+    """
+    流式翻译并逐句评估API端点，以NDJSON（每行一个JSON对象）返回事件
+    
+    模型输出逐段转发为delta事件；每确认一个句子返回一个sentence事件（句子区间、句子级BLEU和出现的目标术语），
+    每批句子评分后返回一个scores事件（已完成部分的滚动得分）；输出结束后返回result事件，
+    包含完整译文、整篇评估结果和评估会话ID，之后可通过/evaluation/sessions/{session_id}继续修改译文。
+    出错时返回error事件。
+    """
+    logger.info(f"收到流式翻译并评估请求: source_lang={request.source_language}, target_lang={request.target_language}, model={request.model}")
+    
+    async def generate():
+        try:
+            async for event in translation_pipeline_service.stream_translate_and_evaluate(
+                request.source_text,
+                request.reference_texts,
+                request.source_language,
+                request.target_language,
+                request.domain,
+                request.model
+            ):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"流式翻译并评估出错: {str(e)}", exc_info=True)
+            yield json.dumps({"event": "error", "detail": f"流式翻译并评估出错: {str(e)}"}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,120 @@
+"""
+离线准备NLP资源并检查启动耗时
+
+用法:
+    python -m app.bootstrap              下载NLTK数据到NLTK_DATA_DIR，生成jieba前缀词典缓存JIEBA_CACHE_FILE
+    python -m app.bootstrap --offline    不联网，只检查NLTK数据并生成jieba缓存
+    python -m app.bootstrap --check      用python -X importtime测量导入app.main的耗时，超过STARTUP_IMPORT_BUDGET_MS时返回非零退出码
+"""
+import argparse
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+from app.core.config import settings
+from app.utils.nlp_resources import build_jieba_cache, vendor_nltk_data
+
+logger = logging.getLogger(__name__)
+
+# -X importtime输出的一行：import time: 自身耗时 | 累计耗时 | 模块名（单位：微秒）
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def prepare_resources(download: bool = True, force: bool = False) -> bool:
+    """
+    准备离线NLP资源
+
+    Args:
+        download: 是否下载缺少的NLTK数据包
+        force: 是否重新生成jieba缓存
+
+    Returns:
+        全部资源是否可用
+    """
+    nltk_status = vendor_nltk_data(download)
+    for package, available in nltk_status.items():
+        logger.info(f"NLTK数据包{package}: {'可用' if available else '不可用'}")
+
+    started = time.perf_counter()
+    cache_file = build_jieba_cache(force)
+    logger.info(f"jieba前缀词典缓存: {cache_file}（{(time.perf_counter() - started) * 1000:.0f}ms）")
+    return all(nltk_status.values()) and os.path.isfile(cache_file)
+
+
+def measure_import_time(module: str = "app.main", runs: int = 3) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    在子进程中用python -X importtime测量导入模块的耗时，多次测量取最快的一次以减少机器负载的影响
+
+    Args:
+        module: 模块名
+        runs: 测量次数
+
+    Returns:
+        导入该模块的累计耗时（毫秒），以及其中累计耗时最长的直接依赖 [(模块名, 毫秒), ...]
+    """
+    best = None
+    for _ in range(max(1, runs)):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"导入{module}失败: {result.stderr.strip().splitlines()[-1] if result.stderr else ''}")
+
+        # 子模块的行先于导入它的模块输出，顶层模块之前连续的第二层即其直接依赖
+        total_ms = 0.0
+        children: List[Tuple[str, float]] = []
+        module_children: List[Tuple[str, float]] = []
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_PATTERN.match(line)
+            if not match:
+                continue
+            cumulative_ms = int(match.group(2)) / 1000
+            depth = (len(match.group(3)) - 1) // 2
+            name = match.group(4)
+            if depth == 0:
+                if name == module:
+                    total_ms, module_children = cumulative_ms, children
+                children = []
+            elif depth == 1:
+                children.append((name, cumulative_ms))
+        if best is None or total_ms < best[0]:
+            best = (total_ms, module_children)
+
+    total_ms, module_children = best
+    return total_ms, sorted(module_children, key=lambda item: item[1], reverse=True)[:10]
+
+
+def check_import_budget(budget_ms: int, runs: int = 3) -> bool:
+    """测量导入app.main的耗时并与预算比较"""
+    total_ms, slowest = measure_import_time(runs=runs)
+    for name, elapsed_ms in slowest:
+        logger.info(f"  {name}: {elapsed_ms:.0f}ms")
+    within_budget = total_ms <= budget_ms
+    log = logger.info if within_budget else logger.error
+    log(f"导入app.main耗时{total_ms:.0f}ms，预算{budget_ms}ms，{'符合' if within_budget else '超出'}预算")
+    return within_budget
+
+
+def main(argv: List[str] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="离线准备NLP资源并检查启动耗时")
+    parser.add_argument("--offline", action="store_true", help="不下载NLTK数据，只检查是否已存在")
+    parser.add_argument("--force", action="store_true", help="重新生成jieba前缀词典缓存")
+    parser.add_argument("--check", action="store_true", help="只检查导入app.main的耗时是否在预算内")
+    parser.add_argument("--budget-ms", type=int, default=settings.STARTUP_IMPORT_BUDGET_MS, help="导入耗时预算（毫秒）")
+    parser.add_argument("--runs", type=int, default=3, help="测量次数，取最快的一次")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.check:
+        return 0 if check_import_budget(args.budget_ms, args.runs) else 1
+    return 0 if prepare_resources(download=not args.offline, force=args.force) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
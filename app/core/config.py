@@ -20,6 +20,12 @@ class Settings(BaseSettings):
     TRANSLATION_EXAMPLES_DIR: str = os.path.join(DATA_DIR, "examples")
     REFERENCE_TEXTS_DIR: str = os.path.join(DATA_DIR, "references")
     
+    # 离线NLP资源（由python -m app.bootstrap生成）：NLTK数据目录和jieba前缀词典缓存文件
+    NLTK_DATA_DIR: str = os.getenv("NLTK_DATA_DIR", os.path.join(DATA_DIR, "nltk_data"))
+    JIEBA_CACHE_FILE: str = os.getenv("JIEBA_CACHE_FILE", os.path.join(DATA_DIR, "jieba.cache"))
+    # 导入app.main的时间预算（毫秒），python -m app.bootstrap --check按此检查
+    STARTUP_IMPORT_BUDGET_MS: int = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+    
     # 数据库设置
     DATABASE_PATH: str = os.path.join(DATA_DIR, "terminology.db")
     
@@ -40,8 +46,55 @@ class Settings(BaseSettings):
     SENTENCE_STRUCTURE_WEIGHT: float = float(os.getenv("SENTENCE_STRUCTURE_WEIGHT", "0.2"))
     DISCOURSE_WEIGHT: float = float(os.getenv("DISCOURSE_WEIGHT", "0.2"))
     
-    # 术语评估模式: "database" 使用术语库, "reference" 使用参考文本中的术语, "ai_extraction" 使用AI提取
+    # 术语评估模式: "database" 使用术语库, "reference" 使用参考文本中的术语, "ai_extraction" 使用AI提取,
+    # "cascade" 依次尝试术语库、参考文本，覆盖率或置信度不足时才调用AI提取
     TERMINOLOGY_EVALUATION_MODE: str = os.getenv("TERMINOLOGY_EVALUATION_MODE", "database")
+
+    # 级联术语评估设置（源文本候选术语的最低覆盖率、参考文本术语的最低置信度、位置启发式提取的术语对照的置信度）
+    TERMINOLOGY_CASCADE_MIN_COVERAGE: float = float(os.getenv("TERMINOLOGY_CASCADE_MIN_COVERAGE", "0.4"))
+    TERMINOLOGY_CASCADE_MIN_CONFIDENCE: float = float(os.getenv("TERMINOLOGY_CASCADE_MIN_CONFIDENCE", "0.6"))
+    TERMINOLOGY_CASCADE_HEURISTIC_CONFIDENCE: float = float(os.getenv("TERMINOLOGY_CASCADE_HEURISTIC_CONFIDENCE", "0.5"))
+
+    # 参考文本库术语对齐索引设置: 打分方式 "dice" 或 "llr"（对数似然比）
+    TERM_ALIGNMENT_ENABLED: bool = os.getenv("TERM_ALIGNMENT_ENABLED", "True").lower() == "true"
+    TERM_ALIGNMENT_SCORE: str = os.getenv("TERM_ALIGNMENT_SCORE", "dice")
+    TERM_ALIGNMENT_MIN_COOCCURRENCE: int = int(os.getenv("TERM_ALIGNMENT_MIN_COOCCURRENCE", "2"))
+    TERM_ALIGNMENT_MIN_DICE: float = float(os.getenv("TERM_ALIGNMENT_MIN_DICE", "0.3"))
+    TERM_ALIGNMENT_MIN_LLR: float = float(os.getenv("TERM_ALIGNMENT_MIN_LLR", "3.84"))
+    # 后台与参考文本目录同步的最短间隔（秒），为0时只在上传、删除和重建时更新索引
+    TERM_ALIGNMENT_SYNC_INTERVAL: int = int(os.getenv("TERM_ALIGNMENT_SYNC_INTERVAL", "60"))
+
+    # AI术语提取设置（每块源文本与译文的令牌预算、并发请求数、每块失败后的重试次数）
+    TERM_EXTRACTION_CHUNK_TOKENS: int = int(os.getenv("TERM_EXTRACTION_CHUNK_TOKENS", "1500"))
+    TERM_EXTRACTION_CONCURRENCY: int = int(os.getenv("TERM_EXTRACTION_CONCURRENCY", "4"))
+    TERM_EXTRACTION_RETRIES: int = int(os.getenv("TERM_EXTRACTION_RETRIES", "2"))
+    # 短文本块的AI术语提取合批设置（收集请求的窗口毫秒数，为0时不合批；每次请求最多合并的条目数）
+    TERM_EXTRACTION_BATCH_WINDOW_MS: int = int(os.getenv("TERM_EXTRACTION_BATCH_WINDOW_MS", "20"))
+    TERM_EXTRACTION_BATCH_MAX_ITEMS: int = int(os.getenv("TERM_EXTRACTION_BATCH_MAX_ITEMS", "8"))
+
+    # 评估结果缓存设置（按条目数和占用字节数双重限制，超出时按LRU淘汰）
+    EVALUATION_CACHE_ENABLED: bool = os.getenv("EVALUATION_CACHE_ENABLED", "True").lower() == "true"
+    EVALUATION_CACHE_MAX_ENTRIES: int = int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "512"))
+    EVALUATION_CACHE_MAX_BYTES: int = int(os.getenv("EVALUATION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # 译后编辑评估会话设置（会话数上限、闲置过期秒数）
+    EVALUATION_SESSION_MAX: int = int(os.getenv("EVALUATION_SESSION_MAX", "100"))
+    EVALUATION_SESSION_TTL: int = int(os.getenv("EVALUATION_SESSION_TTL", "3600"))
+
+    # 近似评估设置（初始抽样句数、分层数、bootstrap重抽样次数、置信区间半宽的默认目标值）
+    APPROXIMATE_INITIAL_SAMPLE: int = int(os.getenv("APPROXIMATE_INITIAL_SAMPLE", "64"))
+    APPROXIMATE_STRATA: int = int(os.getenv("APPROXIMATE_STRATA", "10"))
+    APPROXIMATE_BOOTSTRAP_SAMPLES: int = int(os.getenv("APPROXIMATE_BOOTSTRAP_SAMPLES", "200"))
+    APPROXIMATE_TARGET_PRECISION: float = float(os.getenv("APPROXIMATE_TARGET_PRECISION", "0.02"))
+    
+    # 长中文文档并行分词设置（进程数，为0时取CPU核数且不超过4；每个分片的字符数；达到该字符数的文本才并行分词）
+    SEGMENTATION_WORKERS: int = int(os.getenv("SEGMENTATION_WORKERS", "0"))
+    SEGMENTATION_SHARD_CHARS: int = int(os.getenv("SEGMENTATION_SHARD_CHARS", "20000"))
+    SEGMENTATION_PARALLEL_MIN_CHARS: int = int(os.getenv("SEGMENTATION_PARALLEL_MIN_CHARS", "100000"))
+    
+    # 启动预热设置（是否在启动后加载NLP资源、术语自动机并执行一次模拟评估，/api/ready在预热完成前返回503）
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "True").lower() == "true"
+    WARMUP_DOMAIN: str = os.getenv("WARMUP_DOMAIN", "materials_science")
     
     # 是否在前端加载默认的API配置
     LOAD_DEFAULT_API_CONFIG: bool = os.getenv("LOAD_DEFAULT_API_CONFIG", "True").lower() == "true"
@@ -1,6 +1,7 @@
 import os
 import sqlite3
 import logging
+import threading
 from typing import Dict, List, Tuple, Any, Optional
 
 from app.core.config import settings
@@ -14,7 +15,17 @@ class Database:
         # 确保数据库目录存在
         os.makedirs(os.path.dirname(settings.DATABASE_PATH), exist_ok=True)
         self.db_path = settings.DATABASE_PATH
-        self.connection = None
+        # SQLite连接只能在创建它的线程中使用，每个线程使用各自的连接
+        self._local = threading.local()
+    
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """当前线程的数据库连接"""
+        return getattr(self._local, "connection", None)
+    
+    @connection.setter
+    def connection(self, connection: Optional[sqlite3.Connection]) -> None:
+        self._local.connection = connection
         
     def connect(self):
         """建立数据库连接"""
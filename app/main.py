@@ -47,6 +47,10 @@ async def startup_event():
         logger.info("数据库初始化成功")
     else:
         logger.error("数据库初始化失败")
+    
+    # 在后台预热NLP资源、术语自动机和评估流程，完成前/api/ready返回503
+    from app.services.warmup_service import warmup_service
+    warmup_service.start()
 
 
 @app.on_event("shutdown")
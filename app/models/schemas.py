@@ -22,6 +22,28 @@ class TranslationResponse(BaseModel):
     model: Optional[str] = Field(None, description="使用的翻译模型")
 
 
+class TranslateAndEvaluateRequest(TranslationRequest):
+    """翻译并评估请求模型"""
+    reference_texts: List[str] = Field(..., min_length=1, description="参考译文列表，至少提供一个")
+    metrics: Optional[List[str]] = Field(None, description="需要计算的评估指标，默认计算全部指标")
+
+
+class StreamTranslateAndEvaluateRequest(TranslationRequest):
+    """流式翻译并逐句评估请求模型"""
+    reference_texts: List[str] = Field(..., min_length=1, description="参考译文列表，至少提供一个")
+
+
+class ModelComparisonRequest(BaseModel):
+    """多模型翻译比较请求模型"""
+    source_text: str = Field(..., description="源文本")
+    models: List[str] = Field(..., min_length=1, max_length=10, description="参与比较的模型ID，各模型并发翻译")
+    reference_texts: List[str] = Field(..., min_length=1, description="参考译文列表，至少提供一个")
+    source_language: str = Field("zh", description="源语言代码")
+    target_language: str = Field("en", description="目标语言代码")
+    domain: str = Field("materials_science", description="领域")
+    metrics: Optional[List[str]] = Field(None, description="需要计算的评估指标，默认计算全部指标")
+
+
 class EvaluationRequest(BaseModel):
     """评估请求模型"""
     source_text: str = Field(..., description="源文本内容")
@@ -30,6 +52,9 @@ class EvaluationRequest(BaseModel):
     source_language: str = Field(..., description="源语言代码")
     target_language: str = Field(..., description="目标语言代码")
     domain: str = Field(default="materials_science", description="领域类型，默认为材料科学")
+    include_timings: bool = Field(default=False, description="是否在结果中返回各阶段耗时")
+    metrics: Optional[List[str]] = Field(default=None, description="需要计算的评估指标，默认计算全部指标，可选指标见/evaluation/metrics")
+    time_budget_ms: Optional[int] = Field(default=None, gt=0, description="时间预算（毫秒），用完时返回已完成指标的结果，默认不限时")
 
 
 class EvaluationScore(BaseModel):
@@ -41,14 +66,166 @@ class EvaluationScore(BaseModel):
 
 class EvaluationResponse(BaseModel):
     """评估响应模型"""
-    overall_score: EvaluationScore = Field(..., description="综合得分")
-    bleu_score: EvaluationScore = Field(..., description="BLEU分数")
-    terminology_score: EvaluationScore = Field(..., description="术语准确性得分")
-    sentence_structure_score: EvaluationScore = Field(..., description="句式转换得分")
-    discourse_score: EvaluationScore = Field(..., description="语篇连贯性得分")
-    detailed_feedback: Dict[str, str] = Field(..., description="详细反馈")
+    overall_score: EvaluationScore = Field(..., description="综合得分（所选指标的加权平均值）")
+    bleu_score: Optional[EvaluationScore] = Field(None, description="BLEU分数，未选择该指标时为空")
+    terminology_score: Optional[EvaluationScore] = Field(None, description="术语准确性得分，未选择该指标时为空")
+    sentence_structure_score: Optional[EvaluationScore] = Field(None, description="句式转换得分，未选择该指标时为空")
+    discourse_score: Optional[EvaluationScore] = Field(None, description="语篇连贯性得分，未选择该指标时为空")
+    additional_scores: Optional[Dict[str, EvaluationScore]] = Field(None, description="其他已注册指标的得分")
+    detailed_feedback: Dict[str, str] = Field(..., description="各项所选指标的详细反馈")
     suggestions: List[str] = Field(..., description="改进建议")
     extracted_terms: Optional[Dict[str, str]] = Field(None, description="从文本中提取的术语对照表")
+    timings: Optional[Dict[str, float]] = Field(None, description="各阶段耗时（毫秒），仅在请求include_timings时返回")
+    partial: bool = Field(False, description="是否因时间预算用完而跳过了部分指标")
+    skipped_metrics: Optional[List[str]] = Field(None, description="因时间预算用完而跳过的指标")
+
+
+class SegmentEdit(BaseModel):
+    """单句修改"""
+    index: int = Field(..., description="句子序号（对应当前译文的分句结果，从0开始）")
+    text: str = Field(..., description="修改后的句子文本，空字符串表示删除该句")
+
+
+class EvaluationSessionUpdateRequest(BaseModel):
+    """评估会话修改请求模型，translated_text与edits二选一"""
+    translated_text: Optional[str] = Field(None, description="修改后的完整译文")
+    edits: Optional[List[SegmentEdit]] = Field(None, description="按句修改列表")
+
+
+class EvaluationSessionResponse(BaseModel):
+    """评估会话响应模型"""
+    session_id: str = Field(..., description="会话ID")
+    sentence_count: int = Field(..., description="当前译文的句子数")
+    changed_sentences: int = Field(..., description="本次重新分析的句子数")
+    sentences: List[str] = Field(..., description="当前译文的分句结果")
+    evaluation: EvaluationResponse = Field(..., description="整篇评估结果")
+
+
+class ApproximateEvaluationRequest(BaseModel):
+    """近似评估请求模型"""
+    source_text: str = Field(..., description="源文本内容")
+    translated_text: str = Field(..., description="待评估的翻译文本")
+    reference_texts: List[str] = Field(..., description="参考译文列表，至少提供一个")
+    source_language: str = Field(..., description="源语言代码")
+    target_language: str = Field(..., description="目标语言代码")
+    domain: str = Field(default="materials_science", description="领域类型，默认为材料科学")
+    target_precision: Optional[float] = Field(default=None, gt=0, description="置信区间半宽的目标值（0-1分制），默认使用配置项")
+    confidence: float = Field(default=0.95, gt=0, lt=1, description="置信水平")
+    time_budget_ms: Optional[int] = Field(default=None, gt=0, description="时间预算（毫秒），默认不限时")
+    seed: Optional[int] = Field(default=None, description="随机种子，指定后结果可复现")
+
+
+class EstimatedScore(BaseModel):
+    """得分的点估计及置信区间"""
+    estimate: float = Field(..., description="点估计 (0-1)")
+    lower: float = Field(..., description="置信区间下限")
+    upper: float = Field(..., description="置信区间上限")
+
+
+class ApproximateEvaluationResponse(BaseModel):
+    """近似评估响应模型"""
+    overall_score: EstimatedScore = Field(..., description="综合得分（BLEU与术语准确性的加权平均值）")
+    bleu_score: EstimatedScore = Field(..., description="对齐句子上的语料级BLEU分数")
+    terminology_score: Optional[EstimatedScore] = Field(None, description="术语准确性得分，抽样句子中没有术语时为空")
+    confidence: float = Field(..., description="置信水平")
+    sentence_count: int = Field(..., description="译文句子数")
+    sample_size: int = Field(..., description="抽样句子数")
+    rounds: int = Field(..., description="抽样轮数")
+    exact: bool = Field(..., description="样本是否覆盖了全部句子")
+    stop_reason: str = Field(..., description="停止抽样的原因：precision（达到精度）、exhausted（已抽完）、time_budget（时间预算不足）")
+
+
+class SegmentStatistics(BaseModel):
+    """单个句段的充分统计量"""
+    matches: List[float] = Field(..., min_length=4, max_length=4, description="1-4阶n-gram截断匹配数")
+    totals: List[float] = Field(..., min_length=4, max_length=4, description="1-4阶n-gram总数")
+    hypothesis_length: float = Field(..., description="译文词元数")
+    reference_length: float = Field(..., description="参考译文词元数（多个参考时取最接近译文长度者）")
+    term_count: float = Field(default=0, description="源文本中出现的术语数")
+    term_correct: float = Field(default=0, description="译文中正确使用的术语数")
+
+
+class SystemOutput(BaseModel):
+    """参与比较的系统，segments与hypotheses二选一"""
+    name: str = Field(..., description="系统名称")
+    segments: Optional[List[SegmentStatistics]] = Field(None, description="逐句段的充分统计量")
+    hypotheses: Optional[List[str]] = Field(None, description="逐句段的译文，由服务计算充分统计量")
+
+
+class ComparisonRequest(BaseModel):
+    """系统比较请求模型"""
+    systems: List[SystemOutput] = Field(..., min_length=2, description="待比较的系统，第一个为基线")
+    references: Optional[List[List[str]]] = Field(None, description="各句段的参考译文，按译文比较时必填")
+    sources: Optional[List[str]] = Field(None, description="各句段的源文本，按译文比较时提供则同时比较术语准确性")
+    source_language: str = Field(default="zh", description="源语言代码")
+    target_language: str = Field(default="en", description="目标语言代码")
+    domain: str = Field(default="materials_science", description="领域类型")
+    n_resamples: int = Field(default=1000, ge=100, le=10000, description="bootstrap重抽样次数")
+    confidence: float = Field(default=0.95, gt=0, lt=1, description="置信水平")
+    seed: Optional[int] = Field(default=None, description="随机种子，指定后结果可复现")
+
+
+class SystemComparisonScore(BaseModel):
+    """单个系统的得分"""
+    name: str = Field(..., description="系统名称")
+    bleu_score: EstimatedScore = Field(..., description="语料级BLEU分数及置信区间")
+    terminology_score: Optional[EstimatedScore] = Field(None, description="术语准确性得分及置信区间，没有术语统计时为空")
+
+
+class PairwiseComparison(BaseModel):
+    """系统与基线的配对比较结果"""
+    system: str = Field(..., description="系统名称")
+    baseline: str = Field(..., description="基线系统名称")
+    metric: str = Field(..., description="指标名称：bleu或terminology")
+    difference: float = Field(..., description="系统得分减基线得分")
+    lower: float = Field(..., description="差值置信区间下限")
+    upper: float = Field(..., description="差值置信区间上限")
+    p_value: float = Field(..., description="配对bootstrap双侧p值")
+    significant: bool = Field(..., description="差异在给定置信水平下是否显著")
+
+
+class ComparisonResponse(BaseModel):
+    """系统比较响应模型"""
+    systems: List[SystemComparisonScore] = Field(..., description="各系统的得分")
+    comparisons: List[PairwiseComparison] = Field(..., description="其他系统与基线的比较")
+    segment_count: int = Field(..., description="句段数")
+    n_resamples: int = Field(..., description="重抽样次数")
+    confidence: float = Field(..., description="置信水平")
+
+
+class TranslateAndEvaluateResponse(BaseModel):
+    """翻译并评估响应模型"""
+    translation: TranslationResponse = Field(..., description="翻译结果")
+    evaluation: EvaluationResponse = Field(..., description="译文的评估结果")
+    simulated: bool = Field(False, description="接口调用失败、译文为模拟结果")
+    timings: Dict[str, float] = Field(..., description="各阶段耗时（毫秒）：llm为翻译，prepare为源文本和参考译文分析（与翻译同时进行），score为评分")
+
+
+class ModelComparisonEntry(BaseModel):
+    """多模型比较中单个模型的结果"""
+    rank: Optional[int] = Field(None, description="按综合得分的排名，翻译失败时为空")
+    model: str = Field(..., description="请求的模型ID")
+    used_model: Optional[str] = Field(None, description="实际使用的模型")
+    translated_text: Optional[str] = Field(None, description="译文")
+    overall_score: Optional[float] = Field(None, description="综合得分")
+    evaluation: Optional[EvaluationResponse] = Field(None, description="完整评估结果")
+    latency_ms: float = Field(..., description="翻译耗时（毫秒）")
+    prompt_tokens: Optional[int] = Field(None, description="输入令牌数，接口未返回用量时为空")
+    completion_tokens: Optional[int] = Field(None, description="输出令牌数，接口未返回用量时为空")
+    total_tokens: Optional[int] = Field(None, description="令牌总数，接口未返回用量时为空")
+    simulated: bool = Field(False, description="接口调用失败、译文为模拟结果")
+    error: Optional[str] = Field(None, description="翻译或评估失败时的错误信息")
+
+
+class ModelComparisonResponse(BaseModel):
+    """多模型翻译比较响应模型"""
+    source_text: str = Field(..., description="源文本")
+    source_language: str = Field(..., description="源语言代码")
+    target_language: str = Field(..., description="目标语言代码")
+    domain: str = Field(..., description="领域")
+    metrics: List[str] = Field(..., description="计算的评估指标")
+    results: List[ModelComparisonEntry] = Field(..., description="按综合得分从高到低排列的各模型结果，模拟译文和失败的模型排在最后")
+    total_ms: float = Field(..., description="比较总耗时（毫秒）")
 
 
 class ScoringCriteria(BaseModel):
@@ -124,4 +301,19 @@ class SystemHealth(BaseModel):
     """系统健康状态"""
     status: str = Field(..., description="状态")
     version: str = Field(..., description="版本")
-    uptime: float = Field(..., description="运行时间(秒)") 
\ No newline at end of file
+    uptime: float = Field(..., description="运行时间(秒)") 
+
+class WarmupComponentStatus(BaseModel):
+    """单个组件的预热状态"""
+    name: str = Field(..., description="组件名称")
+    status: str = Field(..., description="状态：pending、running、ready或failed")
+    duration_ms: Optional[float] = Field(None, description="预热耗时(毫秒)")
+    error: Optional[str] = Field(None, description="预热失败时的错误信息")
+
+
+class ReadinessStatus(BaseModel):
+    """就绪状态"""
+    ready: bool = Field(..., description="是否可以接收流量")
+    status: str = Field(..., description="预热状态：disabled、pending、warming、ready或degraded")
+    components: List[WarmupComponentStatus] = Field(default_factory=list, description="各组件的预热状态")
+    warmup_ms: Optional[float] = Field(None, description="预热总耗时(毫秒)，预热进行中时为已用时间")
@@ -0,0 +1,307 @@
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.data_service import data_service
+from app.utils.bleu_stats import clipped_matches, count_ngrams, exp_smoothed_bleu, order_totals
+from app.utils.deadline import Deadline
+from app.utils.document_analysis import EvaluationContext, tokenize_sentence
+from app.utils.text_index import TranslationIndex
+
+logger = logging.getLogger(__name__)
+
+MAX_ORDER = 4
+
+# 每个抽样句子的统计量：各阶匹配数、各阶总数、译文词元数、参考词元数、源句术语数、正确使用的术语数
+MATCHES = slice(0, MAX_ORDER)
+TOTALS = slice(MAX_ORDER, 2 * MAX_ORDER)
+HYPOTHESIS_LENGTH = 2 * MAX_ORDER
+REFERENCE_LENGTH = 2 * MAX_ORDER + 1
+TERM_COUNT = 2 * MAX_ORDER + 2
+TERM_CORRECT = 2 * MAX_ORDER + 3
+STAT_COUNT = 2 * MAX_ORDER + 4
+
+# 按位置比例换算后，在参考译文中前后各取几句作为对齐候选
+ALIGNMENT_WINDOW = 2
+
+
+class StratifiedSample:
+    """
+    按位置分层的句子抽样
+
+    全文句子按位置等分为若干层，每层的句子预先随机排列。扩大样本时各层按比例（每层至少1句）
+    取排列中的前若干句，已抽取的句子始终保留在样本中，只需统计新加入的句子。
+    """
+
+    def __init__(self, population: int, strata: int, rng: np.random.Generator):
+        """
+        Args:
+            population: 句子总数
+            strata: 分层数
+            rng: 随机数生成器
+        """
+        bounds = np.linspace(0, population, min(strata, population) + 1).round().astype(int)
+        self.population = population
+        self.strata = [rng.permutation(np.arange(start, end)) for start, end in zip(bounds[:-1], bounds[1:])]
+        self.sizes = [0] * len(self.strata)
+
+    @property
+    def size(self) -> int:
+        """当前样本量"""
+        return sum(self.sizes)
+
+    def grow(self, sample_size: int) -> List[int]:
+        """
+        将样本扩大到约sample_size句
+
+        Args:
+            sample_size: 目标样本量
+
+        Returns:
+            新加入样本的句子序号
+        """
+        added = []
+        for h, stratum in enumerate(self.strata):
+            target = min(len(stratum), max(1, round(sample_size * len(stratum) / self.population)))
+            if target > self.sizes[h]:
+                added.extend(stratum[self.sizes[h]:target].tolist())
+                self.sizes[h] = target
+        return added
+
+    def members(self) -> List[Tuple[np.ndarray, float]]:
+        """各层已抽取的句子序号及其权重（层内句子数/层内样本量）"""
+        return [
+            (stratum[:size], len(stratum) / size)
+            for stratum, size in zip(self.strata, self.sizes) if size
+        ]
+
+
+class ApproximateEvaluator:
+    """
+    基于分层抽样的近似评估
+
+    以译文句子为抽样单位：每个抽样句子与参考译文中位置相近的句子对齐，统计BLEU充分统计量；
+    按位置比例划入该句的源文本句子中出现的术语，检查译文在该句附近是否使用了对应的目标术语。
+    各层统计量按权重汇总得到点估计，分层bootstrap重抽样得到置信区间。
+    样本量逐轮翻倍，直到置信区间达到要求的精度、样本覆盖全文或剩余时间不足以完成下一轮。
+    """
+
+    def __init__(self, service: Any, context: EvaluationContext, rng: np.random.Generator):
+        """
+        Args:
+            service: 评估服务，提供术语评分方法
+            context: 评估上下文（只使用分句结果，分词只对抽中的句子进行）
+            rng: 随机数生成器
+        """
+        self.service = service
+        self.context = context
+        self.rng = rng
+        self.translation_sentences = context.translation.sentences
+        self.source_sentences = context.source.sentences
+        self.reference_sentences = [reference.sentences for reference in context.references]
+        self._reference_ngrams: Dict[Tuple[int, int], Tuple[Counter, int]] = {}
+        self.terminology = data_service.load_terminology(
+            context.domain, context.source_language, context.target_language
+        )
+
+    def sentence_stats(self, index: int) -> np.ndarray:
+        """
+        统计第index个译文句子的BLEU充分统计量和术语使用情况
+
+        Args:
+            index: 译文句子序号
+
+        Returns:
+            长度为STAT_COUNT的统计量数组
+        """
+        stats = np.zeros(STAT_COUNT)
+        language = self.context.target_language
+        tokens = tokenize_sentence(self.translation_sentences[index], language)
+        counts = count_ngrams(tokens, MAX_ORDER)
+        stats[TOTALS] = order_totals(counts, MAX_ORDER)
+        stats[HYPOTHESIS_LENGTH] = len(tokens)
+
+        # 与参考译文中位置相近、匹配n-gram最多的句子对齐
+        best_matches, best_length = [0] * MAX_ORDER, 0
+        for reference_index in range(len(self.reference_sentences)):
+            for candidate in self._alignment_candidates(index, reference_index):
+                reference_counts, reference_length = self._reference_stats(reference_index, candidate)
+                matches = clipped_matches(counts, reference_counts, MAX_ORDER)
+                if best_length == 0 or sum(matches) > sum(best_matches):
+                    best_matches, best_length = matches, reference_length
+        stats[MATCHES] = best_matches
+        stats[REFERENCE_LENGTH] = best_length
+
+        if self.terminology:
+            stats[TERM_COUNT], stats[TERM_CORRECT] = self._term_hits(index)
+        return stats
+
+    def _alignment_candidates(self, index: int, reference_index: int) -> range:
+        """参考译文中与第index个译文句子位置相近的句子序号"""
+        reference_count = len(self.reference_sentences[reference_index])
+        center = index * reference_count // len(self.translation_sentences)
+        return range(max(0, center - ALIGNMENT_WINDOW), min(reference_count, center + ALIGNMENT_WINDOW + 1))
+
+    def _reference_stats(self, reference_index: int, sentence_index: int) -> Tuple[Counter, int]:
+        """参考译文句子的n-gram计数和词元数，每句只分词一次"""
+        key = (reference_index, sentence_index)
+        if key not in self._reference_ngrams:
+            tokens = tokenize_sentence(
+                self.reference_sentences[reference_index][sentence_index], self.context.target_language
+            )
+            self._reference_ngrams[key] = (count_ngrams(tokens, MAX_ORDER), len(tokens))
+        return self._reference_ngrams[key]
+
+    def _term_hits(self, index: int) -> Tuple[int, float]:
+        """
+        按位置比例划入第index个译文句子的源句中出现的术语数，以及译文在该句前后使用了目标术语的数量
+
+        Returns:
+            术语数和正确数（部分匹配按0.5计，与完整评估一致）
+        """
+        context = self.context
+        translation_count = len(self.translation_sentences)
+        source_count = len(self.source_sentences)
+        start = index * source_count // translation_count
+        end = (index + 1) * source_count // translation_count
+        source_text = " ".join(self.source_sentences[start:end])
+        if not source_text:
+            return 0, 0.0
+
+        term_indices = data_service.find_terms_in_text(
+            source_text, context.domain, context.source_language, context.target_language
+        )
+        if not term_indices:
+            return 0, 0.0
+        found_terms = [self.terminology[term_index] for term_index in term_indices]
+
+        # 术语可能被译到相邻句子中，检查前后各一句
+        window = " ".join(self.translation_sentences[max(0, index - 1):index + 2])
+        translation_index = TranslationIndex.for_terms(
+            window, [term.target_term for term in found_terms], context.target_language
+        )
+        score, _ = self.service._score_terminology(found_terms, translation_index, context.target_language)
+        return len(found_terms), score * len(found_terms)
+
+    def run(self,
+            target_precision: float,
+            confidence: float,
+            deadline: Optional[Deadline] = None,
+            initial_sample_size: Optional[int] = None,
+            bootstrap_samples: Optional[int] = None) -> Dict[str, Any]:
+        """
+        逐轮扩大样本并估计得分
+
+        Args:
+            target_precision: 置信区间半宽的目标值（0-1分制）
+            confidence: 置信水平
+            deadline: 截止时间，为None时不限时
+            initial_sample_size: 第一轮样本量，默认使用配置项
+            bootstrap_samples: bootstrap重抽样次数，默认使用配置项
+
+        Returns:
+            各项得分的估计值（estimate、lower、upper）以及抽样信息
+        """
+        population = len(self.translation_sentences)
+        sample = StratifiedSample(population, settings.APPROXIMATE_STRATA, self.rng)
+        stats: Dict[int, np.ndarray] = {}
+        sample_size = min(population, initial_sample_size or settings.APPROXIMATE_INITIAL_SAMPLE)
+        bootstrap_samples = bootstrap_samples or settings.APPROXIMATE_BOOTSTRAP_SAMPLES
+        rounds = 0
+
+        while True:
+            started = time.perf_counter()
+            added = sample.grow(sample_size)
+            for index in added:
+                stats[index] = self.sentence_stats(index)
+            rounds += 1
+            estimates = self._estimate(sample, stats, bootstrap_samples, confidence)
+            elapsed = time.perf_counter() - started
+
+            if sample.size >= population:
+                stop_reason = "exhausted"
+                break
+            half_widths = [(score["upper"] - score["lower"]) / 2 for score in estimates.values() if score]
+            if max(half_widths) <= target_precision:
+                stop_reason = "precision"
+                break
+            # 按本轮每句耗时估计下一轮的耗时，超出剩余时间时停止
+            next_size = min(population, sample_size * 2)
+            if deadline is not None:
+                projected = elapsed / max(1, len(added)) * (next_size - sample.size)
+                if projected > deadline.remaining():
+                    stop_reason = "time_budget"
+                    break
+            sample_size = next_size
+
+        logger.info(f"近似评估完成: 抽样{sample.size}/{population}句，{rounds}轮，停止原因: {stop_reason}")
+        return {
+            **estimates,
+            "sentence_count": population,
+            "sample_size": sample.size,
+            "rounds": rounds,
+            "exact": sample.size >= population,
+            "stop_reason": stop_reason,
+        }
+
+    def _estimate(self,
+                  sample: StratifiedSample,
+                  stats: Dict[int, np.ndarray],
+                  bootstrap_samples: int,
+                  confidence: float) -> Dict[str, Optional[Dict[str, float]]]:
+        """
+        由当前样本计算点估计和分层bootstrap置信区间
+
+        Returns:
+            bleu、terminology、overall三项估计，没有术语时terminology为None
+        """
+        point = np.zeros(STAT_COUNT)
+        replicates = np.zeros((bootstrap_samples, STAT_COUNT))
+        for members, weight in sample.members():
+            rows = np.array([stats[index] for index in members])
+            point += weight * rows.sum(axis=0)
+            # 层内有放回重抽样：每次重抽样中各句被抽中的次数
+            draws = self.rng.multinomial(len(members), np.full(len(members), 1.0 / len(members)), size=bootstrap_samples)
+            replicates += weight * (draws @ rows)
+
+        combined = np.vstack([point, replicates])
+        bleu = exp_smoothed_bleu(
+            combined[:, MATCHES], combined[:, TOTALS], combined[:, HYPOTHESIS_LENGTH], combined[:, REFERENCE_LENGTH]
+        )
+        terminology = None
+        if point[TERM_COUNT] > 0:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                terminology = np.where(
+                    combined[:, TERM_COUNT] > 0,
+                    combined[:, TERM_CORRECT] / combined[:, TERM_COUNT],
+                    point[TERM_CORRECT] / point[TERM_COUNT]
+                )
+
+        # 综合得分按两项指标的权重重新归一化
+        weights = settings.EVALUATION_WEIGHTS
+        if terminology is not None:
+            total_weight = weights["bleu"] + weights["terminology"]
+            overall = (weights["bleu"] * bleu + weights["terminology"] * terminology) / total_weight
+        else:
+            overall = bleu
+
+        census = sample.size >= sample.population
+        return {
+            "bleu": self._interval(bleu, confidence, census),
+            "terminology": self._interval(terminology, confidence, census) if terminology is not None else None,
+            "overall": self._interval(overall, confidence, census),
+        }
+
+    @staticmethod
+    def _interval(values: np.ndarray, confidence: float, census: bool) -> Dict[str, float]:
+        """values第一项为点估计，其余为bootstrap重抽样结果；样本覆盖全文时区间退化为点估计"""
+        estimate = float(values[0])
+        if census:
+            return {"estimate": estimate, "lower": estimate, "upper": estimate}
+        alpha = (1 - confidence) / 2
+        lower, upper = np.quantile(values[1:], [alpha, 1 - alpha])
+        return {"estimate": estimate, "lower": float(min(lower, estimate)), "upper": float(max(upper, estimate))}
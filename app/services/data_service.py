@@ -1,10 +1,11 @@
 import os
 import json
 import logging
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 from app.core.config import settings
 from app.models.schemas import TerminologyEntry, TranslationExample
+from app.utils.aho_corasick import AhoCorasickAutomaton, TermMatch
 
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,9 @@ class DataService:
     def __init__(self):
         self.terminology_cache = {}  # 缓存已加载的术语
         self.examples_cache = {}  # 缓存已加载的翻译示例
+        self.automaton_cache = {}  # 缓存按术语库构建的多模式匹配自动机
+        self.terminology_versions = {}  # 各术语库的版本号
+        self.terminology_listeners = []  # 术语变更监听器
     
     def load_terminology(self, domain: str = "materials_science", 
                         source_lang: str = "zh", target_lang: str = "en") -> List[TerminologyEntry]:
@@ -133,12 +137,125 @@ class DataService:
         terminology_entries = self.load_terminology(domain, source_lang, target_lang)
         
         matches = {}
-        for entry in terminology_entries:
-            if entry.source_term in text:
-                matches[entry.source_term] = entry.target_term
+        for index in self.find_terms_in_text(text, domain, source_lang, target_lang):
+            entry = terminology_entries[index]
+            matches[entry.source_term] = entry.target_term
                 
         return matches
     
+    def get_term_automaton(self, domain: str = "materials_science",
+                           source_lang: str = "zh", target_lang: str = "en") -> AhoCorasickAutomaton:
+        """
+        获取术语库源语言术语的多模式匹配自动机
+        
+        自动机按(领域, 源语言, 目标语言)缓存，术语变更时随术语缓存一起失效并重新构建。
+        命中结果的value为术语条目在load_terminology返回列表中的下标。
+        
+        Args:
+            domain: 领域名称
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            
+        Returns:
+            已构建的自动机
+        """
+        cache_key = f"{domain}_{source_lang}_{target_lang}"
+        automaton = self.automaton_cache.get(cache_key)
+        if automaton is not None:
+            return automaton
+        
+        terminology_entries = self.load_terminology(domain, source_lang, target_lang)
+        # 中文不区分大小写也没有词边界，其他语言匹配时忽略大小写
+        automaton = AhoCorasickAutomaton(ignore_case=source_lang != "zh")
+        for index, entry in enumerate(terminology_entries):
+            automaton.add(entry.source_term, index)
+        automaton.build()
+        
+        logger.info(f"已构建术语匹配自动机: {cache_key}，共{len(automaton)}个术语")
+        self.automaton_cache[cache_key] = automaton
+        return automaton
+    
+    def match_terms(self, text: str, domain: str = "materials_science",
+                    source_lang: str = "zh", target_lang: str = "en",
+                    longest_only: bool = False) -> List[TermMatch]:
+        """
+        单次扫描文本，返回所有术语命中及其位置
+        
+        Args:
+            text: 要搜索的文本
+            domain: 领域名称
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            longest_only: 是否只保留互不重叠的最长匹配
+            
+        Returns:
+            按位置排序的匹配结果列表
+        """
+        automaton = self.get_term_automaton(domain, source_lang, target_lang)
+        # 英文等语言需要词边界匹配，中文不需要
+        return automaton.find_all(text, longest_only=longest_only, word_boundary=source_lang != "zh")
+    
+    def find_terms_in_text(self, text: str, domain: str = "materials_science",
+                           source_lang: str = "zh", target_lang: str = "en") -> List[int]:
+        """
+        查找文本中出现的术语条目
+        
+        Args:
+            text: 要搜索的文本
+            domain: 领域名称
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            
+        Returns:
+            出现过的术语条目下标，按术语库中的顺序排列
+        """
+        matches = self.match_terms(text, domain, source_lang, target_lang)
+        return sorted({match.value for match in matches})
+    
+    def get_terminology_version(self, domain: str = "materials_science",
+                                source_lang: str = "zh", target_lang: str = "en") -> int:
+        """
+        获取术语库版本号，术语每变更一次加1，用于依赖术语库的结果缓存
+        
+        Args:
+            domain: 领域名称
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            
+        Returns:
+            版本号
+        """
+        return self.terminology_versions.get(f"{domain}_{source_lang}_{target_lang}", 0)
+    
+    def add_terminology_listener(self, listener: Callable[[str, str, str], None]) -> None:
+        """
+        注册术语变更监听器，术语变更时以(domain, source_lang, target_lang)调用
+        
+        Args:
+            listener: 回调函数
+        """
+        self.terminology_listeners.append(listener)
+    
+    def invalidate_terminology(self, domain: str, source_lang: str, target_lang: str) -> None:
+        """
+        术语变更后清除对应的术语缓存和匹配自动机，更新版本号并通知监听器
+        
+        Args:
+            domain: 领域名称
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+        """
+        cache_key = f"{domain}_{source_lang}_{target_lang}"
+        self.terminology_cache.pop(cache_key, None)
+        self.automaton_cache.pop(cache_key, None)
+        self.terminology_versions[cache_key] = self.terminology_versions.get(cache_key, 0) + 1
+        
+        for listener in self.terminology_listeners:
+            try:
+                listener(domain, source_lang, target_lang)
+            except Exception as e:
+                logger.error(f"术语变更监听器执行失败: {str(e)}")
+    
     def get_simplified_terminology(self, domain: str = "materials_science",
                                    source_lang: str = "zh", target_lang: str = "en") -> Dict[str, str]:
         """
@@ -218,9 +335,7 @@ class DataService:
                 json.dump(terminology_entries, f, ensure_ascii=False, indent=2)
             
             # 清除缓存
-            cache_key = f"{domain}_{source_lang}_{target_lang}"
-            if cache_key in self.terminology_cache:
-                del self.terminology_cache[cache_key]
+            self.invalidate_terminology(domain, source_lang, target_lang)
                 
             return True
         except Exception as e:
@@ -283,9 +398,7 @@ class DataService:
                 json.dump(terminology_entries, f, ensure_ascii=False, indent=2)
             
             # 清除缓存
-            cache_key = f"{domain}_{source_lang}_{target_lang}"
-            if cache_key in self.terminology_cache:
-                del self.terminology_cache[cache_key]
+            self.invalidate_terminology(domain, source_lang, target_lang)
                 
             return True
         except Exception as e:
@@ -445,6 +558,8 @@ class DataService:
             # 清除缓存
             self.terminology_cache = {}
             self.examples_cache = {}
+            self.automaton_cache = {}
+            self.invalidate_terminology("materials_science", "zh", "en")
             
             logger.info("示例数据初始化完成")
             
@@ -529,9 +644,7 @@ class DataService:
                 json.dump(terminology_entries, f, ensure_ascii=False, indent=2)
             
             # 清除缓存
-            cache_key = f"{domain}_{source_lang}_{target_lang}"
-            if cache_key in self.terminology_cache:
-                del self.terminology_cache[cache_key]
+            self.invalidate_terminology(domain, source_lang, target_lang)
             
             return True
         except Exception as e:
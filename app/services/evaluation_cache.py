@@ -0,0 +1,151 @@
+import json
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.models.schemas import EvaluationResponse
+from app.services.data_service import data_service
+
+
+logger = logging.getLogger(__name__)
+
+# 评估算法变化时修改此值，使旧缓存全部失效
+CACHE_FORMAT_VERSION = 1
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化待评估文本：统一为NFC形式、统一换行符并去掉首尾空白
+
+    缓存键和实际评估都使用规范化后的文本，保证命中缓存与重新计算的结果一致。
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        规范化后的文本
+    """
+    return unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+class EvaluationCache:
+    """
+    评估结果的LRU缓存
+
+    按条目数和序列化后的字节数双重限制容量。缓存中保存响应的JSON序列化结果，
+    每次命中都重新反序列化，调用方拿到的是独立副本，修改不会影响缓存。
+    每个条目记录所依赖的术语库，术语变更时主动清除相关条目。
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # 缓存键 -> (序列化结果, 依赖的术语库, 字节数)
+        self._entries: "OrderedDict[str, Tuple[str, Tuple[str, str, str], int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(parts: Dict[str, Any]) -> str:
+        """
+        根据影响评估结果的全部因素生成缓存键
+
+        Args:
+            parts: 影响结果的参数（文本、语言、领域、模式、权重、版本号等）
+
+        Returns:
+            SHA-256摘要
+        """
+        payload = json.dumps({"format": CACHE_FORMAT_VERSION, **parts}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[EvaluationResponse]:
+        """
+        查找缓存结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            评估结果副本，未命中时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payload = entry[0]
+        return EvaluationResponse.model_validate_json(payload)
+
+    def put(self, key: str, response: EvaluationResponse, terminology: Tuple[str, str, str]) -> None:
+        """
+        写入缓存，超出容量时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            response: 评估结果
+            terminology: 结果所依赖的术语库(domain, source_lang, target_lang)
+        """
+        payload = response.model_dump_json()
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[2]
+            self._entries[key] = (payload, terminology, size)
+            self._size += size
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate_terminology(self, domain: str, source_lang: str, target_lang: str) -> None:
+        """
+        清除依赖指定术语库的缓存条目
+
+        Args:
+            domain: 领域名称
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+        """
+        terminology = (domain, source_lang, target_lang)
+        with self._lock:
+            stale = [key for key, (_, entry_terminology, _) in self._entries.items() if entry_terminology == terminology]
+            for key in stale:
+                self._size -= self._entries.pop(key)[2]
+        if stale:
+            logger.info(f"术语库{domain}({source_lang}-{target_lang})已变更，清除{len(stale)}条评估缓存")
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": settings.EVALUATION_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# 单例实例
+evaluation_cache = EvaluationCache(settings.EVALUATION_CACHE_MAX_ENTRIES, settings.EVALUATION_CACHE_MAX_BYTES)
+data_service.add_terminology_listener(evaluation_cache.invalidate_terminology)
@@ -1,40 +1,118 @@
+import asyncio
+import contextvars
 import logging
 import re
-import nltk
-import jieba
-from typing import Dict, List, Tuple, Any, Set
-from sacrebleu.metrics import BLEU
-from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
+import threading
+import time
+from functools import cached_property
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Any, Set
+
 import numpy as np
 
 from app.core.config import settings
-from app.models.schemas import EvaluationScore, EvaluationResponse
+from app.models.schemas import (
+    EvaluationScore, EvaluationResponse, EstimatedScore, ApproximateEvaluationResponse
+)
 from app.services.data_service import data_service
 from app.services.llm_service import llm_service
-
-# 确保下载需要的nltk数据
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-
+from app.services.term_alignment_service import term_alignment_service
+from app.services.term_extraction_service import term_extraction_service
+from app.services.user_dictionary_service import user_dictionary_service
+from app.services.evaluation_cache import evaluation_cache, normalize_text
+from app.services.approximate_evaluation import ApproximateEvaluator
+from app.services.metric_registry import MetricDefinition, MetricRegistry
+from app.services.timing_service import StageTimer, timing_service
+from app.utils.deadline import Deadline, DeadlineExceeded, check_deadline, deadline_scope
+from app.utils.nlp_resources import nltk_bleu, sacrebleu_metrics
+from app.utils.bleu_stats import clipped_matches, count_ngrams, nltk_bleu_from_stats, order_totals
+from app.utils.lexical_scanner import count_spans_with_hits, LexicalProfile
+from app.utils.document_analysis import DocumentAnalysis, EvaluationContext
+from app.utils.term_candidates import (
+    OccurrenceIndex, chinese_noun_phrases, english_term_candidates, match_term_candidates, match_nearby_words
+)
 
 logger = logging.getLogger(__name__)
 
+# 内置评估指标名称，与EvaluationResponse中的{name}_score字段和detailed_feedback的键对应
+METRICS = ["bleu", "terminology", "sentence_structure", "discourse"]
+
 
 class EvaluationService:
     """评估服务，负责评估翻译质量"""
     
     def __init__(self):
-        self.bleu = BLEU(smooth_method='exp')  # 使用指数平滑
-        
+        # 评估指标注册表，可通过metric_registry.register注册其他指标
+        self.metric_registry = MetricRegistry()
+        self._register_builtin_metrics()
+
+        # 级联术语评估中各层的使用次数
+        self._terminology_tier_counts: Dict[str, int] = {}
+        self._terminology_tier_lock = threading.Lock()
+
+    @cached_property
+    def bleu(self) -> Any:
+        """语料级BLEU（sacrebleu），首次使用时创建，避免导入本模块时加载sacrebleu"""
+        return sacrebleu_metrics.BLEU(smooth_method='exp')  # 使用指数平滑
+
+    @cached_property
+    def smooth_methods(self) -> List[Any]:
+        """句子级BLEU的平滑函数，使用每种平滑方法并选择得分最合理的"""
+        smoothing = nltk_bleu.SmoothingFunction()
+        return [
+            smoothing.method1,  # 为零计数添加one
+            smoothing.method2,  # 为零计数添加epsilon
+            smoothing.method3,  # 为零计数添加平滑值
+            smoothing.method4,  # NIST几何加权平均
+        ]
+
+    def _register_builtin_metrics(self) -> None:
+        """注册内置的四项评估指标"""
+        register = self.metric_registry.register
+        register(MetricDefinition(
+            "bleu", "BLEU分数",
+            lambda context, terminology_mode: (*self._calculate_bleu_score(context), None),
+            describe=lambda score, details: f"BLEU分数为{score:.2f}，这表示译文与参考译文的匹配程度。{details}",
+            requires=[("translation", "sentences"), ("references", "sentences")],
+            # 逐句比较需要将每个译文句子与参考译文的全部句子对齐
+            cost=10
+        ))
+        register(MetricDefinition(
+            "terminology", "术语准确性",
+            self._evaluate_terminology_by_mode,
+            describe=lambda score, feedback: f"术语准确性得分为{score:.2f}，评估译文中专业术语的使用是否准确。",
+            # AI提取需要调用大模型，参考文本模式需要对齐源文本和参考译文，级联模式只在必要时调用大模型
+            cost=lambda terminology_mode: {"ai_extraction": 100, "cascade": 20, "reference": 5}.get(terminology_mode, 2)
+        ))
+        register(MetricDefinition(
+            "sentence_structure", "句式转换",
+            lambda context, terminology_mode: (*self._evaluate_sentence_structure(context), None),
+            describe=lambda score, feedback: f"句式转换得分为{score:.2f}，评估汉语主动句与英语被动句的转换是否适当。",
+            # 仅中译英时评估句式转换
+            requires=lambda context: [
+                ("source", "sentence_spans"), ("source", "lexical"),
+                ("translation", "sentence_spans"), ("translation", "lexical")
+            ] if context.source_language == "zh" and context.target_language == "en" else []
+        ))
+        register(MetricDefinition(
+            "discourse", "语篇连贯性",
+            lambda context, terminology_mode: (*self._evaluate_discourse(context), None),
+            describe=lambda score, feedback: f"语篇连贯性得分为{score:.2f}，评估译文的逻辑连贯性和整体流畅度。",
+            requires=[("translation", "sentences"), ("translation", "lexical"), ("references", "lexical")]
+        ))
+
     def evaluate_translation(self,
                            source_text: str,
                            translated_text: str,
                            reference_texts: List[str],
                            source_language: str = "zh",
                            target_language: str = "en",
-                           domain: str = "materials_science") -> EvaluationResponse:
+                           domain: str = "materials_science",
+                           use_cache: bool = True,
+                           include_timings: bool = False,
+                           timer: Optional[StageTimer] = None,
+                           metrics: Optional[List[str]] = None,
+                           time_budget_ms: Optional[int] = None,
+                           record_timings: bool = True) -> EvaluationResponse:
         """
         评估翻译质量
         
@@ -45,312 +123,1002 @@ class EvaluationService:
             source_language: 源语言代码
             target_language: 目标语言代码
             domain: 领域名称
+            use_cache: 是否使用评估结果缓存
+            include_timings: 是否在结果的timings字段中返回各阶段耗时
+            timer: 记录各阶段耗时的计时器，调用方需要耗时数据（如生成Server-Timing响应头）时传入
+            metrics: 需要计算的评估指标，默认计算全部已注册指标；未选择的指标不计算，综合得分按所选指标的权重重新归一化
+            time_budget_ms: 时间预算（毫秒），指标按预计开销从低到高计算，预算用完时跳过尚未完成的指标，
+                返回已完成指标的结果（partial为True，跳过的指标列在skipped_metrics中）；为None时不限时
+            record_timings: 是否将各阶段耗时计入/evaluation/timings的统计，预热等内部调用传入False
             
         Returns:
             评估结果对象
+            
+        Raises:
+            ValueError: 请求了未注册的评估指标
+        """
+        metrics = self.metric_registry.resolve(metrics)
+        timer = timer or StageTimer()
+        deadline = Deadline(time_budget_ms) if time_budget_ms is not None else None
+        started = time.perf_counter()
+        with timer.activate(), deadline_scope(deadline):
+            response, context = self._evaluate_timed(
+                source_text, translated_text, reference_texts, source_language, target_language, domain,
+                use_cache, metrics
+            )
+        
+        if context is not None:
+            self._add_analysis_timings(timer, context)
+        timer.add("total", (time.perf_counter() - started) * 1000)
+        if record_timings:
+            timing_service.record(timer.timings)
+        logger.debug(f"评估各阶段耗时(ms): {timer.timings}")
+        
+        if include_timings:
+            response.timings = dict(timer.timings)
+        return response
+    
+    def evaluate_approximate(self,
+                             source_text: str,
+                             translated_text: str,
+                             reference_texts: List[str],
+                             source_language: str = "zh",
+                             target_language: str = "en",
+                             domain: str = "materials_science",
+                             target_precision: Optional[float] = None,
+                             confidence: float = 0.95,
+                             time_budget_ms: Optional[int] = None,
+                             seed: Optional[int] = None) -> ApproximateEvaluationResponse:
+        """
+        近似评估长文档：对分层抽样的句子计算BLEU充分统计量和术语使用情况，返回点估计及bootstrap置信区间
+        
+        样本量逐轮翻倍，直到置信区间半宽不超过target_precision、样本覆盖全文或时间预算不足以完成下一轮。
+        只估计BLEU和术语准确性（术语库模式），BLEU为对齐句子上的语料级BLEU，与完整评估的组合BLEU不完全相同。
+        
+        Args:
+            source_text: 源文本
+            translated_text: 待评估的翻译文本
+            reference_texts: 参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            target_precision: 置信区间半宽的目标值，默认使用配置项APPROXIMATE_TARGET_PRECISION
+            confidence: 置信水平
+            time_budget_ms: 时间预算（毫秒），为None时不限时
+            seed: 随机种子
+            
+        Returns:
+            近似评估结果
+            
+        Raises:
+            ValueError: 译文或参考译文为空
+        """
+        context = self.build_context(
+            normalize_text(source_text), normalize_text(translated_text),
+            [normalize_text(text) for text in reference_texts],
+            source_language, target_language, domain
+        )
+        if not context.translation.sentences or not any(reference.sentences for reference in context.references):
+            raise ValueError("译文和参考译文不能为空")
+        
+        evaluator = ApproximateEvaluator(self, context, np.random.default_rng(seed))
+        result = evaluator.run(
+            target_precision or settings.APPROXIMATE_TARGET_PRECISION,
+            confidence,
+            deadline=Deadline(time_budget_ms) if time_budget_ms is not None else None
+        )
+        return ApproximateEvaluationResponse(
+            overall_score=EstimatedScore(**result["overall"]),
+            bleu_score=EstimatedScore(**result["bleu"]),
+            terminology_score=EstimatedScore(**result["terminology"]) if result["terminology"] else None,
+            confidence=confidence,
+            sentence_count=result["sentence_count"],
+            sample_size=result["sample_size"],
+            rounds=result["rounds"],
+            exact=result["exact"],
+            stop_reason=result["stop_reason"]
+        )
+    
+    @staticmethod
+    def _add_analysis_timings(timer: StageTimer, context: EvaluationContext) -> None:
+        """
+        将文本分析（分词、分句等）的耗时记入计时器
+        
+        文本分析在首次使用它的指标中完成，耗时已包含在该指标内，单独列出便于定位耗时来源。
+        """
+        for name, elapsed in context.timings.items():
+            timer.add(f"analysis.{name}".replace("[", "").replace("]", "").replace(":", "."), elapsed * 1000)
+    
+    def _evaluate_timed(self,
+                        source_text: str,
+                        translated_text: str,
+                        reference_texts: List[str],
+                        source_language: str,
+                        target_language: str,
+                        domain: str,
+                        use_cache: bool,
+                        metrics: List[str]) -> Tuple[EvaluationResponse, Optional[EvaluationContext]]:
         """
-        # 1. 计算BLEU分数
-        bleu_score, bleu_details = self._calculate_bleu_score(translated_text, reference_texts, source_language, target_language)
+        evaluate_translation的主体，各阶段耗时记录在当前计时器上
         
-        # 2. 根据配置选择术语评估方式
+        Returns:
+            评估结果对象和评估上下文（命中缓存时为None）
+        """
+        # 规范化文本，缓存键和评估使用同一份文本
+        with timing_service.stage("normalize"):
+            source_text = normalize_text(source_text)
+            translated_text = normalize_text(translated_text)
+            reference_texts = [normalize_text(text) for text in reference_texts]
+        
+        with timing_service.stage("cache_lookup"):
+            cache_key, cached_response = self._lookup_cache(
+                use_cache, source_text, translated_text, reference_texts, source_language, target_language, domain,
+                metrics
+            )
+        if cached_response is not None:
+            return cached_response, None
+        
+        # 各项指标共享同一份分词、分句和词汇分析结果
+        context = self.build_context(
+            source_text, translated_text, reference_texts, source_language, target_language, domain
+        )
+        return self._evaluate_context(context, metrics, cache_key), context
+    
+    def _evaluate_context(self,
+                          context: EvaluationContext,
+                          metrics: List[str],
+                          cache_key: Optional[str]) -> EvaluationResponse:
+        """
+        在评估上下文上计算所选指标并构建评估结果，完整的结果写入缓存
+        
+        Args:
+            context: 评估上下文（文本已规范化）
+            metrics: 所选评估指标
+            cache_key: 缓存键，为None时不写入缓存
+            
+        Returns:
+            评估结果对象
+        """
         terminology_mode = settings.TERMINOLOGY_EVALUATION_MODE
-        if terminology_mode == "reference" and reference_texts:
-            # 使用参考文本中的术语
-            terminology_score, terminology_feedback, extracted_terms = self._evaluate_terminology_from_reference(
-                source_text, translated_text, reference_texts[0] if reference_texts else "", 
-                source_language, target_language
+        
+        # 1. 预先执行所选指标共用的文本分析（分句、分词、词汇扫描等），每项只执行一次
+        self._prepare_context(context, metrics)
+        
+        # 2. 按预计开销从低到高计算所选指标，时间预算用完时跳过其余指标
+        results = {}
+        skipped = []
+        for name in self.metric_registry.by_cost(metrics, terminology_mode):
+            result = self._evaluate_metric_within_budget(name, context, terminology_mode)
+            if result is None:
+                skipped.append(name)
+            else:
+                results[name] = result
+        results = {name: results[name] for name in metrics if name in results}
+        extracted_terms = results["terminology"][2] if "terminology" in results else None
+        
+        # 3. 计算综合得分并构建评估响应，综合得分只基于已完成的指标
+        with timing_service.stage("response"):
+            response = self._build_response(results, extracted_terms)
+        if skipped:
+            response.partial = True
+            response.skipped_metrics = [name for name in metrics if name in skipped]
+            logger.warning(f"时间预算已用完，跳过评估指标: {', '.join(response.skipped_metrics)}")
+            # 不完整的结果不缓存
+            return response
+        
+        with timing_service.stage("cache_store"):
+            self._store_cache(
+                cache_key, response, metrics, terminology_mode, extracted_terms,
+                context.domain, context.source_language, context.target_language
             )
-        elif terminology_mode == "ai_extraction":
-            # 使用AI提取的术语
-            terminology_score, terminology_feedback, extracted_terms = self._evaluate_terminology_with_ai(
-                source_text, translated_text, domain, source_language, target_language
+        return response
+    
+    def _prepare_context(self, context: EvaluationContext, metrics: List[str]) -> None:
+        """预先执行所选指标依赖的文本分析"""
+        with timing_service.stage("prepare"):
+            self.metric_registry.prepare(context, self.metric_registry.requirements(metrics, context))
+
+    def build_shared_context(self,
+                             source_text: str,
+                             reference_texts: List[str],
+                             source_language: str = "zh",
+                             target_language: str = "en",
+                             domain: str = "materials_science",
+                             metrics: Optional[List[str]] = None) -> EvaluationContext:
+        """
+        为同一源文本的多份译文创建共享的评估上下文，预先完成源文本和参考译文的分析
+        
+        返回的上下文不含译文，各份译文通过evaluate_candidate评估，源文本和参考译文的分句、分词、
+        词汇分析以及术语查找只执行一次。
+        
+        Args:
+            source_text: 源文本
+            reference_texts: 参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            metrics: 需要计算的评估指标，默认计算全部已注册指标
+            
+        Returns:
+            评估上下文
+            
+        Raises:
+            ValueError: 请求了未注册的评估指标
+        """
+        metrics = self.metric_registry.resolve(metrics)
+        context = self.build_context(
+            normalize_text(source_text), "", [normalize_text(text) for text in reference_texts],
+            source_language, target_language, domain
+        )
+        requirements = [
+            requirement for requirement in self.metric_registry.requirements(metrics, context)
+            if requirement[0] != "translation"
+        ]
+        if "bleu" in metrics:
+            # 句子数量相近时BLEU逐句比较参考译文，预先完成逐句分词和n-gram计数（中文参考译文同时完成jieba的初始化）
+            requirements += [("references", "sentence_tokens"), ("references", "sentence_ngrams")]
+        with timing_service.stage("prepare"):
+            self.metric_registry.prepare(context, requirements)
+            if "terminology" in metrics:
+                # 术语库和参考文本模式下源文本的术语只与源文本和参考译文有关，结果缓存在共享的分析中
+                terminology_mode = settings.TERMINOLOGY_EVALUATION_MODE
+                if terminology_mode == "reference" and context.references:
+                    self._extract_reference_terms(context)
+                elif terminology_mode == "cascade":
+                    self._select_terminology_tier(context)
+                elif terminology_mode != "ai_extraction":
+                    self._find_source_terms(context)
+        return context
+    
+    def evaluate_candidate(self,
+                           shared_context: EvaluationContext,
+                           translated_text: str,
+                           metrics: Optional[List[str]] = None,
+                           use_cache: bool = True) -> EvaluationResponse:
+        """
+        在共享的评估上下文上评估一份译文，结果与evaluate_translation相同
+        
+        Args:
+            shared_context: build_shared_context创建的评估上下文
+            translated_text: 待评估的翻译文本
+            metrics: 需要计算的评估指标，默认计算全部已注册指标
+            use_cache: 是否使用评估结果缓存
+            
+        Returns:
+            评估结果对象
+            
+        Raises:
+            ValueError: 请求了未注册的评估指标
+        """
+        metrics = self.metric_registry.resolve(metrics)
+        translated_text = normalize_text(translated_text)
+        cache_key, cached_response = self._lookup_cache(
+            use_cache, shared_context.source_text, translated_text, shared_context.reference_texts,
+            shared_context.source_language, shared_context.target_language, shared_context.domain, metrics
+        )
+        if cached_response is not None:
+            return cached_response
+        return self._evaluate_context(shared_context.with_translation(translated_text), metrics, cache_key)
+
+    async def stream_evaluation(self,
+                                source_text: str,
+                                translated_text: str,
+                                reference_texts: List[str],
+                                source_language: str = "zh",
+                                target_language: str = "en",
+                                domain: str = "materials_science",
+                                metrics: Optional[List[str]] = None,
+                                include_timings: bool = False,
+                                time_budget_ms: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式评估翻译质量：各项指标在线程池中并发计算，每完成一项立即产出该项结果，
+        最后产出包含综合得分和改进建议的完整评估结果
+        
+        Args:
+            source_text: 源文本
+            translated_text: 待评估的翻译文本
+            reference_texts: 参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            metrics: 需要计算的评估指标，默认计算全部已注册指标
+            include_timings: 是否在最终结果的timings字段中返回各阶段耗时
+            time_budget_ms: 时间预算（毫秒），预算用完时不再等待尚未完成的指标，最终结果只基于已完成的指标
+                （partial为True，跳过的指标列在skipped_metrics中）；为None时不限时
+            
+        Yields:
+            事件字典：{"event": "start", ...}、每项指标一个{"event": "metric", ...}、
+            最后一个{"event": "result", "evaluation": ...}
+            
+        Raises:
+            ValueError: 请求了未注册的评估指标
+        """
+        metrics = self.metric_registry.resolve(metrics)
+        timer = StageTimer()
+        deadline = Deadline(time_budget_ms) if time_budget_ms is not None else None
+        started = time.perf_counter()
+        source_text = normalize_text(source_text)
+        translated_text = normalize_text(translated_text)
+        reference_texts = [normalize_text(text) for text in reference_texts]
+        
+        yield {"event": "start", "metrics": metrics}
+        
+        cache_key, cached_response = self._lookup_cache(
+            True, source_text, translated_text, reference_texts, source_language, target_language, domain, metrics
+        )
+        if cached_response is not None:
+            for name in metrics:
+                yield {
+                    "event": "metric",
+                    "metric": name,
+                    "score": self._metric_score(cached_response, name).score,
+                    "feedback": cached_response.detailed_feedback[name],
+                }
+            if include_timings:
+                timer.add("total", (time.perf_counter() - started) * 1000)
+                cached_response.timings = dict(timer.timings)
+            yield {"event": "result", "evaluation": cached_response.model_dump()}
+            return
+        
+        context = self.build_context(
+            source_text, translated_text, reference_texts, source_language, target_language, domain
+        )
+        terminology_mode = settings.TERMINOLOGY_EVALUATION_MODE
+        
+        # 所选指标共用的文本分析先在线程池中执行一次，各指标之后并发计算
+        # 复制当前上下文，使线程中的计时记录到本请求的计时器
+        # 截止时间同样随上下文复制到线程中，各指标开始前和耗时较长的循环中检查
+        loop = asyncio.get_running_loop()
+        with timer.activate(), deadline_scope(deadline):
+            await loop.run_in_executor(None, contextvars.copy_context().run, self._prepare_context, context, metrics)
+            pending = {
+                loop.run_in_executor(
+                    None, contextvars.copy_context().run,
+                    self._evaluate_metric_within_budget, name, context, terminology_mode
+                ): name
+                for name in metrics
+            }
+        results = {}
+        skipped = []
+        while pending:
+            done, _ = await asyncio.wait(
+                pending, timeout=deadline.remaining() if deadline is not None else None,
+                return_when=asyncio.FIRST_COMPLETED
             )
+            if not done:
+                # 时间预算用完，不再等待尚未完成的指标（线程中的计算在下一次检查截止时间时中止）
+                skipped.extend(pending.values())
+                break
+            for future in done:
+                name = pending.pop(future)
+                result = future.result()
+                if result is None:
+                    skipped.append(name)
+                    continue
+                score, feedback, extracted_terms = result
+                results[name] = result
+                event = {"event": "metric", "metric": name, "score": score, "feedback": feedback}
+                if extracted_terms:
+                    event["extracted_terms"] = extracted_terms
+                yield event
+        
+        results = {name: results[name] for name in metrics if name in results}
+        extracted_terms = results["terminology"][2] if "terminology" in results else None
+        response = self._build_response(results, extracted_terms)
+        if skipped:
+            response.partial = True
+            response.skipped_metrics = [name for name in metrics if name in skipped]
+            logger.warning(f"时间预算已用完，跳过评估指标: {', '.join(response.skipped_metrics)}")
         else:
-            # 默认使用术语库
-            terminology_score, terminology_feedback = self._evaluate_terminology(
-                source_text, translated_text, domain, source_language, target_language
+            # 不完整的结果不缓存
+            self._store_cache(
+                cache_key, response, metrics, terminology_mode, extracted_terms, domain, source_language, target_language
             )
-            extracted_terms = None
+        self._add_analysis_timings(timer, context)
+        timer.add("total", (time.perf_counter() - started) * 1000)
+        timing_service.record(timer.timings)
+        if include_timings:
+            response.timings = dict(timer.timings)
+        yield {"event": "result", "evaluation": response.model_dump()}
+
+    def _evaluate_metric(self,
+                         name: str,
+                         context: EvaluationContext,
+                         terminology_mode: str) -> Tuple[float, str, Optional[Dict[str, str]]]:
+        """
+        计算单项评估指标
         
-        # 3. 评估句式转换情况
-        sentence_score, sentence_feedback = self._evaluate_sentence_structure(
-            source_text, translated_text, source_language, target_language
-        )
+        Args:
+            name: 已注册的指标名称
+            context: 评估上下文
+            terminology_mode: 术语评估模式
+            
+        Returns:
+            得分、详细反馈和提取的术语对照表（仅术语指标在参考文本或AI提取模式下提供）
+        """
+        definition = self.metric_registry.get(name)
+        with timing_service.stage(name):
+            return definition.compute(context, terminology_mode)
+    
+    def _evaluate_metric_within_budget(self,
+                                       name: str,
+                                       context: EvaluationContext,
+                                       terminology_mode: str) -> Optional[Tuple[float, str, Optional[Dict[str, str]]]]:
+        """
+        在当前截止时间之前计算单项评估指标
+        
+        Returns:
+            同_evaluate_metric，开始前或计算过程中时间预算用完时返回None
+        """
+        try:
+            check_deadline()
+            return self._evaluate_metric(name, context, terminology_mode)
+        except DeadlineExceeded:
+            return None
+    
+    def _evaluate_terminology_by_mode(self,
+                                      context: EvaluationContext,
+                                      terminology_mode: str) -> Tuple[float, str, Optional[Dict[str, str]]]:
+        """根据术语评估模式选择术语评估方式"""
+        if terminology_mode == "reference" and context.references:
+            # 使用参考文本中的术语
+            return self._evaluate_terminology_from_reference(context)
+        if terminology_mode == "ai_extraction":
+            # 使用AI提取的术语
+            return self._evaluate_terminology_with_ai(context)
+        if terminology_mode == "cascade":
+            # 依次尝试术语库、参考文本和AI提取
+            return self._evaluate_terminology_cascade(context)
+        # 默认使用术语库
+        score, feedback = self._evaluate_terminology(context)
+        return score, feedback, None
+
+    def _evaluate_terminology_cascade(self, context: EvaluationContext) -> Tuple[float, str, Optional[Dict[str, str]]]:
+        """
+        级联术语评估：术语库覆盖了源文本的候选术语时按术语库评估，否则合并参考文本中提取的术语，
+        覆盖率或置信度仍然不足时才调用AI提取；AI提取失败时退回前两层中可用的结果
+        
+        Args:
+            context: 评估上下文
+            
+        Returns:
+            术语准确性得分、详细反馈和提取的术语对照表（按术语库评估时为None）
+        """
+        tier, terms = self._select_terminology_tier(context)
+        if tier == "ai_extraction":
+            if llm_service.completion_available():
+                score, feedback, extracted_terms = self._evaluate_terminology_with_ai(context)
+                if extracted_terms:
+                    self.record_terminology_tier("ai_extraction")
+                    return score, feedback, extracted_terms
+            # AI不可用或提取失败
+            self.record_terminology_tier("ai_fallback")
+            tier = "reference" if terms else "database"
+        else:
+            self.record_terminology_tier(tier)
+        
+        if tier == "reference":
+            translation_index = context.translation.term_index(terms.values())
+            score, feedback = self._score_reference_terminology(terms, translation_index, context.target_language)
+            return score, feedback, terms
+        score, feedback = self._evaluate_terminology(context)
+        return score, feedback, None
+
+    def _select_terminology_tier(self, context: EvaluationContext) -> Tuple[str, Dict[str, str]]:
+        """
+        选择级联术语评估使用的层级，只取决于源文本和参考译文，结果缓存在源文本的分析中
+        
+        Returns:
+            层级（database、reference或ai_extraction）和术语库与参考文本合并后的术语对照表
+            （术语库的译法优先，选择database时为空）
+        """
+        def select() -> Tuple[str, Dict[str, str]]:
+            with timing_service.stage("terminology.cascade"):
+                found_terms = self._find_source_terms(context) or []
+                coverage = self._term_coverage(context, [term_entry.source_term for term_entry in found_terms])
+                if coverage >= settings.TERMINOLOGY_CASCADE_MIN_COVERAGE:
+                    logger.info(f"级联术语评估: 术语库覆盖率{coverage:.2f}，使用术语库")
+                    return "database", {}
+                
+                merged_terms = {}
+                confidence = 0.0
+                if context.references:
+                    reference_terms, from_index = self._reference_terms_with_origin(context)
+                    if reference_terms:
+                        # 参考文本库对齐索引的术语对照有语料统计支持，位置启发式提取的对照置信度较低
+                        confidence = 1.0 if from_index else settings.TERMINOLOGY_CASCADE_HEURISTIC_CONFIDENCE
+                        merged_terms = dict(reference_terms)
+                        merged_terms.update({term_entry.source_term: term_entry.target_term for term_entry in found_terms})
+                        coverage = self._term_coverage(context, merged_terms)
+                if merged_terms and coverage >= settings.TERMINOLOGY_CASCADE_MIN_COVERAGE \
+                        and confidence >= settings.TERMINOLOGY_CASCADE_MIN_CONFIDENCE:
+                    logger.info(f"级联术语评估: 合并参考文本术语后覆盖率{coverage:.2f}，置信度{confidence:.2f}，使用参考文本")
+                    return "reference", merged_terms
+                
+                logger.info(f"级联术语评估: 覆盖率{coverage:.2f}，置信度{confidence:.2f}，需要AI提取")
+                return "ai_extraction", merged_terms
+        
+        tier, terms = context.source.get("terminology_tier", select)
+        return tier, dict(terms)
+
+    @staticmethod
+    def _term_coverage(context: EvaluationContext, source_terms: Any) -> float:
+        """
+        源文本候选术语（中文名词短语、英文多词短语）中与已知术语重叠的比例，源文本没有候选术语时为1
         
-        # 4. 评估语篇连贯性
-        discourse_score, discourse_feedback = self._evaluate_discourse(
-            translated_text, reference_texts
+        Args:
+            context: 评估上下文
+            source_terms: 已知的源语言术语
+            
+        Returns:
+            覆盖率（0-1）
+        """
+        source = context.source
+        if source.language == "zh":
+            candidates = source.get("term_candidates", lambda: chinese_noun_phrases(source.pos_tags))
+        else:
+            candidates = source.get(
+                "term_candidates", lambda: [term for term in english_term_candidates(source.text) if " " in term]
+            )
+        if not candidates:
+            return 1.0
+        known = [term.lower() for term in source_terms if term]
+        covered = sum(
+            1 for candidate in candidates
+            if any(term in candidate.lower() or candidate.lower() in term for term in known)
         )
+        return covered / len(candidates)
+
+    def record_terminology_tier(self, tier: str) -> None:
+        """记录级联术语评估使用的层级"""
+        with self._terminology_tier_lock:
+            self._terminology_tier_counts[tier] = self._terminology_tier_counts.get(tier, 0) + 1
+
+    def get_terminology_tier_stats(self) -> Dict[str, Any]:
+        """
+        获取级联术语评估各层的使用次数
         
-        # 5. 计算综合得分
-        weights = settings.EVALUATION_WEIGHTS
-        overall_score = (
-            weights["bleu"] * bleu_score +
-            weights["terminology"] * terminology_score +
-            weights["sentence_structure"] * sentence_score +
-            weights["discourse"] * discourse_score
+        Returns:
+            各层（database、reference、ai_extraction、ai_fallback）的次数、总次数和需要AI提取的比例
+        """
+        with self._terminology_tier_lock:
+            counts = {tier: self._terminology_tier_counts.get(tier, 0)
+                      for tier in ("database", "reference", "ai_extraction", "ai_fallback")}
+        total = sum(counts.values())
+        ai_calls = counts["ai_extraction"] + counts["ai_fallback"]
+        return {
+            "mode": settings.TERMINOLOGY_EVALUATION_MODE,
+            "counts": counts,
+            "total": total,
+            "ai_rate": ai_calls / total if total else 0.0,
+        }
+
+    def reset_terminology_tier_stats(self) -> None:
+        """清空级联术语评估的使用次数"""
+        with self._terminology_tier_lock:
+            self._terminology_tier_counts.clear()
+
+    def _lookup_cache(self,
+                      use_cache: bool,
+                      source_text: str,
+                      translated_text: str,
+                      reference_texts: List[str],
+                      source_language: str,
+                      target_language: str,
+                      domain: str,
+                      metrics: List[str]) -> Tuple[Optional[str], Optional[EvaluationResponse]]:
+        """
+        查找评估结果缓存
+        
+        Returns:
+            缓存键（未启用缓存时为None）和缓存的评估结果（未命中时为None）
+        """
+        if not use_cache or not settings.EVALUATION_CACHE_ENABLED:
+            return None, None
+        cache_key = self._cache_key(
+            source_text, translated_text, reference_texts, source_language, target_language, domain, metrics
         )
+        cached_response = evaluation_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info("命中评估结果缓存")
+        return cache_key, cached_response
+
+    def _store_cache(self,
+                     cache_key: Optional[str],
+                     response: EvaluationResponse,
+                     metrics: List[str],
+                     terminology_mode: str,
+                     extracted_terms: Optional[Dict[str, str]],
+                     domain: str,
+                     source_language: str,
+                     target_language: str) -> None:
+        """写入评估结果缓存，AI提取失败时的结果不缓存，下次请求重新调用"""
+        ai_failed = "terminology" in metrics and terminology_mode == "ai_extraction" and not extracted_terms
+        if cache_key is not None and not ai_failed:
+            evaluation_cache.put(cache_key, response, (domain, source_language, target_language))
+
+    def _build_response(self,
+                        results: Dict[str, Tuple],
+                        extracted_terms: Optional[Dict[str, str]] = None) -> EvaluationResponse:
+        """
+        根据各项指标的得分和反馈计算综合得分并构建评估响应
+
+        Args:
+            results: 指标名称 -> (得分, 详细反馈, ...)，按指标注册顺序排列
+            extracted_terms: 提取的术语对照表
+
+        Returns:
+            评估结果对象
+        """
+        definitions = [self.metric_registry.get(name) for name in results]
+        scores = {name: result[0] for name, result in results.items()}
+        feedback = {name: result[1] for name, result in results.items()}
         
-        # 准备各项评分的描述
-        bleu_description = f"BLEU分数为{bleu_score:.2f}，这表示译文与参考译文的匹配程度。{bleu_details}"
-        terminology_description = f"术语准确性得分为{terminology_score:.2f}，评估译文中专业术语的使用是否准确。"
-        sentence_description = f"句式转换得分为{sentence_score:.2f}，评估汉语主动句与英语被动句的转换是否适当。"
-        discourse_description = f"语篇连贯性得分为{discourse_score:.2f}，评估译文的逻辑连贯性和整体流畅度。"
+        # 综合得分为所选指标的加权平均值，权重按所选指标重新归一化
+        total_weight = sum(definition.weight for definition in definitions)
+        weighted_sum = sum(definition.weight * scores[definition.name] for definition in definitions)
+        overall_score = weighted_sum / total_weight if total_weight else 0.0
+        
+        labels = [definition.label for definition in definitions]
+        if not labels:
+            overall_description = "未完成任何评估指标，无法计算综合得分。"
+        elif len(labels) > 1:
+            overall_description = f"综合得分为{overall_score:.2f}，这是基于{'、'.join(labels[:-1])}和{labels[-1]}的加权平均值。"
+        else:
+            overall_description = f"综合得分为{overall_score:.2f}，仅根据{labels[0]}计算。"
         
         # 生成改进建议
-        suggestions = self._generate_suggestions(
-            bleu_score, terminology_score, sentence_score, discourse_score,
-            terminology_feedback, sentence_feedback, discourse_feedback
-        )
+        suggestions = self._generate_suggestions(scores, feedback)
         
-        # 构建评估响应
+        # 构建评估响应，内置指标写入对应字段，其他已注册指标写入additional_scores
+        metric_scores = {
+            definition.name: EvaluationScore(
+                score=scores[definition.name],
+                max_score=1.0,
+                description=definition.describe(scores[definition.name], feedback[definition.name])
+            )
+            for definition in definitions
+        }
         response = EvaluationResponse(
             overall_score=EvaluationScore(
                 score=overall_score,
                 max_score=1.0,
-                description=f"综合得分为{overall_score:.2f}，这是基于BLEU分数、术语准确性、句式转换和语篇连贯性的加权平均值。"
+                description=overall_description
             ),
-            bleu_score=EvaluationScore(
-                score=bleu_score,
-                max_score=1.0,
-                description=bleu_description
-            ),
-            terminology_score=EvaluationScore(
-                score=terminology_score,
-                max_score=1.0,
-                description=terminology_description
-            ),
-            sentence_structure_score=EvaluationScore(
-                score=sentence_score,
-                max_score=1.0,
-                description=sentence_description
-            ),
-            discourse_score=EvaluationScore(
-                score=discourse_score,
-                max_score=1.0,
-                description=discourse_description
-            ),
-            detailed_feedback={
-                "bleu": bleu_details,
-                "terminology": terminology_feedback,
-                "sentence_structure": sentence_feedback,
-                "discourse": discourse_feedback
-            },
+            **{f"{name}_score": metric_scores.pop(name) for name in METRICS if name in metric_scores},
+            detailed_feedback=feedback,
             suggestions=suggestions
         )
+        if metric_scores:
+            response.additional_scores = metric_scores
         
         # 如果有提取的术语，添加到响应中
         if extracted_terms:
             response.extracted_terms = extracted_terms
-            
+
         return response
     
-    def _calculate_bleu_score(self, translated_text: str, reference_texts: List[str], 
-                             source_language: str = "zh", target_language: str = "en") -> Tuple[float, str]:
+    @staticmethod
+    def _metric_score(response: EvaluationResponse, name: str) -> EvaluationScore:
+        """从评估结果中取出指定指标的得分"""
+        if name in METRICS:
+            return getattr(response, f"{name}_score")
+        return response.additional_scores[name]
+    
+    def _cache_key(self,
+                   source_text: str,
+                   translated_text: str,
+                   reference_texts: List[str],
+                   source_language: str,
+                   target_language: str,
+                   domain: str,
+                   metrics: List[str]) -> str:
         """
-        计算改进的BLEU分数，结合了句子级BLEU和语料级BLEU
+        生成评估结果缓存键，覆盖文本、语言、领域、所选指标、术语评估模式、权重以及术语库、对齐索引和中文分词词典的版本
+        
+        Args:
+            source_text: 规范化后的源文本
+            translated_text: 规范化后的译文
+            reference_texts: 规范化后的参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            metrics: 所选评估指标
+            
+        Returns:
+            缓存键
+        """
+        terminology_mode = settings.TERMINOLOGY_EVALUATION_MODE
+        return evaluation_cache.make_key({
+            "source_text": source_text,
+            "translated_text": translated_text,
+            "reference_texts": reference_texts,
+            "source_language": source_language,
+            "target_language": target_language,
+            "domain": domain,
+            "metrics": metrics,
+            "terminology_mode": terminology_mode,
+            "weights": {name: self.metric_registry.get(name).weight for name in metrics},
+            "terminology_version": data_service.get_terminology_version(domain, source_language, target_language),
+            "alignment_version": term_alignment_service.get_version() if terminology_mode in ("reference", "cascade") else None,
+            "tokenizer_version": user_dictionary_service.get_version() if "zh" in (source_language, target_language) else None,
+        })
+    
+    def build_context(self,
+                      source_text: str,
+                      translated_text: str,
+                      reference_texts: List[str],
+                      source_language: str = "zh",
+                      target_language: str = "en",
+                      domain: str = "materials_science") -> EvaluationContext:
+        """
+        创建评估上下文，源文本、译文和参考译文的分析结果在各项指标间共享
         
         Args:
+            source_text: 源文本
             translated_text: 待评估的翻译文本
             reference_texts: 参考译文列表
             source_language: 源语言代码
             target_language: 目标语言代码
+            domain: 领域名称
+            
+        Returns:
+            评估上下文
+        """
+        return EvaluationContext(
+            source_text, translated_text, reference_texts, source_language, target_language, domain
+        )
+    
+    def _calculate_bleu_score(self, context: EvaluationContext) -> Tuple[float, str]:
+        """
+        计算改进的BLEU分数，结合了句子级BLEU和语料级BLEU
+        
+        Args:
+            context: 评估上下文
             
         Returns:
             BLEU分数及详细说明
         """
+        translated_text = context.translated_text
+        reference_texts = context.reference_texts
         try:
             # 检查是否有参考文本
             if not reference_texts or not all(reference_texts):
                 logger.warning("无参考文本或参考文本为空，无法计算BLEU分数")
                 return 0.5, "未提供有效的参考译文，无法准确计算BLEU分数。提供了默认分数0.5。"
                 
-            # 0. 根据语言选择分词器
-            def tokenize_text(text, lang):
-                if lang == "zh":
-                    # 中文使用jieba分词
-                    return list(jieba.cut(text))
-                else:
-                    # 其他语言使用nltk分词
-                    return nltk.word_tokenize(text)
-            
             # 1. 使用sacrebleu计算语料级BLEU分数
-            corpus_bleu = self.bleu.corpus_score([translated_text], [[ref] for ref in reference_texts])
-            corpus_score = corpus_bleu.score / 100.0  # 归一化到0-1范围
+            with timing_service.stage("bleu.corpus"):
+                corpus_bleu = self.bleu.corpus_score([translated_text], [[ref] for ref in reference_texts])
+                corpus_score = corpus_bleu.score / 100.0  # 归一化到0-1范围
             
             # 2. 使用nltk的sentence_bleu计算句子级BLEU分数(考虑短句的情况)
-            smoothing = SmoothingFunction()
-            
-            # 分句
-            translated_sentences = nltk.sent_tokenize(translated_text)
+            # 分句（分词结果来自共享的文本分析，每句只分词一次）
+            translated_sentences = context.translation.sentences
             sentence_scores = []
-            
-            # 平滑函数选择
-            smooth_methods = [
-                smoothing.method1,  # 为零计数添加one
-                smoothing.method2,  # 为零计数添加epsilon
-                smoothing.method3,  # 为零计数添加平滑值
-                smoothing.method4,  # NIST几何加权平均
-            ]
-            
-            # 使用每种平滑方法并选择得分最合理的
-            all_method_scores = []
+            whole_text_scores = []
             
             # 对每个参考翻译，计算句子级别的BLEU
-            for ref_text in reference_texts:
-                ref_sentences = nltk.sent_tokenize(ref_text)
-                
+            for reference in context.references:
                 # 如果句子数量差异太大，尝试基于段落或全文进行对比
-                if abs(len(translated_sentences) - len(ref_sentences)) > min(len(translated_sentences), len(ref_sentences)) * 0.5:
+                if self._sentence_counts_differ(len(translated_sentences), len(reference.sentences)):
                     # 使用整个文本进行比较，而不是逐句比较
-                    trans_tokens = tokenize_text(translated_text, target_language)
-                    ref_tokens = tokenize_text(ref_text, target_language)
-                    
-                    # 对于每种平滑方法计算分数
-                    for method in smooth_methods:
-                        sent_score = sentence_bleu([ref_tokens], trans_tokens, smoothing_function=method)
-                        all_method_scores.append(sent_score)
+                    with timing_service.stage("bleu.whole_text"):
+                        whole_text_scores.extend(
+                            self._whole_text_bleu_scores(context.translation.tokens, reference.tokens)
+                        )
                 else:
                     # 句子数量相近，进行逐句比较
-                    for i, trans_sent in enumerate(translated_sentences):
-                        # 找到最匹配的参考句子
-                        best_score = 0
-                        
-                        for j, ref_sent in enumerate(ref_sentences):
-                            # 对句子分词
-                            trans_tokens = tokenize_text(trans_sent, target_language)
-                            ref_tokens = tokenize_text(ref_sent, target_language)
-                            
-                            # 对于每种平滑方法计算分数
-                            for method in smooth_methods:
-                                sent_score = sentence_bleu([ref_tokens], trans_tokens, smoothing_function=method)
-                                if sent_score > best_score:
-                                    best_score = sent_score
-                        
-                        sentence_scores.append(best_score)
-            
-            # 选择得分
-            if all_method_scores:
-                # 排除极端值后取平均
-                all_method_scores.sort()
-                trimmed_scores = all_method_scores[1:-1] if len(all_method_scores) > 3 else all_method_scores
-                avg_method_score = sum(trimmed_scores) / len(trimmed_scores)
-                all_method_scores = [avg_method_score]
-            
-            # 计算句子级BLEU的平均值
-            avg_sentence_score = sum(sentence_scores) / len(sentence_scores) if sentence_scores else (
-                sum(all_method_scores) / len(all_method_scores) if all_method_scores else 0.0
+                    with timing_service.stage("bleu.sentence"):
+                        for trans_tokens in context.translation.sentence_tokens:
+                            check_deadline()
+                            sentence_scores.append(self._best_sentence_bleu(trans_tokens, reference))
+            
+            # 3. 结合两种分数
+            return self._combine_bleu_scores(
+                corpus_score, sentence_scores, whole_text_scores, len(translated_text.split())
             )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"计算BLEU分数时出错: {str(e)}")
+            return 0.0, "计算BLEU分数时出错，无法评估译文与参考译文的匹配程度。"
+    
+    @staticmethod
+    def _sentence_counts_differ(translated_count: int, reference_count: int) -> bool:
+        """判断译文与参考译文的句子数量是否相差过大，相差过大时按全文而不是逐句计算BLEU"""
+        return abs(translated_count - reference_count) > min(translated_count, reference_count) * 0.5
+    
+    def _whole_text_bleu_scores(self, trans_tokens: List[str], ref_tokens: List[str]) -> List[float]:
+        """
+        将整篇译文作为一个句子，计算各平滑方法下的BLEU分数
+        
+        Args:
+            trans_tokens: 译文全文分词结果
+            ref_tokens: 参考译文全文分词结果
             
-            # 3. 结合两种分数，给予较短文本更多的句子级BLEU权重
-            # 计算文本长度因子
-            text_length = len(translated_text.split())
-            length_factor = min(1.0, text_length / 100.0)  # 长度因子，最大为1
-            
-            # 短文本给句子级BLEU更高权重，长文本给语料级BLEU更高权重
-            corpus_weight = 0.3 + 0.4 * length_factor  # 0.3到0.7
-            sentence_weight = 1.0 - corpus_weight      # 0.7到0.3
+        Returns:
+            每种平滑方法的分数
+        """
+        return [
+            nltk_bleu.sentence_bleu([ref_tokens], trans_tokens, smoothing_function=method)
+            for method in self.smooth_methods
+        ]
+    
+    def _best_sentence_bleu(self, trans_tokens: List[str], reference: DocumentAnalysis) -> float:
+        """
+        找到与译文句子最匹配的参考句子，返回所有参考句子和平滑方法中的最高分
+        
+        每对句子的n-gram匹配数只统计一次，四种平滑方法共用，结果与逐一调用sentence_bleu相同。
+        
+        Args:
+            trans_tokens: 译文句子的分词结果
+            reference: 参考译文的分析结果（逐句分词及n-gram计数）
             
-            final_score = corpus_weight * corpus_score + sentence_weight * avg_sentence_score
+        Returns:
+            最高的句子级BLEU分数
+        """
+        hypothesis_counts = count_ngrams(trans_tokens)
+        totals = order_totals(hypothesis_counts)
+        best_score = 0
+        for ref_tokens, ref_counts in zip(reference.sentence_tokens, reference.sentence_ngrams):
+            matches = clipped_matches(hypothesis_counts, ref_counts)
+            if not matches[0]:
+                # 没有匹配的单词时各平滑方法的分数均为0
+                continue
+            # 对于每种平滑方法计算分数
+            for method in self.smooth_methods:
+                sent_score = nltk_bleu_from_stats(matches, totals, len(trans_tokens), len(ref_tokens), method)
+                if sent_score > best_score:
+                    best_score = sent_score
+        return best_score
+    
+    def _combine_bleu_scores(self,
+                             corpus_score: float,
+                             sentence_scores: List[float],
+                             whole_text_scores: List[float],
+                             text_length: int) -> Tuple[float, str]:
+        """
+        结合语料级BLEU和句子级BLEU，给予较短文本更多的句子级BLEU权重
+        
+        Args:
+            corpus_score: 语料级BLEU分数（0-1）
+            sentence_scores: 逐句比较得到的各句最高分
+            whole_text_scores: 按全文比较得到的各平滑方法分数
+            text_length: 译文词数
             
-            # 4. 确保分数在0-1范围内
-            final_score = max(0.0, min(1.0, final_score))
+        Returns:
+            BLEU分数及详细说明
+        """
+        # 选择得分
+        all_method_scores = list(whole_text_scores)
+        if all_method_scores:
+            # 排除极端值后取平均
+            all_method_scores.sort()
+            trimmed_scores = all_method_scores[1:-1] if len(all_method_scores) > 3 else all_method_scores
+            avg_method_score = sum(trimmed_scores) / len(trimmed_scores)
+            all_method_scores = [avg_method_score]
+        
+        # 计算句子级BLEU的平均值
+        avg_sentence_score = sum(sentence_scores) / len(sentence_scores) if sentence_scores else (
+            sum(all_method_scores) / len(all_method_scores) if all_method_scores else 0.0
+        )
+        
+        # 计算文本长度因子
+        length_factor = min(1.0, text_length / 100.0)  # 长度因子，最大为1
+        
+        # 短文本给句子级BLEU更高权重，长文本给语料级BLEU更高权重
+        corpus_weight = 0.3 + 0.4 * length_factor  # 0.3到0.7
+        sentence_weight = 1.0 - corpus_weight      # 0.7到0.3
+        
+        final_score = corpus_weight * corpus_score + sentence_weight * avg_sentence_score
+        
+        # 确保分数在0-1范围内
+        final_score = max(0.0, min(1.0, final_score))
+        
+        # 有时文本非常短且与参考文本差异很大时，分数可能极低，设置一个最低阈值
+        if text_length < 20 and final_score < 0.1:
+            final_score = max(0.1, final_score)
+        
+        # 根据分数给出说明
+        if final_score >= 0.8:
+            detail = "译文与参考译文高度匹配，翻译质量优秀。"
+        elif final_score >= 0.6:
+            detail = "译文与参考译文匹配度良好，翻译质量不错。"
+        elif final_score >= 0.4:
+            detail = "译文与参考译文匹配度一般，有提升空间。"
+        else:
+            detail = "译文与参考译文差异较大，建议检查并修改。"
             
-            # 有时文本非常短且与参考文本差异很大时，分数可能极低，设置一个最低阈值
-            if text_length < 20 and final_score < 0.1:
-                final_score = max(0.1, final_score)
+        # 添加技术细节
+        detail += f" (语料级BLEU: {corpus_score:.2f}, 句子级BLEU: {avg_sentence_score:.2f}, 文本长度: {text_length}词)"
             
-            # 根据分数给出说明
-            if final_score >= 0.8:
-                detail = "译文与参考译文高度匹配，翻译质量优秀。"
-            elif final_score >= 0.6:
-                detail = "译文与参考译文匹配度良好，翻译质量不错。"
-            elif final_score >= 0.4:
-                detail = "译文与参考译文匹配度一般，有提升空间。"
-            else:
-                detail = "译文与参考译文差异较大，建议检查并修改。"
-                
-            # 添加技术细节
-            detail += f" (语料级BLEU: {corpus_score:.2f}, 句子级BLEU: {avg_sentence_score:.2f}, 文本长度: {text_length}词)"
-                
-            return final_score, detail
-        except Exception as e:
-            logger.error(f"计算BLEU分数时出错: {str(e)}")
-            return 0.0, "计算BLEU分数时出错，无法评估译文与参考译文的匹配程度。"
+        return final_score, detail
     
-    def _evaluate_terminology(self, 
-                             source_text: str, 
-                             translated_text: str,
-                             domain: str,
-                             source_language: str,
-                             target_language: str) -> Tuple[float, str]:
+    def _evaluate_terminology(self, context: EvaluationContext) -> Tuple[float, str]:
         """
         使用术语库评估术语准确性
         
         Args:
-            source_text: 源文本
-            translated_text: 待评估的翻译文本
-            domain: 领域名称
-            source_language: 源语言代码
-            target_language: 目标语言代码
+            context: 评估上下文
             
         Returns:
             术语准确性得分及详细反馈
         """
-        # 加载领域术语库
-        terminology = data_service.load_terminology(domain, source_language, target_language)
+        domain = context.domain
         
-        if not terminology:
+        with timing_service.stage("terminology.find_terms"):
+            found_terms = self._find_source_terms(context)
+        
+        if found_terms is None:
             logger.warning(f"未找到领域{domain}的术语库，使用默认评分0.5")
             return 0.5, f"未找到相关领域({domain})的术语库，无法评估术语准确性。"
         
-        # 在源文本中查找术语
-        found_terms = []
-        for term_entry in terminology:
-            # 使用正则表达式确保匹配完整的词，而不是部分词
-            if source_language == "zh":
-                # 中文不需要词边界匹配
-                pattern = re.compile(re.escape(term_entry.source_term))
-            else:
-                # 英文需要词边界匹配
-                pattern = re.compile(r'\b' + re.escape(term_entry.source_term) + r'\b', re.IGNORECASE)
-                
-            if pattern.search(source_text):
-                found_terms.append(term_entry)
-        
         if not found_terms:
-            logger.info(f"源文本中未发现术语库中的专业术语，术语库共有{len(terminology)}个术语")
+            logger.info("源文本中未发现术语库中的专业术语")
             return 0.8, "源文本中未发现术语库中的专业术语，无需检查术语翻译准确性。"
         
+        # 对译文只建立一次索引，之后每个术语的检查都是哈希查找
+        translation_index = context.translation.term_index([term_entry.target_term for term_entry in found_terms])
+        
+        return self._score_terminology(found_terms, translation_index, context.target_language)
+    
+    def _find_source_terms(self, context: EvaluationContext) -> Optional[List[Any]]:
+        """
+        加载领域术语库并查找源文本中出现的术语
+        
+        Args:
+            context: 评估上下文
+            
+        Returns:
+            源文本中出现的术语条目列表，领域术语库不存在时返回None
+        """
+        domain = context.domain
+        source_language = context.source_language
+        target_language = context.target_language
+        
+        # 加载领域术语库
+        terminology = data_service.load_terminology(domain, source_language, target_language)
+        if not terminology:
+            return None
+        
+        # 在源文本中查找术语（使用缓存的多模式自动机，单次扫描即可找出全部术语）
+        term_indices = context.source.get(
+            f"terms:{domain}:{target_language}",
+            lambda: data_service.find_terms_in_text(context.source_text, domain, source_language, target_language)
+        )
+        return [terminology[index] for index in term_indices]
+    
+    def _score_terminology(self, found_terms: List[Any], translation_index: Any, target_language: str) -> Tuple[float, str]:
+        """
+        检查术语库术语在译文中的使用情况并评分
+        
+        Args:
+            found_terms: 源文本中出现的术语条目
+            translation_index: 译文索引，提供contains和word_match_ratio查询
+            target_language: 目标语言代码
+            
+        Returns:
+            术语准确性得分及详细反馈
+        """
         # 评估术语翻译准确性
         correct_terms = 0
         incorrect_terms = []
         partially_correct_terms = []
         
         for term_entry in found_terms:
-            # 检查目标术语是否在译文中
-            if target_language == "zh":
-                # 中文不需要词边界匹配
-                pattern = re.compile(re.escape(term_entry.target_term))
-            else:
-                # 英文需要词边界匹配，且忽略大小写
-                pattern = re.compile(r'\b' + re.escape(term_entry.target_term) + r'\b', re.IGNORECASE)
-            
-            if pattern.search(translated_text):
+            # 检查目标术语是否在译文中（英文按词边界匹配且忽略大小写）
+            if translation_index.contains(term_entry.target_term):
                 correct_terms += 1
             else:
                 # 检查是否部分匹配
                 # 将术语拆分为单词，检查是否有部分单词匹配
                 if target_language != "zh":
-                    words = term_entry.target_term.lower().split()
-                    matched_words = 0
-                    for word in words:
-                        if re.search(r'\b' + re.escape(word) + r'\b', translated_text.lower()):
-                            matched_words += 1
+                    matched_words, word_count = translation_index.word_match_ratio(term_entry.target_term)
                     
                     # 如果有超过半数的单词匹配，认为是部分正确
-                    if matched_words > 0 and matched_words / len(words) >= 0.5:
-                        partially_correct_terms.append((term_entry, matched_words / len(words)))
+                    if matched_words > 0 and matched_words / word_count >= 0.5:
+                        partially_correct_terms.append((term_entry, matched_words / word_count))
                         # 部分正确的术语按50%计入正确数
                         correct_terms += 0.5
                         continue
@@ -385,64 +1153,96 @@ class EvaluationService:
         
         return score, feedback
         
-    def _evaluate_terminology_from_reference(self,
-                                            source_text: str,
-                                            translated_text: str,
-                                            reference_text: str,
-                                            source_language: str,
-                                            target_language: str) -> Tuple[float, str, Dict[str, str]]:
+    def _evaluate_terminology_from_reference(self, context: EvaluationContext) -> Tuple[float, str, Dict[str, str]]:
         """
-        从参考文本中提取术语并评估术语准确性
+        从参考文本中提取术语并评估术语准确性，使用第一篇参考译文
         
         Args:
-            source_text: 源文本
-            translated_text: 待评估的翻译文本
-            reference_text: 参考译文
-            source_language: 源语言代码
-            target_language: 目标语言代码
+            context: 评估上下文
             
         Returns:
             术语准确性得分、详细反馈和提取的术语对照表
         """
-        # 从源文本和参考文本中提取术语对照表
-        extracted_terms = self._extract_terms_from_texts(source_text, reference_text, source_language, target_language)
+        with timing_service.stage("terminology.extract"):
+            extracted_terms = self._extract_reference_terms(context)
         
         if not extracted_terms:
             logger.warning("未能从参考文本中提取出术语对照，使用默认评分0.5")
             return 0.5, "未能从参考文本中提取出术语对照，无法评估术语准确性。", {}
         
+        # 对译文只建立一次索引，之后每个术语的检查都是哈希查找
+        translation_index = context.translation.term_index(extracted_terms.values())
+        
+        score, feedback = self._score_reference_terminology(extracted_terms, translation_index, context.target_language)
+        return score, feedback, extracted_terms
+    
+    def _extract_reference_terms(self, context: EvaluationContext) -> Dict[str, str]:
+        """
+        从源文本和第一篇参考译文中提取术语对照表：优先查参考文本库的术语对齐索引，
+        索引中没有可用的对照时再按位置启发式从当前文本对中提取
+        
+        Args:
+            context: 评估上下文
+            
+        Returns:
+            术语对照表 {源术语: 目标术语}
+        """
+        if not context.references:
+            return {}
+        return dict(self._reference_terms_with_origin(context)[0])
+    
+    def _reference_terms_with_origin(self, context: EvaluationContext) -> Tuple[Dict[str, str], bool]:
+        """
+        提取参考文本术语对照表，并说明是否来自参考文本库的术语对齐索引
+        
+        Returns:
+            术语对照表，以及是否来自对齐索引（否则为按位置启发式提取）
+        """
+        def extract() -> Tuple[Dict[str, str], bool]:
+            extracted_terms = term_alignment_service.lookup(context.source, context.references[0])
+            if extracted_terms:
+                return extracted_terms, True
+            return self._extract_terms_from_texts(context.source, context.references[0]), False
+        
+        # 源文本与参考译文只在同一上下文（及其with_translation派生的上下文）中配对，
+        # 提取结果缓存在源文本的分析中，同一源文本的多份译文只提取一次
+        return context.source.get("reference_terms", extract)
+    
+    def _score_reference_terminology(self,
+                                     extracted_terms: Dict[str, str],
+                                     translation_index: Any,
+                                     target_language: str) -> Tuple[float, str]:
+        """
+        检查从参考文本中提取的术语在译文中的使用情况并评分
+        
+        Args:
+            extracted_terms: 术语对照表 {源术语: 目标术语}
+            translation_index: 译文索引，提供contains和word_match_ratio查询
+            target_language: 目标语言代码
+            
+        Returns:
+            术语准确性得分及详细反馈
+        """
         # 评估术语翻译准确性
         correct_terms = 0
         incorrect_terms = []
         partially_correct_terms = []
         
         for source_term, target_term in extracted_terms.items():
-            # 检查目标术语是否在译文中
-            if target_language == "zh":
-                # 中文不需要词边界匹配
-                pattern = re.compile(re.escape(target_term))
-            else:
-                # 英文需要词边界匹配，且忽略大小写
-                pattern = re.compile(r'\b' + re.escape(target_term) + r'\b', re.IGNORECASE)
-            
-            if pattern.search(translated_text):
+            # 检查目标术语是否在译文中（英文按词边界匹配且忽略大小写）
+            if translation_index.contains(target_term):
                 correct_terms += 1
             else:
                 # 检查是否部分匹配
                 # 将术语拆分为单词，检查是否有部分单词匹配
                 if target_language != "zh":
-                    words = target_term.lower().split()
-                    if len(words) > 1:  # 多个单词的术语才检查部分匹配
-                        matched_words = 0
-                        for word in words:
-                            if len(word) > 2 and re.search(r'\b' + re.escape(word) + r'\b', translated_text.lower()):
-                                matched_words += 1
-                        
+                    matched_words, word_count = translation_index.word_match_ratio(target_term, min_word_length=2)
+                    if word_count > 1:  # 多个单词的术语才检查部分匹配
                         # 如果有超过半数的单词匹配，认为是部分正确
-                        if matched_words > 0 and matched_words / len(words) >= 0.5:
-                            partially_correct_terms.append((source_term, target_term, matched_words / len(words)))
+                        if matched_words > 0 and matched_words / word_count >= 0.5:
+                            partially_correct_terms.append((source_term, target_term, matched_words / word_count))
                             # 部分正确的术语按比例计入正确数
-                            correct_terms += matched_words / len(words)
+                            correct_terms += matched_words / word_count
                             continue
                 
                 incorrect_terms.append((source_term, target_term))
@@ -473,91 +1273,38 @@ class EvaluationService:
             for source_term, target_term, match_ratio in partially_correct_terms:
                 feedback += f"\n- '{source_term}'的参考译法是'{target_term}'，当前译文中部分匹配。"
         
-        return score, feedback, extracted_terms
+        return score, feedback
         
-    def _evaluate_terminology_with_ai(self,
-                                    source_text: str,
-                                    translated_text: str,
-                                    domain: str,
-                                    source_language: str,
-                                    target_language: str) -> Tuple[float, str, Dict[str, str]]:
+    def _evaluate_terminology_with_ai(self, context: EvaluationContext) -> Tuple[float, str, Dict[str, str]]:
         """
         使用AI提取并评估术语准确性
         
         Args:
-            source_text: 源文本
-            translated_text: 待评估的翻译文本
-            domain: 领域名称
-            source_language: 源语言代码
-            target_language: 目标语言代码
+            context: 评估上下文
             
         Returns:
             术语准确性得分、详细反馈和提取的术语对照表
         """
         try:
-            # 构建AI提示语，提取专业术语
-            prompt = f"""
-请从以下{source_language}源文本和{target_language}译文中，提取专业术语及其对应的翻译。
-输出格式为JSON，格式为：{{"源语言术语": "目标语言术语", ...}}
-只返回JSON格式，不要添加其他说明。
-
-源文本（{source_language}）:
-{source_text}
-
-译文（{target_language}）:
-{translated_text}
-            """
-            
-            # 调用LLM服务提取术语（同步方式）
-            logger.info("调用AI提取术语...")
-            import httpx
-            import json
-            
-            # 创建同步客户端调用
-            client = httpx.Client(timeout=60.0)
-            try:
-                # 获取llm服务同步获取AI完成结果
-                result = client.post(
-                    f"{settings.CUSTOM_API_BASE_URL}/{settings.CUSTOM_API_VERSION}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {settings.CUSTOM_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "gpt-3.5-turbo",
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.3
-                    }
-                )
+            if not llm_service.completion_available():
+                # 未配置自定义API时没有可调用的AI，按未提取到术语处理
+                logger.warning("未启用自定义API，无法进行AI术语提取")
+                extracted_terms = {}
+            else:
+                # 源文本和译文按句对齐分块，并发提取后合并（同步调用）
+                logger.info("调用AI提取术语...")
+                with timing_service.stage("terminology.ai_request"):
+                    extraction = term_extraction_service.extract_sync(
+                        context.source_text, context.translated_text,
+                        context.source_language, context.target_language
+                    )
+                if extraction["failed_chunks"] == extraction["chunks"]:
+                    # 时间预算用完导致的失败按跳过处理
+                    check_deadline()
+                    return 0.5, "AI API调用异常，无法提取术语。", {}
                 
-                if result.status_code == 200:
-                    result_json = result.json()
-                    content = result_json["choices"][0]["message"]["content"]
-                else:
-                    logger.error(f"AI API调用失败: {result.status_code} - {result.text}")
-                    return 0.5, "AI提取术语失败，无法评估术语准确性。", {}
-            except Exception as e:
-                logger.error(f"AI API调用异常: {str(e)}")
-                return 0.5, "AI API调用异常，无法提取术语。", {}
-            finally:
-                client.close()
-            
-            # 解析AI返回的JSON
-            try:
-                # 尝试从内容中提取JSON部分
-                import re
-                json_match = re.search(r'({[\s\S]*})', content)
-                if json_match:
-                    content = json_match.group(1)
-                    
-                extracted_terms = json.loads(content)
+                extracted_terms = extraction["terms"]
                 logger.info(f"AI提取到{len(extracted_terms)}个术语")
-            except Exception as e:
-                logger.error(f"解析AI返回的术语JSON失败: {str(e)}")
-                logger.error(f"原始响应: {content}")
-                return 0.5, "AI提取术语失败，无法评估术语准确性。", {}
             
             # 评估术语翻译准确性 - 与译文比对
             correct_terms = len(extracted_terms)  # 默认所有术语都是正确的，因为是从译文中提取的
@@ -578,57 +1325,43 @@ class EvaluationService:
                 
             return score, feedback, extracted_terms
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"AI评估术语准确性时出错: {str(e)}")
             return 0.5, "AI评估术语准确性时出错，无法评估术语准确性。", {}
     
     def _extract_terms_from_texts(self, 
-                               source_text: str, 
-                               reference_text: str,
-                               source_language: str,
-                               target_language: str) -> Dict[str, str]:
+                               source: DocumentAnalysis, 
+                               reference: DocumentAnalysis) -> Dict[str, str]:
         """
         从源文本和参考文本中提取可能的术语对照表
         
         Args:
-            source_text: 源文本
-            reference_text: 参考译文
-            source_language: 源语言代码
-            target_language: 目标语言代码
+            source: 源文本的分析结果
+            reference: 参考译文的分析结果
             
         Returns:
             提取的术语对照表 {源术语: 目标术语}
         """
+        source_text = source.text
+        reference_text = reference.text
+        source_language = source.language
+        target_language = reference.language
+        
         # 改进的术语提取实现
         extracted_terms = {}
         
         # 使用不同策略根据语言对
         if source_language == "zh" and target_language == "en":
             # 1. 从中文提取可能的术语
-            # 使用jieba提取名词短语
-            import jieba.posseg as pseg
-            words = pseg.cut(source_text)
-            
-            # 找出所有名词和名词短语
-            nouns = []
-            current_phrase = []
-            
-            for word, flag in words:
-                # 名词标记为 'n', 'ng', 'nz', 'vn'等
-                if flag.startswith('n') or flag == 'vn':
-                    current_phrase.append(word)
-                elif current_phrase:
-                    if len(''.join(current_phrase)) >= 2:  # 至少2个字符
-                        nouns.append(''.join(current_phrase))
-                    current_phrase = []
-            
-            # 添加最后一个短语
-            if current_phrase and len(''.join(current_phrase)) >= 2:
-                nouns.append(''.join(current_phrase))
+            # 使用jieba词性标注结果提取名词短语（至少2个字符）
+            nouns = chinese_noun_phrases(source.pos_tags)
             
             # 添加更长的名词短语（通过正则匹配连续的2-5个中文字符）
             longer_nouns = re.findall(r'[\u4e00-\u9fa5]{2,5}', source_text)
-            nouns.extend([n for n in longer_nouns if n not in nouns])
+            seen_nouns = set(nouns)
+            nouns.extend([n for n in longer_nouns if n not in seen_nouns])
             
             # 2. 从英文参考文本中提取可能的术语
             # 提取专业术语常见模式（首字母大写的短语、包含连字符的词等）
@@ -642,64 +1375,17 @@ class EvaluationService:
             # 按长度排序中文术语（优先匹配长术语）
             nouns.sort(key=len, reverse=True)
             
-            # 尝试建立中英文术语对应关系
-            for noun in nouns:
-                if len(noun) < 2:  # 跳过太短的词
-                    continue
-                    
-                # 在源文本中查找该名词的位置
-                noun_positions = [m.start() for m in re.finditer(re.escape(noun), source_text)]
-                if not noun_positions:
-                    continue
-                    
-                # 对每个英文术语尝试匹配
-                best_match = None
-                max_score = 0
-                
-                for eng_term in english_terms:
-                    if len(eng_term) < 3:  # 跳过太短的英文词
-                        continue
-                        
-                    # 计算相似度得分
-                    # 1. 在参考文本中的位置是否接近
-                    eng_positions = [m.start() for m in re.finditer(re.escape(eng_term), reference_text)]
-                    if not eng_positions:
-                        continue
-                        
-                    # 计算相对位置相似度
-                    position_scores = []
-                    for zh_pos in noun_positions:
-                        zh_rel_pos = zh_pos / len(source_text)
-                        for eng_pos in eng_positions:
-                            eng_rel_pos = eng_pos / len(reference_text)
-                            # 计算相对位置差异
-                            pos_diff = abs(zh_rel_pos - eng_rel_pos)
-                            # 转换为相似度分数 (0-1)
-                            pos_score = max(0, 1 - pos_diff * 2)
-                            position_scores.append(pos_score)
-                    
-                    if not position_scores:
-                        continue
-                        
-                    # 使用最高的位置相似度
-                    position_score = max(position_scores)
-                    
-                    # 2. 单词长度比例
-                    length_ratio = min(len(noun) / 2, len(eng_term) / 2) / max(len(noun) / 2, len(eng_term) / 2)
-                    
-                    # 综合得分
-                    score = position_score * 0.7 + length_ratio * 0.3
-                    
-                    if score > max_score and score > 0.5:  # 设置阈值
-                        max_score = score
-                        best_match = eng_term
-                
-                # 如果找到最佳匹配，添加到术语对照表
-                if best_match:
-                    extracted_terms[noun] = best_match
-                    # 从候选列表中移除，避免重复使用
-                    if best_match in english_terms:
-                        english_terms.remove(best_match)
+            # 一次扫描得到所有候选在各自文本中的出现位置，再按最近位置和长度比例打分
+            extracted_terms = match_term_candidates(
+                queries=nouns,
+                query_index=OccurrenceIndex(source_text, nouns),
+                candidates=english_terms,
+                candidate_index=OccurrenceIndex(reference_text, english_terms),
+                query_length_unit=2,
+                candidate_length_unit=2,
+                min_query_length=2,
+                min_candidate_length=3
+            )
         
         elif source_language == "en" and target_language == "zh":
             # 英译中的情况，与中译英类似但角色互换
@@ -708,158 +1394,101 @@ class EvaluationService:
             hyphenated_words = re.findall(r'\b\w+(?:-\w+)+\b', source_text)
             tech_words = re.findall(r'\b[a-z]+(?:ics|ity|tion|sion|ment|logy|graphy|meter)\b', source_text, re.IGNORECASE)
             
-            # 合并所有英文术语
+            # 合并所有英文术语（去重并保持出现顺序）
             english_terms = capitalized_patterns + hyphenated_words + tech_words
-            english_terms = list(set(english_terms))  # 去重
+            english_terms = list(dict.fromkeys(english_terms))
             
             # 从中文提取术语
-            import jieba.posseg as pseg
-            words = pseg.cut(reference_text)
-            
-            nouns = []
-            current_phrase = []
-            
-            for word, flag in words:
-                if flag.startswith('n') or flag == 'vn':
-                    current_phrase.append(word)
-                elif current_phrase:
-                    if len(''.join(current_phrase)) >= 2:
-                        nouns.append(''.join(current_phrase))
-                    current_phrase = []
-            
-            if current_phrase and len(''.join(current_phrase)) >= 2:
-                nouns.append(''.join(current_phrase))
+            nouns = chinese_noun_phrases(reference.pos_tags)
             
             # 添加更长的名词短语
             longer_nouns = re.findall(r'[\u4e00-\u9fa5]{2,5}', reference_text)
-            nouns.extend([n for n in longer_nouns if n not in nouns])
+            seen_nouns = set(nouns)
+            nouns.extend([n for n in longer_nouns if n not in seen_nouns])
             
             # 按长度排序英文术语
             english_terms.sort(key=len, reverse=True)
             
-            # 尝试匹配
-            for eng_term in english_terms:
-                if len(eng_term) < 3:  # 跳过太短的词
-                    continue
-                    
-                # 在源文本中查找位置
-                eng_positions = [m.start() for m in re.finditer(re.escape(eng_term), source_text, re.IGNORECASE)]
-                if not eng_positions:
-                    continue
-                    
-                # 对每个中文名词尝试匹配
-                best_match = None
-                max_score = 0
-                
-                for noun in nouns:
-                    if len(noun) < 2:
-                        continue
-                        
-                    # 计算位置相似度
-                    noun_positions = [m.start() for m in re.finditer(re.escape(noun), reference_text)]
-                    if not noun_positions:
-                        continue
-                        
-                    position_scores = []
-                    for eng_pos in eng_positions:
-                        eng_rel_pos = eng_pos / len(source_text)
-                        for zh_pos in noun_positions:
-                            zh_rel_pos = zh_pos / len(reference_text)
-                            pos_diff = abs(eng_rel_pos - zh_rel_pos)
-                            pos_score = max(0, 1 - pos_diff * 2)
-                            position_scores.append(pos_score)
-                    
-                    if not position_scores:
-                        continue
-                        
-                    position_score = max(position_scores)
-                    length_ratio = min(len(eng_term) / 3, len(noun) / 2) / max(len(eng_term) / 3, len(noun) / 2)
-                    
-                    score = position_score * 0.7 + length_ratio * 0.3
-                    
-                    if score > max_score and score > 0.5:
-                        max_score = score
-                        best_match = noun
-                
-                if best_match:
-                    extracted_terms[eng_term] = best_match
-                    if best_match in nouns:
-                        nouns.remove(best_match)
+            # 尝试匹配（英文术语在源文本中的位置忽略大小写）
+            extracted_terms = match_term_candidates(
+                queries=english_terms,
+                query_index=OccurrenceIndex(source_text, english_terms, ignore_case=True),
+                candidates=nouns,
+                candidate_index=OccurrenceIndex(reference_text, nouns),
+                query_length_unit=3,
+                candidate_length_unit=2,
+                min_query_length=3,
+                min_candidate_length=2
+            )
         
         # 如果提取的术语少于2个，尝试更简单的基于位置的匹配
         if len(extracted_terms) < 2:
             # 简单实现：基于位置匹配
             if source_language == "zh" and target_language == "en":
-                # 查找中文中较长的词语
-                zh_words = list(jieba.cut(source_text))
-                for word in zh_words:
-                    if len(word) >= 2:
-                        # 找出单词在文本中的位置
-                        word_pos = source_text.find(word) / len(source_text)
-                        
-                        # 找出英文中位置相近的大写单词
-                        en_matches = re.finditer(r'\b[A-Z][a-z]*(?:\s+[a-z]+)*\b', reference_text)
-                        for match in en_matches:
-                            en_word = match.group()
-                            en_pos = match.start() / len(reference_text)
-                            
-                            # 如果位置接近，考虑为术语对
-                            if abs(word_pos - en_pos) < 0.2 and len(en_word) >= 3:
-                                extracted_terms[word] = en_word
-                                break
+                # 找出英文中位置与中文词语相近的大写单词
+                en_matches = [
+                    (match.group(), match.start())
+                    for match in re.finditer(r'\b[A-Z][a-z]*(?:\s+[a-z]+)*\b', reference_text)
+                ]
+                extracted_terms.update(
+                    match_nearby_words(source.tokens, source_text, en_matches, len(reference_text))
+                )
         
         return extracted_terms
         
-    def _evaluate_sentence_structure(self,
-                                    source_text: str,
-                                    translated_text: str,
-                                    source_language: str,
-                                    target_language: str) -> Tuple[float, str]:
+    def _evaluate_sentence_structure(self, context: EvaluationContext) -> Tuple[float, str]:
         """
         评估句式结构，特别是主动句转被动句的情况
         
         Args:
-            source_text: 源文本
-            translated_text: 待评估的翻译文本
-            source_language: 源语言代码
-            target_language: 目标语言代码
+            context: 评估上下文
             
         Returns:
             句式转换得分及详细反馈
         """
+        source_language = context.source_language
+        target_language = context.target_language
+        
         # 本方法主要针对中译英时主动句应转为被动句的情况
         if source_language != "zh" or target_language != "en":
             return 0.7, "当前评估仅支持中译英的句式转换评估。"
         
         # 分句
-        source_sentences = nltk.sent_tokenize(source_text)
-        translated_sentences = nltk.sent_tokenize(translated_text)
-        
-        # 如果句子数量差异太大，可能分句不准确
-        if abs(len(source_sentences) - len(translated_sentences)) > len(source_sentences) * 0.3:
-            return 0.5, "源文本与译文的句子数量差异较大，无法准确评估句式转换。"
+        source_sentences = context.source.sentences
+        translated_sentences = context.translation.sentences
         
-        # 检测英文中的被动句
-        passive_pattern = re.compile(r'\b(is|are|was|were|be|been|being)\s+(\w+ed|irregular_past_participle)\b', re.IGNORECASE)
-        
-        # 主动句指示词（中文）
-        active_indicators = ["我们", "作者", "研究者", "科学家", "本文", "本研究", "实验", "分析", "测试", "发现"]
-        
-        # 统计结果
-        active_in_source = 0
-        passive_in_target = 0
+        # 统计包含主动句指示词的源句子和包含被动结构的译文句子（词汇扫描结果与语篇评估共享）
+        active_in_source = count_spans_with_hits(
+            context.source.sentence_spans, context.source.lexical.active_indicator_positions
+        )
+        passive_in_target = count_spans_with_hits(
+            context.translation.sentence_spans, context.translation.lexical.passive_positions
+        )
         
-        # 检测源文本中的主动句
-        for sentence in source_sentences:
-            for indicator in active_indicators:
-                if indicator in sentence:
-                    active_in_source += 1
-                    break
+        return self._score_sentence_structure(
+            len(source_sentences), len(translated_sentences), active_in_source, passive_in_target
+        )
+    
+    def _score_sentence_structure(self,
+                                  source_sentence_count: int,
+                                  translated_sentence_count: int,
+                                  active_in_source: int,
+                                  passive_in_target: int) -> Tuple[float, str]:
+        """
+        根据句子数量和主动句、被动句的统计结果为句式转换评分
         
-        # 检测译文中的被动句
-        for sentence in translated_sentences:
-            if passive_pattern.search(sentence):
-                passive_in_target += 1
+        Args:
+            source_sentence_count: 源文本句子数
+            translated_sentence_count: 译文句子数
+            active_in_source: 包含主动句指示词的源句子数
+            passive_in_target: 包含被动结构的译文句子数
+            
+        Returns:
+            句式转换得分及详细反馈
+        """
+        # 如果句子数量差异太大，可能分句不准确
+        if abs(source_sentence_count - translated_sentence_count) > source_sentence_count * 0.3:
+            return 0.5, "源文本与译文的句子数量差异较大，无法准确评估句式转换。"
         
         # 评估得分
         # 简单情况：如果源文本中主动句较多，而译文中被动句较少，则得分较低
@@ -882,61 +1511,51 @@ class EvaluationService:
         
         return score, feedback
     
-    def _evaluate_discourse(self, 
-                           translated_text: str, 
-                           reference_texts: List[str]) -> Tuple[float, str]:
+    def _evaluate_discourse(self, context: EvaluationContext) -> Tuple[float, str]:
         """
         评估语篇连贯性
         
         Args:
-            translated_text: 待评估的翻译文本
-            reference_texts: 参考译文列表
+            context: 评估上下文
+            
+        Returns:
+            语篇连贯性得分及详细反馈
+        """
+        # 连接词、代词和词频统计均来自一次词汇扫描
+        return self._score_discourse(
+            context.translation.lexical,
+            [len(sent.split()) for sent in context.translation.sentences],
+            [reference.lexical for reference in context.references]
+        )
+    
+    def _score_discourse(self,
+                         translation_profile: LexicalProfile,
+                         sentence_lengths: List[int],
+                         reference_profiles: List[LexicalProfile]) -> Tuple[float, str]:
+        """
+        根据译文和参考译文的词汇特征统计为语篇连贯性评分
+        
+        Args:
+            translation_profile: 译文的词汇特征
+            sentence_lengths: 译文各句的词数
+            reference_profiles: 各参考译文的词汇特征
             
         Returns:
             语篇连贯性得分及详细反馈
         """
         try:
             # 1. 检查连接词的使用
-            # 分不同类型的连接词，更全面地评估连贯性
-            causality_words = ["because", "since", "therefore", "thus", "consequently", "as a result", 
-                             "hence", "so", "accordingly", "due to", "owing to", "for this reason"]
-            
-            contrast_words = ["however", "nevertheless", "yet", "although", "though", "but", "despite", 
-                            "in contrast", "on the other hand", "conversely", "whereas", "while", 
-                            "on the contrary", "nonetheless"]
-            
-            addition_words = ["furthermore", "moreover", "in addition", "additionally", "besides", 
-                            "also", "what's more", "as well as", "not only...but also", "similarly"]
-            
-            sequence_words = ["first", "firstly", "second", "secondly", "third", "thirdly", "then", 
-                            "next", "finally", "lastly", "subsequently", "afterward", "previously"]
-            
-            conclusion_words = ["in conclusion", "to conclude", "in summary", "to summarize", "overall", 
-                              "ultimately", "in brief", "in short", "to sum up"]
-            
-            # 所有连接词列表
-            all_cohesion_words = (causality_words + contrast_words + 
-                                 addition_words + sequence_words + conclusion_words)
-            
-            # 防止连接词的部分匹配
-            def count_whole_word(word, text):
-                return len(re.findall(r'\b' + re.escape(word) + r'\b', text.lower()))
-            
             # 计算连接词在译文中的出现次数
-            causality_count = sum(count_whole_word(word, translated_text) for word in causality_words)
-            contrast_count = sum(count_whole_word(word, translated_text) for word in contrast_words)
-            addition_count = sum(count_whole_word(word, translated_text) for word in addition_words)
-            sequence_count = sum(count_whole_word(word, translated_text) for word in sequence_words)
-            conclusion_count = sum(count_whole_word(word, translated_text) for word in conclusion_words)
+            causality_count = translation_profile.cohesion_counts["causality"]
+            contrast_count = translation_profile.cohesion_counts["contrast"]
+            addition_count = translation_profile.cohesion_counts["addition"]
+            sequence_count = translation_profile.cohesion_counts["sequence"]
+            conclusion_count = translation_profile.cohesion_counts["conclusion"]
             
-            total_cohesion_count = (causality_count + contrast_count + 
-                                   addition_count + sequence_count + conclusion_count)
+            total_cohesion_count = translation_profile.total_cohesion_count
             
             # 检查连接词的多样性
-            used_cohesion_words = set()
-            for word in all_cohesion_words:
-                if count_whole_word(word, translated_text) > 0:
-                    used_cohesion_words.add(word)
+            used_cohesion_words = set(translation_profile.used_cohesion_words)
             
             cohesion_diversity = len(used_cohesion_words) / max(1, total_cohesion_count)
             
@@ -944,25 +1563,17 @@ class EvaluationService:
             ref_total_counts = []
             ref_diversity_scores = []
             
-            for ref_text in reference_texts:
-                ref_count = sum(count_whole_word(word, ref_text) for word in all_cohesion_words)
+            for ref_profile in reference_profiles:
+                ref_count = ref_profile.total_cohesion_count
                 ref_total_counts.append(ref_count)
                 
-                ref_used_words = set()
-                for word in all_cohesion_words:
-                    if count_whole_word(word, ref_text) > 0:
-                        ref_used_words.add(word)
-                
-                ref_diversity = len(ref_used_words) / max(1, ref_count)
+                ref_diversity = len(ref_profile.used_cohesion_words) / max(1, ref_count)
                 ref_diversity_scores.append(ref_diversity)
             
             avg_ref_count = sum(ref_total_counts) / len(ref_total_counts) if ref_total_counts else 0
             avg_ref_diversity = sum(ref_diversity_scores) / len(ref_diversity_scores) if ref_diversity_scores else 0
             
             # 2. 句子长度的变化
-            sentences = nltk.sent_tokenize(translated_text)
-            sentence_lengths = [len(sent.split()) for sent in sentences]
-            
             # 计算句子长度的标准差，过大表示句子长度差异过大
             if len(sentence_lengths) > 1:
                 mean_length = sum(sentence_lengths) / len(sentence_lengths)
@@ -978,43 +1589,21 @@ class EvaluationService:
                 length_variation_score = 0.7  # 单句文本，给予中等分数
             
             # 3. 检查重复词语（除了常用词和停用词外）
-            # 常用英文停用词
-            stopwords = {"the", "a", "an", "and", "in", "on", "at", "to", "for", "with", "by", "of", 
-                       "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", 
-                       "do", "does", "did", "can", "could", "will", "would", "should", "may", "might", 
-                       "must", "that", "this", "these", "those", "it", "they", "them", "their", "there", 
-                       "here", "where", "when", "how", "why", "what", "who", "whom", "which"}
-            
-            words = re.findall(r'\b\w+\b', translated_text.lower())
-            word_counts = {}
-            
-            for word in words:
-                if len(word) > 3 and word not in stopwords:  # 跳过短词和停用词
-                    word_counts[word] = word_counts.get(word, 0) + 1
+            word_counts = translation_profile.content_word_counts
             
             # 计算重复系数 (重复次数>=3的词占总词数的比例)
             repeated_words = [word for word, count in word_counts.items() if count >= 3]
-            total_words = len(words)
+            total_words = translation_profile.word_count
             repetition_ratio = sum(word_counts[word] for word in repeated_words) / total_words if total_words > 0 else 0
             
             # 计算重复词得分
             repetition_score = min(1.0, max(0.0, 1.0 - repetition_ratio * 3))  # 重复率越低，得分越高
             
             # 4. 检查指代一致性
-            # 检查人称代词和物主代词的一致性
-            pronouns = ["he", "she", "it", "they", "his", "her", "its", "their", "him", "them"]
+            # 简单检查代词前有无清晰的指代对象（扫描时已检查代词前50个字符内是否出现冠词）
+            pronoun_issues = translation_profile.pronoun_issues
             
-            # 简单检查第一个代词前有无清晰的指代对象
-            pronoun_issues = 0
-            for pronoun in pronouns:
-                pronoun_positions = [m.start() for m in re.finditer(r'\b' + re.escape(pronoun) + r'\b', translated_text.lower())]
-                for pos in pronoun_positions:
-                    # 检查代词前50个字符内是否有可能的指代对象（简化处理）
-                    prefix = translated_text[max(0, pos - 50):pos].lower()
-                    if not any(noun in prefix for noun in ["the", "a", "an"]):  # 简单假设：冠词后面跟着名词
-                        pronoun_issues += 1
-            
-            pronoun_score = min(1.0, max(0.0, 1.0 - pronoun_issues / max(10, len(sentences))))
+            pronoun_score = min(1.0, max(0.0, 1.0 - pronoun_issues / max(10, len(sentence_lengths))))
             
             # 5. 计算最终连贯性分数
             # 根据参考文本校准连接词分数
@@ -1022,7 +1611,7 @@ class EvaluationService:
                 cohesion_count_score = min(1.0, total_cohesion_count / avg_ref_count)
             else:
                 # 无参考文本时，基于连接词密度评分
-                text_length = len(words)
+                text_length = total_words
                 expected_cohesion_count = max(1, text_length / 100)  # 假设每100个词有1个连接词
                 cohesion_count_score = min(1.0, total_cohesion_count / expected_cohesion_count)
             
@@ -1131,33 +1720,31 @@ class EvaluationService:
             logger.error(f"评估语篇连贯性时出错: {str(e)}")
             return 0.5, f"评估语篇连贯性时出错: {str(e)}"
     
-    def _generate_suggestions(self,
-                             bleu_score: float,
-                             terminology_score: float,
-                             sentence_score: float,
-                             discourse_score: float,
-                             terminology_feedback: str,
-                             sentence_feedback: str,
-                             discourse_feedback: str) -> List[str]:
+    def _generate_suggestions(self, scores: Dict[str, float], feedback: Dict[str, str]) -> List[str]:
         """
-        根据各项评分生成改进建议
+        根据各项评分生成改进建议，只针对本次计算了的指标
         
         Args:
-            bleu_score: BLEU分数
-            terminology_score: 术语准确性分数
-            sentence_score: 句式转换分数
-            discourse_score: 语篇连贯性分数
-            terminology_feedback: 术语评估详细反馈
-            sentence_feedback: 句式评估详细反馈
-            discourse_feedback: 语篇评估详细反馈
+            scores: 指标名称 -> 得分
+            feedback: 指标名称 -> 详细反馈
             
         Returns:
             改进建议列表
         """
+        if not scores:
+            return []
+        
+        bleu_score = scores.get("bleu")
+        terminology_score = scores.get("terminology")
+        sentence_score = scores.get("sentence_structure")
+        discourse_score = scores.get("discourse")
+        terminology_feedback = feedback.get("terminology", "")
+        discourse_feedback = feedback.get("discourse", "")
+        
         suggestions = []
         
         # 根据各项分数，生成改进建议
-        if terminology_score < 0.7:
+        if terminology_score is not None and terminology_score < 0.7:
             suggestions.append("注意专业术语的准确翻译，参考术语库或领域专业词典。")
             
             # 从详细反馈中提取具体问题术语
@@ -1168,11 +1755,11 @@ class EvaluationService:
                         if term_suggestion not in suggestions:
                             suggestions.append(term_suggestion)
         
-        if sentence_score < 0.7:
+        if sentence_score is not None and sentence_score < 0.7:
             suggestions.append("在中译英时，注意将中文的主动句适当转换为英文的被动句，符合英语学术写作习惯。")
             suggestions.append("特别关注表达研究过程、方法和结果的句子，这些在英文学术写作中通常使用被动语态。")
         
-        if discourse_score < 0.7:
+        if discourse_score is not None and discourse_score < 0.7:
             if "连接词使用不足" in discourse_feedback:
                 suggestions.append("增加过渡词和连接词（如however, therefore, furthermore等）以提高文本的逻辑连贯性。")
             
@@ -1182,7 +1769,7 @@ class EvaluationService:
             if "部分词语重复过多" in discourse_feedback:
                 suggestions.append("避免过度重复相同词语，可使用同义词或改变表达方式。")
         
-        if bleu_score < 0.6:
+        if bleu_score is not None and bleu_score < 0.6:
             suggestions.append("整体译文与参考译文差异较大，建议参考高质量翻译范例，学习表达方式和风格。")
         
         # 如果没有明显问题，给予积极反馈
@@ -0,0 +1,545 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.schemas import EvaluationResponse
+from app.services.evaluation_service import evaluation_service
+from app.services.evaluation_cache import normalize_text
+from app.utils.bleu_stats import NgramMatchStats, closest_reference_length, count_ngrams, nltk_bleu_from_stats
+from app.utils.document_analysis import EvaluationContext, tokenize_sentence
+from app.utils.lexical_scanner import count_spans_with_hits, lexical_scanner, LexicalProfile, PRONOUN_CONTEXT_CHARS
+from app.utils.nlp_resources import jieba, sacrebleu_helpers, sacrebleu_metrics
+from app.utils.segmenter import segment_sentences
+from app.utils.text_index import SegmentedTermIndex, split_phrase
+
+logger = logging.getLogger(__name__)
+
+
+class SentenceRecord:
+    """译文单句的分析结果，按句子文本缓存，句子未修改时直接复用"""
+
+    def __init__(self, text: str, language: str, term_index: Optional[SegmentedTermIndex]):
+        self.text = text
+        self.tokens = tuple(tokenize_sentence(text, language))
+        self.word_count = len(text.split())
+        self.term_hits = term_index.scan(text) if term_index is not None else frozenset()
+        # 参考译文序号 -> 该句与参考译文各句比较的最高句子级BLEU
+        self.best_bleu: Dict[int, float] = {}
+
+
+class EvaluationSession:
+    """
+    译后编辑评估会话
+
+    源文本、参考译文及由它们确定的术语对照在创建时分析一次。译文按句保存分词、术语命中、
+    词汇特征和句子级BLEU，BLEU的n-gram充分统计量按句增量维护；每次提交修改后的译文时，
+    只有文本发生变化的句子（以及代词上下文受影响的相邻句）需要重新分析，再合并为整篇得分。
+    只计算创建时选择的指标，综合得分按所选指标的权重重新归一化。
+    """
+
+    def __init__(self,
+                 session_id: str,
+                 context: EvaluationContext,
+                 terminology_mode: str,
+                 metrics: Optional[List[str]] = None):
+        self.session_id = session_id
+        self.context = context
+        self.terminology_mode = terminology_mode
+        self.metrics = evaluation_service.metric_registry.resolve(metrics)
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.lock = threading.Lock()
+
+        source_language = context.source_language
+        target_language = context.target_language
+        reference_texts = context.reference_texts
+
+        # 不依赖译文的评估结果在创建时确定
+        self.fixed_bleu = None
+        self.has_references = bool(reference_texts) and all(reference_texts)
+        if not self.has_references and "bleu" in self.metrics:
+            self.fixed_bleu = evaluation_service._calculate_bleu_score(context)
+
+        self.fixed_sentence_structure = None
+        if "sentence_structure" in self.metrics:
+            if source_language != "zh" or target_language != "en":
+                self.fixed_sentence_structure = evaluation_service._evaluate_sentence_structure(context)
+            else:
+                self.source_sentence_count = len(context.source.sentences)
+                self.active_in_source = count_spans_with_hits(
+                    context.source.sentence_spans, context.source.lexical.active_indicator_positions
+                )
+
+        self.fixed_terminology = None
+        self.found_terms = []
+        self.extracted_terms: Dict[str, str] = {}
+        self.term_index: Optional[SegmentedTermIndex] = None
+        # 级联模式使用的层级只取决于源文本和参考译文，在创建时确定
+        self.terminology_tier = terminology_mode
+        if "terminology" in self.metrics:
+            self._prepare_terminology(context)
+
+        self.reference_profiles = [reference.lexical for reference in context.references]
+
+        self.corpus_stats: Optional[NgramMatchStats] = None
+        self.text_stats: Optional[NgramMatchStats] = None
+        if self.has_references and "bleu" in self.metrics:
+            # 语料级BLEU（sacrebleu）：多参考的n-gram计数取最大值
+            bleu = evaluation_service.bleu
+            corpus_reference_counts = {}
+            self.corpus_reference_lengths = []
+            for text in reference_texts:
+                counts, length = sacrebleu_helpers.extract_all_word_ngrams(bleu.tokenizer(text), 1, bleu.max_ngram_order)
+                self.corpus_reference_lengths.append(length)
+                for ngram, count in counts.items():
+                    corpus_reference_counts[ngram] = max(corpus_reference_counts.get(ngram, 0), count)
+            self.corpus_stats = NgramMatchStats([corpus_reference_counts], bleu.max_ngram_order)
+
+            # 全文比较的句子级BLEU（nltk）：每份参考译文单独统计
+            self.text_reference_lengths = [len(reference.tokens) for reference in context.references]
+            self.text_stats = NgramMatchStats([count_ngrams(reference.tokens) for reference in context.references])
+
+        self.text = ""
+        self.spans: List[Tuple[int, int]] = []
+        self.records: List[SentenceRecord] = []
+        self.profiles: List[LexicalProfile] = []
+        self._record_cache: Dict[str, SentenceRecord] = {}
+        self._profile_cache: Dict[Tuple[str, int], LexicalProfile] = {}
+        self._unit_cache: Dict[str, Tuple[str, ...]] = {}
+        self.last_changed = 0
+        self.response: Optional[EvaluationResponse] = None
+
+    def _prepare_terminology(self, context: EvaluationContext) -> None:
+        """确定术语评估方式，并为按句统计的术语命中建立索引"""
+        terminology_mode = self.terminology_mode
+        target_language = context.target_language
+        reference_texts = context.reference_texts
+        cascade_terms: Dict[str, str] = {}
+        if terminology_mode == "cascade":
+            self.terminology_tier, cascade_terms = evaluation_service._select_terminology_tier(context)
+            if self.terminology_tier != "ai_extraction":
+                evaluation_service.record_terminology_tier(self.terminology_tier)
+        if self.terminology_tier == "reference" and cascade_terms:
+            self.extracted_terms = cascade_terms
+            self.term_index = SegmentedTermIndex(self.extracted_terms.values(), target_language)
+        elif terminology_mode == "reference" and reference_texts:
+            self.extracted_terms = evaluation_service._extract_reference_terms(context)
+            if self.extracted_terms:
+                self.term_index = SegmentedTermIndex(self.extracted_terms.values(), target_language)
+            else:
+                self.fixed_terminology = evaluation_service._evaluate_terminology_from_reference(context)
+        elif self.terminology_tier != "ai_extraction":
+            self.found_terms = evaluation_service._find_source_terms(context)
+            if self.found_terms:
+                self.term_index = SegmentedTermIndex(
+                    [term_entry.target_term for term_entry in self.found_terms], target_language
+                )
+            else:
+                self.fixed_terminology = evaluation_service._evaluate_terminology(context)
+
+    @property
+    def sentences(self) -> List[str]:
+        return [record.text for record in self.records]
+
+    def sentence_details(self, sentence: str) -> Dict:
+        """
+        单句的BLEU和术语使用情况，用于逐句评估流式输出的译文
+
+        句子级BLEU与整篇评估逐句比较时使用的分数相同，计算结果缓存在句子的分析结果中，
+        之后整篇评估直接复用。
+
+        Args:
+            sentence: 规范化后的句子文本，通常是当前译文中的一句
+
+        Returns:
+            {"bleu": 各参考译文中的最高句子级BLEU（没有参考译文时为None）, "terms": 该句中出现的目标术语}
+        """
+        record = self._record_cache.get(sentence) or SentenceRecord(sentence, self.context.target_language, self.term_index)
+        bleu = None
+        if self.has_references:
+            for reference_index, reference in enumerate(self.context.references):
+                if reference_index not in record.best_bleu:
+                    record.best_bleu[reference_index] = evaluation_service._best_sentence_bleu(
+                        list(record.tokens), reference
+                    )
+            bleu = max(record.best_bleu.values())
+
+        if self.extracted_terms:
+            target_terms = self.extracted_terms.values()
+        else:
+            target_terms = [term_entry.target_term for term_entry in self.found_terms or []]
+        language = self.context.target_language
+        terms = sorted({term for term in target_terms if tuple(split_phrase(term, language)) in record.term_hits})
+        return {"bleu": bleu, "terms": terms}
+
+    def update(self, translated_text: str) -> int:
+        """
+        替换译文，复用未修改句子的分析结果
+
+        Args:
+            translated_text: 规范化后的完整译文
+
+        Returns:
+            重新分析的句子数
+        """
+        language = self.context.target_language
+        text = translated_text
+        spans = segment_sentences(text, language)
+
+        changed = 0
+        records = []
+        for start, end in spans:
+            sentence = text[start:end]
+            record = self._record_cache.get(sentence)
+            if record is None:
+                record = SentenceRecord(sentence, language, self.term_index)
+                changed += 1
+            records.append(record)
+
+        # 代词检查会回看句子之前的一段文本，按“句子 + 前文窗口”缓存词汇特征
+        profiles = []
+        profile_cache = {}
+        for start, end in spans:
+            window_start = max(0, start - PRONOUN_CONTEXT_CHARS)
+            key = (text[window_start:end], start - window_start)
+            profile = self._profile_cache.get(key)
+            if profile is None:
+                profile = lexical_scanner.scan(key[0], language, key[1])
+            profiles.append(profile)
+            profile_cache[key] = profile
+
+        self.text = text
+        self.spans = spans
+        self.records = records
+        self.profiles = profiles
+        self._record_cache = {record.text: record for record in records}
+        self._profile_cache = profile_cache
+
+        if self.corpus_stats is not None:
+            self.corpus_stats.set_units(self._corpus_units())
+            self.text_stats.set_units(self._text_units())
+
+        self.last_changed = changed
+        self.updated_at = time.time()
+        return changed
+
+    def _corpus_units(self) -> List[Tuple[str, ...]]:
+        """
+        sacrebleu 13a分词的单元：以空白分隔的相邻句子分别分词后拼接与整篇分词结果相同，
+        句间没有空白（如中文句末标点后直接接下一句）或以“-换行”相连时合并为一个单元
+        """
+        text = self.text
+        spans = self.spans
+        tokenizer = evaluation_service.bleu.tokenizer
+        units = []
+        unit_cache = {}
+        unit_start = spans[0][0] if spans else 0
+        for index, (_, end) in enumerate(spans):
+            if index + 1 < len(spans):
+                gap = text[end:spans[index + 1][0]]
+                if not gap or (gap[0] == "\n" and text[end - 1] == "-"):
+                    continue
+            unit_text = text[unit_start:end]
+            tokens = self._unit_cache.get(unit_text)
+            if tokens is None:
+                tokens = tuple(tokenizer(unit_text).split())
+            units.append(tokens)
+            unit_cache[unit_text] = tokens
+            if index + 1 < len(spans):
+                unit_start = spans[index + 1][0]
+        self._unit_cache = unit_cache
+        return units
+
+    def _text_units(self) -> List[Tuple[str, ...]]:
+        """全文分词的单元：各句分词结果，中文译文还包括jieba对句间空白输出的词元"""
+        if self.context.target_language != "zh":
+            return [record.tokens for record in self.records]
+        units = []
+        for index, record in enumerate(self.records):
+            gap_end = self.spans[index + 1][0] if index + 1 < len(self.spans) else len(self.text)
+            gap = self.text[self.spans[index][1]:gap_end]
+            units.append(record.tokens + tuple(jieba.cut(gap)) if gap else record.tokens)
+        return units
+
+    def evaluate(self) -> EvaluationResponse:
+        """
+        合并各句的统计量计算整篇评估结果，计算方法与EvaluationService.evaluate_translation一致
+
+        Returns:
+            评估结果对象
+        """
+        results = {}
+        extracted_terms = None
+        for name in self.metrics:
+            if name == "bleu":
+                results[name] = self.fixed_bleu or self._score_bleu()
+            elif name == "terminology":
+                score, feedback, extracted_terms = self._score_terminology()
+                results[name] = (score, feedback)
+            elif name == "sentence_structure":
+                results[name] = self.fixed_sentence_structure or self._score_sentence_structure()
+            elif name == "discourse":
+                results[name] = evaluation_service._score_discourse(
+                    LexicalProfile.combine(self.profiles),
+                    [record.word_count for record in self.records],
+                    self.reference_profiles
+                )
+            else:
+                # 注册的其他指标没有增量实现，对整篇译文重新计算
+                results[name] = evaluation_service._evaluate_metric(
+                    name, self.context.with_translation(self.text), self.terminology_mode
+                )
+
+        self.response = evaluation_service._build_response(results, extracted_terms)
+        return self.response
+
+    def _score_terminology(self) -> Tuple[float, str, Optional[Dict[str, str]]]:
+        """由各句的术语命中计算术语得分，返回得分、详细反馈和提取的术语对照表"""
+        if self.fixed_terminology is not None:
+            terminology_score, terminology_feedback = self.fixed_terminology[:2]
+            if self.terminology_mode == "reference" and self.context.references:
+                return terminology_score, terminology_feedback, self.fixed_terminology[2]
+            return terminology_score, terminology_feedback, None
+        if self.terminology_tier == "ai_extraction":
+            # AI提取的术语依赖整篇译文，无法按句增量计算
+            return evaluation_service._evaluate_terminology_by_mode(
+                self.context.with_translation(self.text), self.terminology_mode
+            )
+        self.term_index.set_sentence_hits(record.term_hits for record in self.records)
+        if self.extracted_terms:
+            terminology_score, terminology_feedback = evaluation_service._score_reference_terminology(
+                self.extracted_terms, self.term_index, self.context.target_language
+            )
+            return terminology_score, terminology_feedback, self.extracted_terms
+        terminology_score, terminology_feedback = evaluation_service._score_terminology(
+            self.found_terms, self.term_index, self.context.target_language
+        )
+        return terminology_score, terminology_feedback, None
+
+    def _score_sentence_structure(self) -> Tuple[float, str]:
+        """由各句的被动语态统计计算句子结构得分"""
+        passive_in_target = sum(1 for profile in self.profiles if profile.passive_positions)
+        return evaluation_service._score_sentence_structure(
+            self.source_sentence_count, len(self.records), self.active_in_source, passive_in_target
+        )
+
+    def _score_bleu(self) -> Tuple[float, str]:
+        """由增量维护的充分统计量和缓存的逐句分数计算BLEU"""
+        try:
+            bleu = evaluation_service.bleu
+            stats = self.corpus_stats
+            corpus_bleu = sacrebleu_metrics.BLEU.compute_bleu(
+                correct=stats.matches[0], total=stats.totals,
+                sys_len=stats.length,
+                ref_len=closest_reference_length(stats.length, self.corpus_reference_lengths),
+                smooth_method=bleu.smooth_method, smooth_value=bleu.smooth_value,
+                effective_order=bleu.effective_order, max_ngram_order=bleu.max_ngram_order
+            )
+            corpus_score = corpus_bleu.score / 100.0
+
+            sentence_scores = []
+            whole_text_scores = []
+            for reference_index, reference in enumerate(self.context.references):
+                if evaluation_service._sentence_counts_differ(len(self.records), len(reference.sentences)):
+                    for method in evaluation_service.smooth_methods:
+                        whole_text_scores.append(nltk_bleu_from_stats(
+                            self.text_stats.matches[reference_index], self.text_stats.totals,
+                            self.text_stats.length, self.text_reference_lengths[reference_index], method
+                        ))
+                else:
+                    for record in self.records:
+                        if reference_index not in record.best_bleu:
+                            record.best_bleu[reference_index] = evaluation_service._best_sentence_bleu(
+                                list(record.tokens), reference
+                            )
+                        sentence_scores.append(record.best_bleu[reference_index])
+
+            return evaluation_service._combine_bleu_scores(
+                corpus_score, sentence_scores, whole_text_scores, len(self.text.split())
+            )
+        except Exception as e:
+            logger.error(f"计算BLEU分数时出错: {str(e)}")
+            return 0.0, "计算BLEU分数时出错，无法评估译文与参考译文的匹配程度。"
+
+
+class EvaluationSessionService:
+    """译后编辑评估会话管理服务，会话数超过上限时淘汰最久未使用的会话，闲置超时的会话自动清除"""
+
+    def __init__(self, max_sessions: int, ttl: int):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, EvaluationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_session(self,
+                       source_text: str,
+                       translated_text: str,
+                       reference_texts: List[str],
+                       source_language: str = "zh",
+                       target_language: str = "en",
+                       domain: str = "materials_science",
+                       metrics: Optional[List[str]] = None) -> EvaluationSession:
+        """
+        创建评估会话并评估初始译文
+
+        Args:
+            source_text: 源文本
+            translated_text: 初始译文
+            reference_texts: 参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            metrics: 要计算的评估指标名称列表，为None时计算所有已注册指标
+
+        Returns:
+            评估会话，评估结果在session.response中
+
+        Raises:
+            ValueError: 包含未注册的指标名称
+        """
+        session = self.open_session(source_text, reference_texts, source_language, target_language, domain, metrics)
+        session.update(normalize_text(translated_text))
+        session.evaluate()
+        self.register_session(session)
+        return session
+
+    def open_session(self,
+                     source_text: str,
+                     reference_texts: List[str],
+                     source_language: str = "zh",
+                     target_language: str = "en",
+                     domain: str = "materials_science",
+                     metrics: Optional[List[str]] = None) -> EvaluationSession:
+        """
+        创建尚无译文的评估会话，源文本和参考译文在此时完成分析
+
+        会话在register_session之后才能通过会话ID访问，适合译文尚未生成（如流式翻译）的场景。
+
+        Args:
+            source_text: 源文本
+            reference_texts: 参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            metrics: 要计算的评估指标名称列表，为None时计算所有已注册指标
+
+        Returns:
+            评估会话
+
+        Raises:
+            ValueError: 包含未注册的指标名称
+        """
+        context = evaluation_service.build_context(
+            normalize_text(source_text), "", [normalize_text(text) for text in reference_texts],
+            source_language, target_language, domain
+        )
+        return EvaluationSession(uuid.uuid4().hex, context, settings.TERMINOLOGY_EVALUATION_MODE, metrics)
+
+    def register_session(self, session: EvaluationSession) -> None:
+        """
+        登记已评估的会话，之后可以通过会话ID获取和修改
+
+        Args:
+            session: 已评估过译文的评估会话
+        """
+        with self._lock:
+            self._expire()
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        logger.info(f"创建评估会话{session.session_id}，译文共{len(session.records)}句")
+
+    def get_session(self, session_id: str) -> Optional[EvaluationSession]:
+        """
+        获取评估会话
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            评估会话，不存在或已过期时返回None
+        """
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def update_session(self,
+                       session_id: str,
+                       translated_text: Optional[str] = None,
+                       edits: Optional[List[Dict]] = None) -> Optional[EvaluationSession]:
+        """
+        提交修改后的译文并重新评估，只重新分析发生变化的句子
+
+        Args:
+            session_id: 会话ID
+            translated_text: 修改后的完整译文
+            edits: 按句修改列表 [{"index": 句子序号, "text": 新的句子文本}, ...]，
+                   序号对应当前译文的分句结果，text为空字符串表示删除该句
+
+        Returns:
+            评估会话，不存在或已过期时返回None
+        """
+        session = self.get_session(session_id)
+        if session is None:
+            return None
+
+        with session.lock:
+            if edits is not None:
+                translated_text = self._apply_edits(session, edits)
+            started = time.perf_counter()
+            changed = session.update(normalize_text(translated_text))
+            session.evaluate()
+            logger.info(
+                f"评估会话{session_id}重新分析{changed}/{len(session.records)}句，"
+                f"耗时{(time.perf_counter() - started) * 1000:.1f}ms"
+            )
+        return session
+
+    def delete_session(self, session_id: str) -> bool:
+        """
+        删除评估会话
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            是否删除成功
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    @staticmethod
+    def _apply_edits(session: EvaluationSession, edits: List[Dict]) -> str:
+        """按句修改当前译文，返回修改后的完整译文"""
+        text = session.text
+        spans = session.spans
+        replacements = {}
+        for edit in edits:
+            index = edit["index"]
+            if not 0 <= index < len(spans):
+                raise ValueError(f"句子序号{index}超出范围，当前译文共{len(spans)}句")
+            replacements[index] = edit["text"]
+
+        # 从后往前替换，前面句子的偏移量不受影响
+        for index in sorted(replacements, reverse=True):
+            start, end = spans[index]
+            text = text[:start] + replacements[index] + text[end:]
+        return text
+
+    def _expire(self) -> None:
+        """清除闲置超时的会话（调用方持有锁）"""
+        deadline = time.time() - self.ttl
+        expired = [session_id for session_id, session in self._sessions.items() if session.updated_at < deadline]
+        for session_id in expired:
+            del self._sessions[session_id]
+
+
+# 单例实例
+evaluation_session_service = EvaluationSessionService(settings.EVALUATION_SESSION_MAX, settings.EVALUATION_SESSION_TTL)
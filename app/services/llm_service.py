@@ -2,7 +2,7 @@ import logging
 import httpx
 import json
 import traceback
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List
 
 from app.core.config import settings
 
@@ -117,7 +117,9 @@ class LLMService:
                 return {
                     "source_text": text,
                     "translated_text": translated_text,
-                    "model_used": model_name
+                    "model_used": model_name,
+                    # OpenAI兼容接口返回的令牌用量（prompt_tokens、completion_tokens、total_tokens），未返回时为None
+                    "usage": result.get("usage")
                 }
         except Exception as e:
             logger.error(f"默认API调用异常: {str(e)}")
@@ -144,7 +146,9 @@ class LLMService:
         return {
             "source_text": text,
             "translated_text": translated_text,
-            "model_used": model_name
+            "model_used": model_name,
+            "usage": None,
+            "simulated": True
         }
     
     @staticmethod
@@ -242,7 +246,9 @@ class LLMService:
                 return {
                     "source_text": text,
                     "translated_text": translated_text,
-                    "model_used": model_name
+                    "model_used": model_name,
+                    # OpenAI兼容接口返回的令牌用量（prompt_tokens、completion_tokens、total_tokens），未返回时为None
+                    "usage": result.get("usage")
                 }
         except Exception as e:
             logger.error(f"自定义API调用异常: {str(e)}")
@@ -250,6 +256,85 @@ class LLMService:
             logger.info("尝试使用默认API作为后备")
             return await LLMService._translate_with_default_api(text, source_lang, target_lang, model)
     
+    @staticmethod
+    async def stream_translation(
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        流式翻译：通过chat/completions接口的stream模式逐段产出模型输出的译文
+        
+        开始输出之前接口调用失败时，改用translate_text一次性产出完整译文；
+        输出过程中断时抛出异常，已产出的部分译文由调用方处理。
+        
+        Args:
+            text: 要翻译的文本
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            model: 可选的模型名称
+            
+        Yields:
+            译文的文本增量
+        """
+        if settings.CUSTOM_API_ENABLED:
+            model_name = model or "gpt-3.5-turbo"
+            base_url = settings.CUSTOM_API_BASE_URL.rstrip('/')
+            api_version = settings.CUSTOM_API_VERSION.lstrip('/')
+            url = f"{base_url}/{api_version}/chat/completions"
+            api_key = settings.CUSTOM_API_KEY
+        else:
+            model_name = model or settings.LLM_MODEL_NAME
+            url = f"{settings.LLM_API_BASE_URL}/v1/chat/completions"
+            api_key = settings.LLM_API_KEY
+        
+        system_instruction = f"你是一个专业的翻译系统，专门从{source_lang}语言翻译到{target_lang}语言。请只返回翻译后的文本，不要添加任何解释或备注。"
+        user_instruction = f"请将以下文本从{source_lang}翻译成{target_lang}：\n\n{text}"
+        
+        logger.info(f"流式翻译，模型: {model_name}")
+        started = False
+        try:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                async with client.stream(
+                    "POST", url,
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": model_name,
+                        "messages": [
+                            {"role": "system", "content": system_instruction},
+                            {"role": "user", "content": user_instruction}
+                        ],
+                        "temperature": 0.3,
+                        "stream": True
+                    }
+                ) as response:
+                    if response.status_code != 200:
+                        raise RuntimeError(f"流式API调用失败: {response.status_code}")
+                    
+                    # 服务器发送事件：每行"data: {...}"，以"data: [DONE]"结束
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        choices = json.loads(data).get("choices") or []
+                        delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                        if delta:
+                            started = True
+                            yield delta
+        except Exception as e:
+            if started:
+                logger.error(f"流式翻译中断: {str(e)}")
+                raise
+            logger.warning(f"流式API不可用，改用非流式翻译: {str(e)}")
+            result = await LLMService.translate_text(text, source_lang, target_lang, model)
+            yield result["translated_text"]
+    
     @staticmethod
     async def get_available_models() -> List[Dict[str, str]]:
         """
@@ -372,6 +457,56 @@ class LLMService:
             logger.error(f"异常堆栈: {traceback.format_exc()}")
             return []
     
+    @staticmethod
+    def completion_available() -> bool:
+        """是否配置了可用于文本补全（如AI术语提取）的自定义API"""
+        return bool(settings.CUSTOM_API_ENABLED and settings.CUSTOM_API_KEY)
+    
+    @staticmethod
+    async def request_completion(prompt: str, timeout: float = 60.0) -> str:
+        """
+        调用自定义API生成文本补全，失败时抛出异常，便于调用方重试
+        
+        Args:
+            prompt: 提示语
+            timeout: 超时时间（秒）
+            
+        Returns:
+            AI生成的文本
+            
+        Raises:
+            RuntimeError: 未启用自定义API或API返回错误状态码
+            httpx.HTTPError: 网络请求失败或超时
+        """
+        if not LLMService.completion_available():
+            raise RuntimeError("未启用自定义API，无法调用AI文本补全")
+        
+        base_url = settings.CUSTOM_API_BASE_URL.rstrip('/')
+        api_version = settings.CUSTOM_API_VERSION.lstrip('/')
+        model_name = "gpt-3.5-turbo"  # 默认使用较快的模型
+        
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.post(
+                f"{base_url}/{api_version}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {settings.CUSTOM_API_KEY}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": model_name,
+                    "messages": [
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0.3
+                }
+            )
+            
+            if response.status_code != 200:
+                raise RuntimeError(f"API调用失败: {response.status_code} - {response.text}")
+            
+            result = response.json()
+            return result["choices"][0]["message"]["content"].strip()
+    
     @staticmethod
     async def get_ai_completion(prompt: str) -> str:
         """
@@ -381,45 +516,17 @@ class LLMService:
             prompt: 提示语
             
         Returns:
-            AI生成的文本
+            AI生成的文本，未启用自定义API或调用失败时返回"{}"
         """
         logger.info("调用AI进行文本补全")
         
+        if not LLMService.completion_available():
+            # 简单模拟返回
+            logger.warning("未启用自定义API，无法进行AI术语提取")
+            return "{}"  # 返回空JSON
+        
         try:
-            if settings.CUSTOM_API_ENABLED and settings.CUSTOM_API_KEY:
-                # 使用自定义API
-                base_url = settings.CUSTOM_API_BASE_URL.rstrip('/')
-                api_version = settings.CUSTOM_API_VERSION.lstrip('/')
-                model_name = "gpt-3.5-turbo"  # 默认使用较快的模型
-                
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    response = await client.post(
-                        f"{base_url}/{api_version}/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {settings.CUSTOM_API_KEY}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": model_name,
-                            "messages": [
-                                {"role": "user", "content": prompt}
-                            ],
-                            "temperature": 0.3
-                        }
-                    )
-                    
-                    if response.status_code != 200:
-                        logger.error(f"API调用失败: {response.status_code} - {response.text}")
-                        return "{}"  # 返回空JSON
-                    
-                    result = response.json()
-                    completion = result["choices"][0]["message"]["content"].strip()
-                    return completion
-            else:
-                # 简单模拟返回
-                logger.warning("未启用自定义API，无法进行AI术语提取")
-                return "{}"  # 返回空JSON
-                
+            return await LLMService.request_completion(prompt)
         except Exception as e:
             logger.error(f"AI补全异常: {str(e)}")
             return "{}"  # 返回空JSON
@@ -0,0 +1,165 @@
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.core.config import settings
+from app.utils.document_analysis import EvaluationContext
+
+logger = logging.getLogger(__name__)
+
+# 指标计算函数：(评估上下文, 术语评估模式) -> (得分, 详细反馈, 提取的术语对照表)
+MetricFunction = Callable[[EvaluationContext, str], Tuple[float, str, Optional[Dict[str, str]]]]
+
+# 指标依赖的文本分析：(文档, 分析名称)列表，或根据评估上下文返回该列表的函数
+Requirements = Union[Sequence[Tuple[str, str]], Callable[[EvaluationContext], Sequence[Tuple[str, str]]]]
+
+# 指标的预计开销：相对数值，或根据术语评估模式返回该数值的函数
+Cost = Union[float, Callable[[str], float]]
+
+
+class MetricDefinition:
+    """
+    评估指标定义
+
+    requires声明指标一定会用到的文本分析，格式为(文档, 分析名称)，文档取值为source、translation或references，
+    分析名称为DocumentAnalysis的属性名（如sentences、sentence_tokens、lexical）。是否用到取决于语言等条件时，
+    可以传入根据评估上下文返回依赖列表的函数。多个指标声明的同一项分析在计算指标之前只执行一次。
+    """
+
+    def __init__(self,
+                 name: str,
+                 label: str,
+                 compute: MetricFunction,
+                 describe: Optional[Callable[[float, str], str]] = None,
+                 requires: Requirements = (),
+                 weight: Optional[float] = None,
+                 cost: Cost = 1.0):
+        """
+        Args:
+            name: 指标名称，即请求参数metrics中使用的名称
+            label: 指标的中文名称，用于综合得分说明
+            compute: 指标计算函数
+            describe: 根据得分和详细反馈生成得分说明的函数，默认为"{label}得分为x.xx。"
+            requires: 指标依赖的文本分析
+            weight: 综合得分权重，为None时使用配置项EVALUATION_WEIGHTS中的同名权重
+            cost: 预计开销（相对值），有时间预算时开销低的指标先计算
+        """
+        self.name = name
+        self.label = label
+        self.compute = compute
+        self.describe = describe or (lambda score, feedback: f"{label}得分为{score:.2f}。")
+        self.requires = requires
+        self._weight = weight
+        self._cost = cost
+
+    @property
+    def weight(self) -> float:
+        """综合得分权重"""
+        if self._weight is not None:
+            return self._weight
+        return settings.EVALUATION_WEIGHTS.get(self.name, 0.0)
+
+    def estimated_cost(self, terminology_mode: str) -> float:
+        """当前术语评估模式下的预计开销"""
+        return self._cost(terminology_mode) if callable(self._cost) else self._cost
+
+
+class MetricRegistry:
+    """评估指标注册表，按注册顺序保存各项指标"""
+
+    def __init__(self):
+        self._metrics: Dict[str, MetricDefinition] = {}
+        self._lock = threading.Lock()
+
+    def register(self, definition: MetricDefinition) -> None:
+        """
+        注册评估指标，同名指标会被替换
+
+        Args:
+            definition: 指标定义
+        """
+        with self._lock:
+            if definition.name in self._metrics:
+                logger.warning(f"评估指标{definition.name}已存在，将被替换")
+            self._metrics[definition.name] = definition
+
+    def get(self, name: str) -> MetricDefinition:
+        """获取指标定义，指标不存在时抛出ValueError"""
+        definition = self._metrics.get(name)
+        if definition is None:
+            raise ValueError(f"未知的评估指标: {name}，可选指标: {', '.join(self._metrics)}")
+        return definition
+
+    def names(self) -> List[str]:
+        """所有已注册指标的名称"""
+        return list(self._metrics)
+
+    def resolve(self, names: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        校验请求的指标并按注册顺序排列
+
+        Args:
+            names: 请求的指标名称，为None或空时返回全部指标
+
+        Returns:
+            去重并按注册顺序排列的指标名称
+        """
+        if not names:
+            return self.names()
+        requested = set()
+        for name in names:
+            self.get(name)
+            requested.add(name)
+        return [name for name in self._metrics if name in requested]
+
+    def by_cost(self, names: Sequence[str], terminology_mode: str) -> List[str]:
+        """
+        按预计开销从低到高排列指标，开销相同时保持原顺序
+
+        Args:
+            names: 指标名称
+            terminology_mode: 术语评估模式
+
+        Returns:
+            排序后的指标名称
+        """
+        return sorted(names, key=lambda name: self.get(name).estimated_cost(terminology_mode))
+
+    def requirements(self, names: Sequence[str], context: EvaluationContext) -> List[Tuple[str, str]]:
+        """
+        汇总多项指标依赖的文本分析，每项只保留一次
+
+        Args:
+            names: 指标名称
+            context: 评估上下文
+
+        Returns:
+            按首次声明顺序排列的(文档, 分析名称)列表
+        """
+        requirements = []
+        for name in names:
+            requires = self.get(name).requires
+            if callable(requires):
+                requires = requires(context)
+            for requirement in requires:
+                if requirement not in requirements:
+                    requirements.append(requirement)
+        return requirements
+
+    @staticmethod
+    def prepare(context: EvaluationContext, requirements: Sequence[Tuple[str, str]]) -> None:
+        """
+        预先执行各指标共用的文本分析，分析结果缓存在上下文中供各指标直接使用
+
+        Args:
+            context: 评估上下文
+            requirements: 需要执行的文本分析
+        """
+        for role, analysis in requirements:
+            documents = context.references if role == "references" else [getattr(context, role)]
+            for document in documents:
+                try:
+                    getattr(document, analysis)
+                except Exception as e:
+                    # 分析失败时由使用它的指标按各自的方式处理
+                    logger.debug(f"预先执行文本分析{role}.{analysis}失败: {str(e)}")
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.models.schemas import ModelComparisonEntry, ModelComparisonResponse
+from app.services.evaluation_service import evaluation_service
+from app.services.llm_service import llm_service
+
+logger = logging.getLogger(__name__)
+
+
+class ModelComparisonService:
+    """
+    多模型翻译比较服务
+
+    各模型通过LLMService并发翻译同一源文本，等待翻译的同时在线程池中分析源文本和参考译文；
+    所有译文在同一份共享分析上评估，按综合得分排序后返回各模型的得分、耗时和令牌用量。
+    """
+
+    async def compare(self,
+                      source_text: str,
+                      models: List[str],
+                      reference_texts: List[str],
+                      source_language: str = "zh",
+                      target_language: str = "en",
+                      domain: str = "materials_science",
+                      metrics: Optional[List[str]] = None) -> ModelComparisonResponse:
+        """
+        使用多个模型翻译源文本并比较译文质量
+
+        Args:
+            source_text: 源文本
+            models: 模型ID列表
+            reference_texts: 参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            metrics: 需要计算的评估指标，默认计算全部已注册指标
+
+        Returns:
+            比较结果
+
+        Raises:
+            ValueError: 模型ID重复或请求了未注册的评估指标
+        """
+        if len(set(models)) != len(models):
+            raise ValueError("模型ID不能重复")
+        metrics = evaluation_service.metric_registry.resolve(metrics)
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        # 源文本和参考译文的分析与各模型的翻译同时进行
+        shared_future = loop.run_in_executor(
+            None, evaluation_service.build_shared_context,
+            source_text, reference_texts, source_language, target_language, domain, metrics
+        )
+        translations = await asyncio.gather(*(
+            self._translate(source_text, source_language, target_language, model) for model in models
+        ))
+        shared_context = await shared_future
+
+        # 各译文在共享分析上并发评估
+        entries = await asyncio.gather(*(
+            loop.run_in_executor(None, self._evaluate, shared_context, translation, metrics)
+            for translation in translations
+        ))
+
+        # 真实译文按综合得分排名，模拟译文和失败的模型排在最后
+        ranked = sorted(
+            entries,
+            key=lambda entry: (entry.overall_score is None or entry.simulated, -(entry.overall_score or 0.0))
+        )
+        rank = 0
+        for entry in ranked:
+            if entry.overall_score is not None and not entry.simulated:
+                rank += 1
+                entry.rank = rank
+
+        total_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"多模型比较完成: {len(models)}个模型，耗时{total_ms:.0f}ms")
+        return ModelComparisonResponse(
+            source_text=source_text,
+            source_language=source_language,
+            target_language=target_language,
+            domain=domain,
+            metrics=metrics,
+            results=ranked,
+            total_ms=total_ms
+        )
+
+    @staticmethod
+    async def _translate(source_text: str, source_language: str, target_language: str, model: str) -> Dict[str, Any]:
+        """调用单个模型翻译，记录耗时；失败时返回错误信息而不中断其他模型"""
+        started = time.perf_counter()
+        try:
+            result = await llm_service.translate_text(source_text, source_language, target_language, model)
+            error = None
+        except Exception as e:
+            logger.error(f"模型{model}翻译失败: {str(e)}")
+            result, error = {}, str(e)
+        return {
+            "model": model,
+            "result": result,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "error": error,
+        }
+
+    @staticmethod
+    def _evaluate(shared_context: Any, translation: Dict[str, Any], metrics: List[str]) -> ModelComparisonEntry:
+        """评估单个模型的译文并整理为比较表中的一行"""
+        result = translation["result"]
+        usage = result.get("usage") or {}
+        entry = ModelComparisonEntry(
+            model=translation["model"],
+            used_model=result.get("model_used"),
+            translated_text=result.get("translated_text"),
+            latency_ms=translation["latency_ms"],
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            total_tokens=usage.get("total_tokens"),
+            simulated=bool(result.get("simulated")),
+            error=translation["error"]
+        )
+        if entry.translated_text is None:
+            return entry
+
+        try:
+            evaluation = evaluation_service.evaluate_candidate(shared_context, entry.translated_text, metrics)
+            entry.evaluation = evaluation
+            entry.overall_score = evaluation.overall_score.score
+        except Exception as e:
+            logger.error(f"评估模型{entry.model}的译文失败: {str(e)}", exc_info=True)
+            entry.error = f"评估失败: {str(e)}"
+        return entry
+
+
+# 单例实例
+model_comparison_service = ModelComparisonService()
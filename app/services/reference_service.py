@@ -2,6 +2,7 @@ import os
 import json
 from typing import List, Dict, Optional
 from app.core.config import settings
+from app.services.term_alignment_service import term_alignment_service
 
 class ReferenceService:
     """参考文本服务，负责管理本地参考文本文件"""
@@ -75,6 +76,8 @@ class ReferenceService:
             file_path = os.path.join(settings.REFERENCE_TEXTS_DIR, filename)
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            # 增量更新术语对齐索引
+            term_alignment_service.update_file(filename)
             return True
         except Exception as e:
             print(f"保存参考文本文件错误: {str(e)}")
@@ -87,6 +90,7 @@ class ReferenceService:
             file_path = os.path.join(settings.REFERENCE_TEXTS_DIR, file_id)
             if os.path.exists(file_path):
                 os.remove(file_path)
+                term_alignment_service.remove_file(file_id)
                 return True
             return False
         except Exception as e:
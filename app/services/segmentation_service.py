@@ -0,0 +1,206 @@
+import asyncio
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.utils.nlp_resources import jieba, pseg
+from app.utils.segmenter import segment_sentences
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(user_words: Sequence[str], tag: str) -> None:
+    """子进程初始化：加载jieba前缀词典（使用离线缓存）和术语库用户词典"""
+    jieba.initialize()
+    for word in user_words:
+        jieba.add_word(word, tag=tag)
+
+
+def _segment_shard(text: str, offset: int, with_pos: bool, with_tokens: bool = True) -> Dict[str, Any]:
+    """
+    对一个分片分词（在子进程或当前进程中执行）
+
+    Args:
+        text: 分片文本
+        offset: 分片在全文中的起始位置
+        with_pos: 是否进行词性标注
+        with_tokens: 是否进行带偏移量的分词
+
+    Returns:
+        {"tokens": [(词, 起始位置, 结束位置), ...]或None，位置为全文偏移量, "pos_tags": [(词, 词性), ...]或None}
+    """
+    tokens = [(word, offset + start, offset + end) for word, start, end in jieba.tokenize(text)] if with_tokens else None
+    pos_tags = [(pair.word, pair.flag) for pair in pseg.cut(text)] if with_pos else None
+    return {"tokens": tokens, "pos_tags": pos_tags}
+
+
+class SegmentationService:
+    """
+    长中文文档的并行分词服务
+
+    文档在句子边界处切分为约SEGMENTATION_SHARD_CHARS字的分片，由进程池并行完成jieba分词和词性标注，
+    各分片的词元偏移量换算为全文偏移量。jieba按标点和空白切分文本块后逐块分词，分片边界落在句子边界上，
+    因此合并结果与对全文分词的结果相同。结果按分片顺序逐个产出，下游可以在后面的分片完成前处理前面的分片。
+    子进程以spawn方式启动，初始化时加载jieba离线缓存和术语库用户词典；用户词典有新词时重建进程池。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_version: Optional[int] = None
+        atexit.register(self.shutdown)
+
+    @staticmethod
+    def worker_count() -> int:
+        """进程池的进程数"""
+        return settings.SEGMENTATION_WORKERS or min(4, os.cpu_count() or 1)
+
+    def shard(self,
+              text: str,
+              sentence_spans: Optional[List[Tuple[int, int]]] = None,
+              shard_chars: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        在句子边界处把文本切分为分片
+
+        Args:
+            text: 中文文本
+            sentence_spans: 已有的分句结果，未提供时重新分句
+            shard_chars: 每个分片的目标字符数，默认使用配置项SEGMENTATION_SHARD_CHARS
+
+        Returns:
+            首尾相接、覆盖全文的分片区间 [(start, end), ...]
+        """
+        shard_chars = shard_chars or settings.SEGMENTATION_SHARD_CHARS
+        if sentence_spans is None:
+            sentence_spans = segment_sentences(text, "zh")
+
+        boundaries = [0]
+        for start, _ in sentence_spans:
+            if start - boundaries[-1] >= shard_chars:
+                boundaries.append(start)
+        boundaries.append(len(text))
+        return [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
+
+    def iter_segments(self,
+                      text: str,
+                      with_pos: bool = False,
+                      sentence_spans: Optional[List[Tuple[int, int]]] = None,
+                      with_tokens: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        按分片顺序产出分词结果
+
+        短于SEGMENTATION_PARALLEL_MIN_CHARS的文本在当前进程中作为一个分片处理。
+
+        Args:
+            text: 中文文本
+            with_pos: 是否进行词性标注
+            sentence_spans: 已有的分句结果
+            with_tokens: 是否进行带偏移量的分词
+
+        Yields:
+            {"index": 分片序号, "start": 分片起始位置, "end": 分片结束位置,
+             "tokens": [(词, 起始位置, 结束位置), ...]或None, "pos_tags": [(词, 词性), ...]或None}
+        """
+        if len(text) < settings.SEGMENTATION_PARALLEL_MIN_CHARS:
+            yield {"index": 0, "start": 0, "end": len(text), **_segment_shard(text, 0, with_pos, with_tokens)}
+            return
+
+        shards = self.shard(text, sentence_spans)
+        futures = self._submit(text, shards, with_pos, with_tokens)
+        try:
+            for index, ((start, end), future) in enumerate(zip(shards, futures)):
+                yield {"index": index, "start": start, "end": end, **future.result()}
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def aiter_segments(self,
+                             text: str,
+                             with_pos: bool = False,
+                             sentence_spans: Optional[List[Tuple[int, int]]] = None,
+                             with_tokens: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """iter_segments的异步版本，等待分片结果时不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        if len(text) < settings.SEGMENTATION_PARALLEL_MIN_CHARS:
+            result = await loop.run_in_executor(None, _segment_shard, text, 0, with_pos, with_tokens)
+            yield {"index": 0, "start": 0, "end": len(text), **result}
+            return
+
+        shards = await loop.run_in_executor(None, self.shard, text, sentence_spans)
+        futures = self._submit(text, shards, with_pos, with_tokens)
+        try:
+            for index, ((start, end), future) in enumerate(zip(shards, futures)):
+                yield {"index": index, "start": start, "end": end, **(await asyncio.wrap_future(future))}
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def tokenize(self,
+                 text: str,
+                 sentence_spans: Optional[List[Tuple[int, int]]] = None) -> List[Tuple[str, Tuple[int, int]]]:
+        """
+        全文分词，结果与jieba.tokenize相同
+
+        Returns:
+            [(词, (起始位置, 结束位置)), ...]
+        """
+        return [
+            (word, (start, end))
+            for segment in self.iter_segments(text, sentence_spans=sentence_spans)
+            for word, start, end in segment["tokens"]
+        ]
+
+    def pos_tag(self, text: str, sentence_spans: Optional[List[Tuple[int, int]]] = None) -> List[Tuple[str, str]]:
+        """
+        全文词性标注，结果与jieba.posseg.cut相同
+
+        Returns:
+            [(词, 词性), ...]
+        """
+        return [
+            pair
+            for segment in self.iter_segments(text, with_pos=True, sentence_spans=sentence_spans, with_tokens=False)
+            for pair in segment["pos_tags"]
+        ]
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _submit(self, text: str, shards: List[Tuple[int, int]], with_pos: bool, with_tokens: bool) -> List[Future]:
+        """把各分片提交到进程池"""
+        pool = self._get_pool()
+        logger.info(f"并行分词: {len(text)}字，{len(shards)}个分片，{self.worker_count()}个进程")
+        return [pool.submit(_segment_shard, text[start:end], start, with_pos, with_tokens) for start, end in shards]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """获取进程池，首次使用或用户词典有新词时（重新）创建"""
+        # 避免模块导入时加载术语库
+        from app.services.user_dictionary_service import TERM_TAG, user_dictionary_service
+
+        with self._lock:
+            version = user_dictionary_service.get_version()
+            if self._pool is not None and self._pool_version != version:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.worker_count(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(user_dictionary_service.get_words(), TERM_TAG)
+                )
+                self._pool_version = version
+            return self._pool
+
+
+# 单例实例
+segmentation_service = SegmentationService()
@@ -0,0 +1,237 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.data_service import data_service
+from app.services.evaluation_service import evaluation_service
+from app.utils.bleu_stats import clipped_matches, closest_reference_length, count_ngrams, exp_smoothed_bleu, order_totals
+from app.utils.text_index import TranslationIndex
+
+logger = logging.getLogger(__name__)
+
+MAX_ORDER = 4
+
+# 句段统计量的列：各阶匹配数、各阶总数、译文词元数、参考词元数、术语数、正确使用的术语数
+STAT_FIELDS = 2 * MAX_ORDER + 4
+
+
+class SignificanceService:
+    """
+    系统比较的显著性检验服务
+
+    各系统在同一测试集上的逐句段充分统计量堆叠为(系统数, 句段数, 统计量数)的矩阵。
+    配对bootstrap的每次重抽样用一组句段下标表示，下标数组换算为各句段被抽中的次数矩阵后，
+    与统计量矩阵相乘即得到全部重抽样、全部系统的汇总统计量，不需要逐次循环。
+    """
+
+    def segment_statistics(self,
+                           hypothesis: str,
+                           references: List[str],
+                           language: str = "en",
+                           source: Optional[str] = None,
+                           source_language: str = "zh",
+                           domain: str = "materials_science") -> List[float]:
+        """
+        计算单个句段的充分统计量
+
+        Args:
+            hypothesis: 系统译文
+            references: 该句段的参考译文（多个参考时n-gram计数取最大值，参考长度取最接近译文长度者）
+                分词方式与评估服务的语料级BLEU（sacrebleu）一致，汇总后的BLEU与sacrebleu的结果相同
+            language: 译文语言代码
+            source: 源文本，提供时统计术语库术语的使用情况
+            source_language: 源语言代码
+            domain: 领域名称
+
+        Returns:
+            长度为STAT_FIELDS的统计量
+        """
+        tokenizer = evaluation_service.bleu.tokenizer
+        tokens = tokenizer(hypothesis.strip()).split()
+        counts = count_ngrams(tokens, MAX_ORDER)
+        reference_counts: Dict[Any, int] = {}
+        reference_lengths = []
+        for reference in references:
+            reference_tokens = tokenizer(reference.strip()).split()
+            reference_lengths.append(len(reference_tokens))
+            for ngram, count in count_ngrams(reference_tokens, MAX_ORDER).items():
+                if count > reference_counts.get(ngram, 0):
+                    reference_counts[ngram] = count
+
+        stats = clipped_matches(counts, reference_counts, MAX_ORDER) + order_totals(counts, MAX_ORDER)
+        stats += [len(tokens), closest_reference_length(len(tokens), reference_lengths) if reference_lengths else 0]
+        stats += self._term_statistics(hypothesis, language, source, source_language, domain)
+        return stats
+
+    def _term_statistics(self,
+                         hypothesis: str,
+                         language: str,
+                         source: Optional[str],
+                         source_language: str,
+                         domain: str) -> List[float]:
+        """源文本中的术语数和译文正确使用的术语数（部分匹配按0.5计，与完整评估一致）"""
+        if not source:
+            return [0, 0]
+        terminology = data_service.load_terminology(domain, source_language, language)
+        if not terminology:
+            return [0, 0]
+        found_terms = [
+            terminology[index] for index in data_service.find_terms_in_text(source, domain, source_language, language)
+        ]
+        if not found_terms:
+            return [0, 0]
+        translation_index = TranslationIndex.for_terms(hypothesis, [term.target_term for term in found_terms], language)
+        score, _ = evaluation_service._score_terminology(found_terms, translation_index, language)
+        return [len(found_terms), score * len(found_terms)]
+
+    def collect_statistics(self,
+                           systems: List[Dict[str, Any]],
+                           references: Optional[List[List[str]]] = None,
+                           sources: Optional[List[str]] = None,
+                           source_language: str = "zh",
+                           target_language: str = "en",
+                           domain: str = "materials_science") -> np.ndarray:
+        """
+        将各系统的句段统计量（或由译文计算的统计量）堆叠为矩阵
+
+        Args:
+            systems: 系统列表，每项包含segments（逐句段统计量）或hypotheses（逐句段译文）
+            references: 按译文计算时各句段的参考译文
+            sources: 各句段的源文本，提供时按译文计算的统计量包含术语使用情况
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+
+        Returns:
+            形状为(系统数, 句段数, STAT_FIELDS)的统计量矩阵
+
+        Raises:
+            ValueError: 各系统句段数不一致，或按译文计算时缺少参考译文
+        """
+        matrices = []
+        for system in systems:
+            if system.get("segments") is not None:
+                rows = [
+                    list(segment["matches"]) + list(segment["totals"]) + [
+                        segment["hypothesis_length"], segment["reference_length"],
+                        segment["term_count"], segment["term_correct"]
+                    ]
+                    for segment in system["segments"]
+                ]
+            elif system.get("hypotheses") is not None:
+                hypotheses = system["hypotheses"]
+                if references is None or len(references) != len(hypotheses):
+                    raise ValueError(f"系统{system['name']}按译文比较时需要为每个句段提供参考译文")
+                if sources is not None and len(sources) != len(hypotheses):
+                    raise ValueError("源文本数量与句段数量不一致")
+                rows = [
+                    self.segment_statistics(
+                        hypothesis, references[index], target_language,
+                        sources[index] if sources is not None else None, source_language, domain
+                    )
+                    for index, hypothesis in enumerate(hypotheses)
+                ]
+            else:
+                raise ValueError(f"系统{system['name']}需要提供segments或hypotheses")
+            matrices.append(np.array(rows, dtype=float).reshape(-1, STAT_FIELDS))
+
+        segment_counts = {len(matrix) for matrix in matrices}
+        if len(segment_counts) != 1:
+            raise ValueError("各系统的句段数量必须相同")
+        if not segment_counts.pop():
+            raise ValueError("至少需要一个句段")
+        return np.stack(matrices)
+
+    def compare(self,
+                names: List[str],
+                statistics: np.ndarray,
+                n_resamples: int = 1000,
+                confidence: float = 0.95,
+                seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        配对bootstrap比较多个系统，第一个系统为基线
+
+        Args:
+            names: 系统名称
+            statistics: 形状为(系统数, 句段数, STAT_FIELDS)的统计量矩阵
+            n_resamples: 重抽样次数
+            confidence: 置信水平
+            seed: 随机种子
+
+        Returns:
+            各系统的得分及置信区间，以及其他系统相对基线的差值、置信区间和p值
+        """
+        system_count, segment_count, _ = statistics.shape
+        rng = np.random.default_rng(seed)
+
+        # 每次重抽样的句段下标 -> 各句段被抽中的次数，所有系统使用同一组下标（配对）
+        indices = rng.integers(0, segment_count, size=(n_resamples, segment_count))
+        offsets = np.arange(n_resamples)[:, None] * segment_count
+        draws = np.bincount((indices + offsets).ravel(), minlength=n_resamples * segment_count)
+        draws = draws.reshape(n_resamples, segment_count).astype(float)
+
+        # 第0行为全部句段的汇总（点估计），其余各行为重抽样结果：(系统数, 1 + 重抽样次数, STAT_FIELDS)
+        point = statistics.sum(axis=1)[:, None, :]
+        resampled = draws @ statistics
+        totals = np.concatenate([point, resampled], axis=1)
+
+        scores = {"bleu": self._bleu(totals)}
+        if totals[:, 0, 2 * MAX_ORDER + 2].min() > 0:
+            scores["terminology"] = totals[..., 2 * MAX_ORDER + 3] / np.maximum(totals[..., 2 * MAX_ORDER + 2], 1e-12)
+
+        alpha = (1 - confidence) / 2
+        systems = []
+        for index, name in enumerate(names):
+            system = {"name": name}
+            for metric, values in scores.items():
+                system[metric] = self._interval(values[index], alpha)
+            systems.append(system)
+
+        comparisons = []
+        for index in range(1, system_count):
+            for metric, values in scores.items():
+                deltas = values[index] - values[0]
+                observed = deltas[0]
+                samples = deltas[1:]
+                # 双侧p值：以重抽样差值的均值为中心，偏离程度不小于观测差值的比例
+                centered = np.abs(samples - samples.mean())
+                p_value = (np.count_nonzero(centered >= abs(observed)) + 1) / (n_resamples + 1)
+                lower, upper = np.quantile(samples, [alpha, 1 - alpha])
+                comparisons.append({
+                    "system": names[index],
+                    "baseline": names[0],
+                    "metric": metric,
+                    "difference": float(observed),
+                    "lower": float(lower),
+                    "upper": float(upper),
+                    "p_value": float(p_value),
+                    "significant": bool(p_value < 1 - confidence),
+                })
+
+        return {
+            "systems": systems,
+            "comparisons": comparisons,
+            "segment_count": segment_count,
+            "n_resamples": n_resamples,
+            "confidence": confidence,
+        }
+
+    @staticmethod
+    def _bleu(totals: np.ndarray) -> np.ndarray:
+        """由汇总统计量计算BLEU，输入形状为(系统数, 组数, STAT_FIELDS)，返回(系统数, 组数)"""
+        flat = totals.reshape(-1, STAT_FIELDS)
+        scores = exp_smoothed_bleu(
+            flat[:, :MAX_ORDER], flat[:, MAX_ORDER:2 * MAX_ORDER], flat[:, 2 * MAX_ORDER], flat[:, 2 * MAX_ORDER + 1]
+        )
+        return scores.reshape(totals.shape[:2])
+
+    @staticmethod
+    def _interval(values: np.ndarray, alpha: float) -> Dict[str, float]:
+        """values第一项为点估计，其余为重抽样结果"""
+        lower, upper = np.quantile(values[1:], [alpha, 1 - alpha])
+        return {"estimate": float(values[0]), "lower": float(lower), "upper": float(upper)}
+
+
+# 单例实例
+significance_service = SignificanceService()
@@ -0,0 +1,489 @@
+import os
+import json
+import math
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Any
+
+from app.core.config import settings
+from app.utils.aho_corasick import AhoCorasickAutomaton
+from app.utils.document_analysis import DocumentAnalysis
+from app.utils.nlp_resources import pseg
+from app.utils.segmenter import split_sentences
+from app.utils.term_candidates import chinese_noun_phrases, english_term_candidates
+
+
+logger = logging.getLogger(__name__)
+
+# 单个片段的候选术语对数量上限，句数对不上的长文档整体作为一个片段时超过此值即跳过，避免噪声和内存膨胀
+MAX_SEGMENT_PAIRS = 20000
+
+
+class FileAlignmentStats:
+    """单个参考文件对共现统计的贡献，删除或更新文件时按此扣减"""
+
+    def __init__(self, language_pair: Tuple[str, str], mtime: float):
+        self.language_pair = language_pair
+        self.mtime = mtime
+        self.segment_count = 0
+        self.source_counts: Counter = Counter()
+        self.target_counts: Counter = Counter()
+        self.pair_counts: Counter = Counter()
+
+
+class CooccurrenceIndex:
+    """一个语言对的术语共现统计，计数按片段（句对）出现与否累计"""
+
+    def __init__(self):
+        self.segment_count = 0
+        self.source_counts: Counter = Counter()
+        self.target_counts: Counter = Counter()
+        self.pair_counts: Counter = Counter()
+        # 由计数派生的最佳对照表和源术语自动机，计数变化后在下一次查询时重建
+        self._alignments: Optional[Dict[str, Tuple[str, float]]] = None
+        self._automaton: Optional[AhoCorasickAutomaton] = None
+
+    def apply(self, stats: FileAlignmentStats, sign: int) -> None:
+        """累加（sign=1）或扣减（sign=-1）一个文件的统计"""
+        self.segment_count += sign * stats.segment_count
+        for counts, delta in ((self.source_counts, stats.source_counts),
+                              (self.target_counts, stats.target_counts),
+                              (self.pair_counts, stats.pair_counts)):
+            for key, count in delta.items():
+                counts[key] += sign * count
+                if counts[key] <= 0:
+                    del counts[key]
+        self._alignments = None
+        self._automaton = None
+
+    def score(self, source_term: str, target_term: str) -> float:
+        """
+        计算术语对的关联强度
+
+        Args:
+            source_term: 源语言候选术语
+            target_term: 目标语言候选术语
+
+        Returns:
+            Dice系数或对数似然比，取决于TERM_ALIGNMENT_SCORE
+        """
+        joint = self.pair_counts.get((source_term, target_term), 0)
+        source_count = self.source_counts.get(source_term, 0)
+        target_count = self.target_counts.get(target_term, 0)
+        if settings.TERM_ALIGNMENT_SCORE == "llr":
+            return log_likelihood_ratio(joint, source_count, target_count, self.segment_count)
+        return 2.0 * joint / (source_count + target_count) if source_count + target_count else 0.0
+
+    @property
+    def alignments(self) -> Dict[str, Tuple[str, float]]:
+        """每个源术语关联最强的目标术语 {源术语: (目标术语, 得分)}"""
+        if self._alignments is None:
+            use_llr = settings.TERM_ALIGNMENT_SCORE == "llr"
+            min_score = settings.TERM_ALIGNMENT_MIN_LLR if use_llr else settings.TERM_ALIGNMENT_MIN_DICE
+            best: Dict[str, Tuple[str, float, int]] = {}
+            for (source_term, target_term), joint in self.pair_counts.items():
+                if joint < settings.TERM_ALIGNMENT_MIN_COOCCURRENCE:
+                    continue
+                score = self.score(source_term, target_term)
+                if score < min_score:
+                    continue
+                current = best.get(source_term)
+                # 同分时取共现次数多的，再取较长的目标术语，保证结果确定
+                if current is None or (score, joint, len(target_term), target_term) > (current[1], current[2], len(current[0]), current[0]):
+                    best[source_term] = (target_term, score, joint)
+            self._alignments = {source_term: (target, score) for source_term, (target, score, _) in best.items()}
+        return self._alignments
+
+    def automaton(self, source_language: str) -> AhoCorasickAutomaton:
+        """在源文本中查找已对齐源术语的多模式自动机"""
+        if self._automaton is None:
+            automaton = AhoCorasickAutomaton(ignore_case=source_language != "zh")
+            for source_term in self.alignments:
+                automaton.add(source_term, source_term)
+            self._automaton = automaton.build()
+        return self._automaton
+
+
+def log_likelihood_ratio(joint: int, source_count: int, target_count: int, total: int) -> float:
+    """
+    Dunning对数似然比（G²），衡量两个候选术语在片段中共现的显著性
+
+    Args:
+        joint: 共现片段数
+        source_count: 源术语出现的片段数
+        target_count: 目标术语出现的片段数
+        total: 片段总数
+
+    Returns:
+        G²统计量，共现少于期望值时为0
+    """
+    if total <= 0 or joint * total <= source_count * target_count:
+        return 0.0
+    table = (
+        (joint, source_count - joint),
+        (target_count - joint, total - source_count - target_count + joint),
+    )
+    row_sums = (source_count, total - source_count)
+    column_sums = (target_count, total - target_count)
+    g2 = 0.0
+    for i in range(2):
+        for j in range(2):
+            observed = table[i][j]
+            if observed > 0:
+                g2 += observed * math.log(observed * total / (row_sums[i] * column_sums[j]))
+    return 2.0 * g2
+
+
+class TermAlignmentService:
+    """
+    参考文本库术语对齐服务
+
+    对REFERENCE_TEXTS_DIR中的双语对齐参考文件（含source_text/target_text字段、
+    segments句对列表，或制表符分隔的.txt文件）按句对统计源语言和目标语言候选术语的共现次数，
+    并用Dice系数或对数似然比打分。参考译文模式的术语评估因此只需查表；
+    参考文件增删时按文件增量更新统计。只含content字段的单语参考文本（如示例数据）没有句对，不参与统计。
+
+    查询路径不读取文件：索引由启动预热建立（未预热时首次查询在后台线程中建立，建立完成前查询结果为空），
+    之后由上传、删除接口增量更新，并每隔TERM_ALIGNMENT_SYNC_INTERVAL秒在后台按文件修改时间与目录同步一次，
+    以发现绕过接口修改的文件。读取和统计文件在锁外进行，只有合并统计时持有锁。
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._indexes: Dict[Tuple[str, str], CooccurrenceIndex] = {}
+        self._files: Dict[str, FileAlignmentStats] = {}
+        self._loaded = False
+        # 索引内容每变化一次加1，用于依赖对齐结果的缓存
+        self._version = 0
+        # 上次与目录同步的时间（time.monotonic），以及是否有后台同步正在进行
+        self._last_sync: Optional[float] = None
+        self._syncing = False
+        # 每次reset加1，同步期间索引被清空时重新同步
+        self._generation = 0
+
+    def get_version(self) -> int:
+        """返回索引版本号（不读取文件，需要时安排后台同步）"""
+        self._schedule_sync()
+        return self._version
+
+    def load(self) -> int:
+        """
+        立即与参考文本目录同步（供启动预热和管理接口使用）
+
+        Returns:
+            索引版本号
+        """
+        self._sync()
+        return self._version
+
+    def lookup(self, source: DocumentAnalysis, reference: DocumentAnalysis) -> Dict[str, str]:
+        """
+        查找源文本中出现、且对照译法出现在参考译文中的术语对
+
+        Args:
+            source: 源文本的分析结果
+            reference: 参考译文的分析结果
+
+        Returns:
+            术语对照表 {源术语: 目标术语}，索引不可用时为空
+        """
+        if not settings.TERM_ALIGNMENT_ENABLED:
+            return {}
+        try:
+            self._schedule_sync()
+            with self._lock:
+                index = self._indexes.get((source.language, reference.language))
+                if index is None or not index.alignments:
+                    return {}
+                alignments = index.alignments
+                automaton = index.automaton(source.language)
+
+            matches = automaton.find_all(source.text, longest_only=True, word_boundary=source.language != "zh")
+            candidates = {}
+            for match in matches:
+                candidates.setdefault(source.text[match.start:match.end], alignments[match.value][0])
+            if not candidates:
+                return {}
+
+            # 只保留参考译文中确实使用了的对照译法
+            reference_index = reference.term_index(candidates.values())
+            return {
+                source_term: target_term
+                for source_term, target_term in candidates.items()
+                if reference_index.contains(target_term)
+            }
+        except Exception as e:
+            logger.error(f"查询术语对齐索引失败: {str(e)}")
+            return {}
+
+    def get_alignments(self, source_lang: str, target_lang: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        获取语言对下得分最高的术语对齐结果
+
+        Args:
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            limit: 返回的最大条数
+
+        Returns:
+            术语对齐列表，按得分降序
+        """
+        self._sync()
+        with self._lock:
+            index = self._indexes.get((source_lang, target_lang))
+            if index is None:
+                return []
+            items = sorted(index.alignments.items(), key=lambda item: (-item[1][1], item[0]))[:limit]
+            return [
+                {
+                    "source_term": source_term,
+                    "target_term": target_term,
+                    "score": score,
+                    "cooccurrence": index.pair_counts.get((source_term, target_term), 0),
+                }
+                for source_term, (target_term, score) in items
+            ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取索引规模统计"""
+        self._sync()
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "language_pairs": {
+                    f"{source_lang}-{target_lang}": {
+                        "segments": index.segment_count,
+                        "source_terms": len(index.source_counts),
+                        "target_terms": len(index.target_counts),
+                        "aligned_terms": len(index.alignments),
+                    }
+                    for (source_lang, target_lang), index in self._indexes.items()
+                },
+                "score": settings.TERM_ALIGNMENT_SCORE,
+            }
+
+    def update_file(self, file_id: str) -> None:
+        """
+        参考文件新增或修改后更新索引
+
+        Args:
+            file_id: 参考文件名
+        """
+        if not self._loaded:
+            # 索引尚未建立，建立时会完整扫描目录
+            return
+        stats = self._build_file_stats(file_id)
+        with self._lock:
+            if self._loaded:
+                self._replace(file_id, stats)
+
+    def remove_file(self, file_id: str) -> None:
+        """
+        参考文件删除后从索引中扣减其统计
+
+        Args:
+            file_id: 参考文件名
+        """
+        with self._lock:
+            if self._loaded:
+                self._remove(file_id)
+
+    def rebuild(self) -> Dict[str, Any]:
+        """丢弃现有统计并重新扫描参考文本目录"""
+        self.reset()
+        return self.get_stats()
+
+    def reset(self) -> None:
+        """清空索引，下次使用时重新扫描参考文本目录"""
+        with self._lock:
+            self._indexes = {}
+            self._files = {}
+            self._loaded = False
+            self._last_sync = None
+            self._generation += 1
+            self._version += 1
+
+    def _schedule_sync(self) -> None:
+        """索引尚未建立或距上次同步超过TERM_ALIGNMENT_SYNC_INTERVAL秒时，在后台线程中同步"""
+        with self._lock:
+            if self._syncing:
+                return
+            if self._loaded:
+                interval = settings.TERM_ALIGNMENT_SYNC_INTERVAL
+                if interval <= 0 or time.monotonic() - self._last_sync < interval:
+                    return
+            self._syncing = True
+        threading.Thread(target=self._background_sync, name="term-alignment-sync", daemon=True).start()
+
+    def _background_sync(self) -> None:
+        try:
+            self._sync()
+        except Exception as e:
+            logger.error(f"同步术语对齐索引失败: {str(e)}")
+        finally:
+            with self._lock:
+                self._syncing = False
+
+    def _sync(self) -> None:
+        """按文件修改时间与参考文本目录同步，只重新读取新增和修改的文件"""
+        directory = settings.REFERENCE_TEXTS_DIR
+        current = {}
+        if os.path.isdir(directory):
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.name.endswith(('.json', '.txt')):
+                    current[entry.name] = entry.stat().st_mtime
+
+        while True:
+            with self._lock:
+                generation = self._generation
+                known = {file_id: stats.mtime for file_id, stats in self._files.items()}
+            changed = {
+                file_id: self._build_file_stats(file_id)
+                for file_id, mtime in current.items()
+                if known.get(file_id) != mtime
+            }
+            with self._lock:
+                if generation != self._generation:
+                    # 读取期间索引被reset清空，按空索引重新读取
+                    continue
+                for file_id in list(self._files):
+                    if file_id not in current:
+                        self._remove(file_id)
+                for file_id, stats in changed.items():
+                    # 读取期间已由update_file、remove_file处理过的文件不再覆盖
+                    existing = self._files.get(file_id)
+                    if (existing.mtime if existing is not None else None) == known.get(file_id):
+                        self._replace(file_id, stats)
+                self._loaded = True
+                self._last_sync = time.monotonic()
+                return
+
+    def _replace(self, file_id: str, stats: Optional[FileAlignmentStats]) -> None:
+        """用新读取的文件统计替换旧统计，stats为None（文件已不存在或无法读取）时只扣减旧统计"""
+        self._remove(file_id)
+        if stats is None:
+            return
+        # 单语文件也记录修改时间，避免每次同步都重新读取
+        self._files[file_id] = stats
+        if stats.segment_count:
+            self._indexes.setdefault(stats.language_pair, CooccurrenceIndex()).apply(stats, 1)
+            self._version += 1
+
+    def _remove(self, file_id: str) -> None:
+        stats = self._files.pop(file_id, None)
+        if stats is not None and stats.segment_count and stats.language_pair in self._indexes:
+            self._indexes[stats.language_pair].apply(stats, -1)
+            self._version += 1
+
+    def _build_file_stats(self, file_id: str) -> Optional[FileAlignmentStats]:
+        """
+        读取参考文件并统计其中句对的候选术语共现
+
+        Args:
+            file_id: 参考文件名
+
+        Returns:
+            文件统计；文件不存在、不是双语对齐文本或语言未知时返回None
+        """
+        file_path = os.path.join(settings.REFERENCE_TEXTS_DIR, file_id)
+        try:
+            mtime = os.path.getmtime(file_path)
+            language_pair, segments = self._read_aligned_segments(file_path, file_id)
+        except Exception as e:
+            logger.warning(f"读取参考文件{file_id}失败，跳过术语对齐统计: {str(e)}")
+            return None
+        if language_pair is None or not segments:
+            # 单语参考文本没有可用的句对
+            return FileAlignmentStats(("", ""), mtime)
+
+        source_lang, target_lang = language_pair
+        stats = FileAlignmentStats(language_pair, mtime)
+        for source_segment, target_segment in segments:
+            source_terms = set(self._candidates(source_segment, source_lang))
+            target_terms = set(self._candidates(target_segment, target_lang))
+            if not source_terms or not target_terms or len(source_terms) * len(target_terms) > MAX_SEGMENT_PAIRS:
+                continue
+            stats.segment_count += 1
+            stats.source_counts.update(source_terms)
+            stats.target_counts.update(target_terms)
+            stats.pair_counts.update((source_term, target_term) for source_term in source_terms for target_term in target_terms)
+        return stats
+
+    def _read_aligned_segments(self, file_path: str, file_id: str) -> Tuple[Optional[Tuple[str, str]], List[Tuple[str, str]]]:
+        """
+        解析参考文件中的句对
+
+        Args:
+            file_path: 文件路径
+            file_id: 文件名，用于推断语言对（如name_zh_en.json、name_zh-en.txt）
+
+        Returns:
+            (语言对, 句对列表)
+        """
+        language_pair = _language_pair_from_name(file_id)
+        segments: List[Tuple[str, str]] = []
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        if file_id.endswith('.json'):
+            data = json.loads(content)
+            if not isinstance(data, dict):
+                return language_pair, []
+            if data.get("source_language") and data.get("target_language"):
+                language_pair = (data["source_language"], data["target_language"])
+            if language_pair is None:
+                return None, []
+            for item in data.get("segments") or data.get("pairs") or []:
+                source_segment = item.get("source") or item.get("source_text")
+                target_segment = item.get("target") or item.get("target_text")
+                if source_segment and target_segment:
+                    segments.append((source_segment, target_segment))
+            if not segments and data.get("source_text") and data.get("target_text"):
+                segments = _align_sentences(data["source_text"], data["target_text"], language_pair)
+        else:
+            # 文本文件中每行一个句对，源文与译文以制表符分隔
+            for line in content.splitlines():
+                if '\t' in line:
+                    source_segment, target_segment = line.split('\t', 1)
+                    if source_segment.strip() and target_segment.strip():
+                        segments.append((source_segment.strip(), target_segment.strip()))
+
+        return language_pair, segments
+
+    @staticmethod
+    def _candidates(text: str, language: str) -> List[str]:
+        """提取片段中的候选术语，英文统一为小写"""
+        if language == "zh":
+            return chinese_noun_phrases(pseg.cut(text))
+        return english_term_candidates(text)
+
+
+def _language_pair_from_name(file_id: str) -> Optional[Tuple[str, str]]:
+    """从文件名末尾的语言代码推断语言对，支持zh_en和zh-en两种写法"""
+    stem = os.path.splitext(file_id)[0]
+    if '_' in stem:
+        last = stem.rsplit('_', 1)[1]
+        if '-' in last:
+            source_lang, target_lang = last.split('-', 1)
+            return source_lang, target_lang
+        parts = stem.split('_')
+        if len(parts) >= 3 and len(parts[-1]) == 2 and len(parts[-2]) == 2:
+            return parts[-2], parts[-1]
+    return None
+
+
+def _align_sentences(source_text: str, target_text: str, language_pair: Tuple[str, str]) -> List[Tuple[str, str]]:
+    """整篇双语文本按句对齐：句数相同时逐句配对，否则整篇作为一个片段"""
+    source_lang, target_lang = language_pair
+    source_sentences = split_sentences(source_text, source_lang)
+    target_sentences = split_sentences(target_text, target_lang)
+    if len(source_sentences) == len(target_sentences):
+        return list(zip(source_sentences, target_sentences))
+    return [(source_text, target_text)]
+
+
+# 单例实例
+term_alignment_service = TermAlignmentService()
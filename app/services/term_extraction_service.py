@@ -0,0 +1,491 @@
+import asyncio
+import contextvars
+import json
+import logging
+import re
+import threading
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.llm_service import llm_service
+from app.utils.deadline import DeadlineExceeded, check_deadline, remaining_timeout
+from app.utils.segmenter import split_sentences
+
+logger = logging.getLogger(__name__)
+
+# 重试前的等待时间（秒），第n次重试等待RETRY_DELAY * 2^(n-1)
+RETRY_DELAY = 0.5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估计文本的令牌数：汉字等CJK字符每字约1个令牌，其他文字每个单词约1.3个令牌
+
+    Args:
+        text: 文本
+
+    Returns:
+        估计的令牌数
+    """
+    cjk = len(re.findall(r"[぀-ヿ㐀-鿿豈-﫿]", text))
+    words = len(re.findall(r"[^\s぀-ヿ㐀-鿿豈-﫿]+", text))
+    return cjk + int(words * 1.3)
+
+
+class TermExtractionService:
+    """
+    AI术语提取服务
+
+    源文本和译文按句子对齐后切分为不超过令牌预算的文本块，各块通过异步客户端并发提取术语，
+    失败的块单独重试。各块的结果合并去重：同一源术语的不同译法按出现的块数取最多者，
+    并统计每个术语出现的块数。
+    """
+
+    def chunk_pairs(self,
+                    source_text: str,
+                    translated_text: str,
+                    source_language: str,
+                    target_language: str,
+                    max_tokens: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        将源文本和译文切分为对齐的文本块
+
+        源文本按句累积到令牌预算为止，译文取按句子序号比例对应的句子；
+        两者句子数相同时逐句对应。单句超过预算时单独成块。译文句子少于源文本时，
+        块会超出预算继续累积源文本句子，直到对应至少一句译文，不产生译文为空的块。
+
+        Args:
+            source_text: 源文本
+            translated_text: 译文
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            max_tokens: 每块源文本与译文合计的令牌预算，默认使用配置项TERM_EXTRACTION_CHUNK_TOKENS
+
+        Returns:
+            (源文本块, 译文块)列表
+        """
+        max_tokens = max_tokens or settings.TERM_EXTRACTION_CHUNK_TOKENS
+        source_sentences = split_sentences(source_text, source_language)
+        target_sentences = split_sentences(translated_text, target_language)
+        if not source_sentences or not target_sentences:
+            return [(source_text, translated_text)]
+
+        source_count = len(source_sentences)
+        target_count = len(target_sentences)
+        target_sep = "" if target_language == "zh" else " "
+        source_sep = "" if source_language == "zh" else " "
+
+        def target_end(source_end: int) -> int:
+            """源文本前source_end句对应的译文句数"""
+            return source_end * target_count // source_count
+
+        chunks = []
+        start = 0
+        while start < source_count:
+            end = start + 1
+            tokens = (estimate_tokens(source_sentences[start])
+                      + sum(estimate_tokens(sentence) for sentence in target_sentences[target_end(start):target_end(end)]))
+            while end < source_count:
+                added = (estimate_tokens(source_sentences[end])
+                         + sum(estimate_tokens(sentence) for sentence in target_sentences[target_end(end):target_end(end + 1)]))
+                # 译文部分仍为空时不截断
+                if tokens + added > max_tokens and target_end(end) > target_end(start):
+                    break
+                tokens += added
+                end += 1
+            chunks.append((
+                source_sep.join(source_sentences[start:end]),
+                target_sep.join(target_sentences[target_end(start):target_end(end)])
+            ))
+            start = end
+        return chunks
+
+    async def extract(self,
+                      source_text: str,
+                      translated_text: str,
+                      source_language: str,
+                      target_language: str,
+                      domain: Optional[str] = None,
+                      max_tokens: Optional[int] = None,
+                      concurrency: Optional[int] = None,
+                      retries: Optional[int] = None) -> Dict[str, Any]:
+        """
+        分块并发提取术语对照并合并
+
+        Args:
+            source_text: 源文本
+            translated_text: 译文
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称，写入提示语
+            max_tokens: 每块的令牌预算，默认使用配置项TERM_EXTRACTION_CHUNK_TOKENS
+            concurrency: 并发请求数，默认使用配置项TERM_EXTRACTION_CONCURRENCY
+            retries: 每块失败后的重试次数，默认使用配置项TERM_EXTRACTION_RETRIES
+
+        Returns:
+            {"terms": 合并后的术语对照表, "frequencies": 各源术语出现的块数,
+             "conflicts": 有多种译法的源术语及各译法的块数, "chunks": 块数, "failed_chunks": 重试后仍失败的块数}
+        """
+        chunks = self.chunk_pairs(source_text, translated_text, source_language, target_language, max_tokens)
+        if not llm_service.completion_available():
+            logger.warning("未启用自定义API，无法进行AI术语提取")
+            return self._merge([], len(chunks), source_language)
+
+        semaphore = asyncio.Semaphore(concurrency or settings.TERM_EXTRACTION_CONCURRENCY)
+        retries = settings.TERM_EXTRACTION_RETRIES if retries is None else retries
+        results = await asyncio.gather(*(
+            self._extract_chunk(index, chunk, source_language, target_language, domain, semaphore, retries)
+            for index, chunk in enumerate(chunks)
+        ))
+        merged = self._merge([terms for terms in results if terms is not None], len(chunks), source_language)
+        logger.info(
+            f"AI术语提取完成: {len(chunks)}块，失败{merged['failed_chunks']}块，"
+            f"合并后{len(merged['terms'])}个术语，{len(merged['conflicts'])}个存在多种译法"
+        )
+        return merged
+
+    def extract_sync(self,
+                     source_text: str,
+                     translated_text: str,
+                     source_language: str,
+                     target_language: str,
+                     domain: Optional[str] = None) -> Dict[str, Any]:
+        """
+        extract的同步版本，供评估服务等同步代码调用
+
+        当前线程已有运行中的事件循环时（如在异步端点中直接调用），在单独的线程中运行，
+        并复制当前上下文，使截止时间和计时器对提取过程同样有效。
+        """
+        coroutine = self.extract(source_text, translated_text, source_language, target_language, domain)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(contextvars.copy_context().run, asyncio.run, coroutine).result()
+
+    async def _extract_chunk(self,
+                             index: int,
+                             chunk: Tuple[str, str],
+                             source_language: str,
+                             target_language: str,
+                             domain: Optional[str],
+                             semaphore: asyncio.Semaphore,
+                             retries: int) -> Optional[Dict[str, str]]:
+        """
+        提取单个文本块的术语，请求失败或返回内容无法解析时重试
+
+        Returns:
+            术语对照表，重试后仍失败时返回None
+
+        Raises:
+            DeadlineExceeded: 请求的时间预算已用完
+        """
+        prompt = self._build_prompt(chunk[0], chunk[1], source_language, target_language, domain)
+        # 短文本块首次提取时与其他请求的短文本块合并为一次调用，重试时单独调用
+        batchable = (extraction_batcher.enabled()
+                     and 2 * estimate_tokens(chunk[0] + chunk[1]) <= settings.TERM_EXTRACTION_CHUNK_TOKENS)
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+            # 时间预算用完时不再请求或重试
+            check_deadline()
+            try:
+                async with semaphore:
+                    if batchable and not attempt:
+                        return await extraction_batcher.submit(
+                            chunk[0], chunk[1], source_language, target_language, domain, remaining_timeout(60.0)
+                        )
+                    content = await llm_service.request_completion(prompt, timeout=remaining_timeout(60.0))
+                return self._parse_terms(content)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.warning(f"第{index + 1}块术语提取失败（第{attempt + 1}次）: {str(e)}")
+        logger.error(f"第{index + 1}块术语提取在{retries + 1}次尝试后仍失败")
+        return None
+
+    @staticmethod
+    def _build_prompt(source_text: str,
+                      translated_text: str,
+                      source_language: str,
+                      target_language: str,
+                      domain: Optional[str]) -> str:
+        """构建术语提取提示语"""
+        domain_line = f"领域: {domain}\n" if domain else ""
+        return f"""
+请从以下{source_language}源文本和{target_language}译文中，提取专业术语及其对应的翻译。
+输出格式为JSON，格式为：{{"源语言术语": "目标语言术语", ...}}
+只返回JSON格式，不要添加其他说明。
+{domain_line}
+源文本（{source_language}）:
+{source_text}
+
+译文（{target_language}）:
+{translated_text}
+            """
+
+    @staticmethod
+    def _parse_terms(content: str) -> Dict[str, str]:
+        """
+        从AI返回的内容中解析术语对照表
+
+        Raises:
+            ValueError: 内容中没有JSON对象或JSON不是对象
+        """
+        json_match = re.search(r'({[\s\S]*})', content)
+        if json_match:
+            content = json_match.group(1)
+        return TermExtractionService._clean_terms(json.loads(content))
+
+    @staticmethod
+    def _clean_terms(terms: Any) -> Dict[str, str]:
+        """
+        整理术语对照表，去掉首尾空白和空术语
+
+        Raises:
+            ValueError: 不是字典
+        """
+        if not isinstance(terms, dict):
+            raise ValueError(f"解析的术语不是字典格式: {type(terms)}")
+        return {
+            str(source).strip(): str(target).strip()
+            for source, target in terms.items()
+            if str(source).strip() and str(target).strip()
+        }
+
+    @staticmethod
+    def _merge(chunk_terms: List[Dict[str, str]], chunk_count: int, source_language: str) -> Dict[str, Any]:
+        """
+        合并各块的术语对照表
+
+        英文等源术语忽略大小写去重，保留首次出现的写法；同一源术语有多种译法时取出现块数最多者，
+        块数相同时取先出现者。
+
+        Args:
+            chunk_terms: 各成功块的术语对照表，按块的顺序排列
+            chunk_count: 总块数
+            source_language: 源语言代码
+
+        Returns:
+            合并结果，格式同extract
+        """
+        spellings: Dict[str, str] = {}
+        variants: Dict[str, Dict[str, int]] = {}
+        for terms in chunk_terms:
+            for source_term, target_term in terms.items():
+                key = source_term if source_language == "zh" else source_term.lower()
+                spellings.setdefault(key, source_term)
+                counts = variants.setdefault(key, {})
+                counts[target_term] = counts.get(target_term, 0) + 1
+
+        merged = {}
+        frequencies = {}
+        conflicts = {}
+        for key, counts in variants.items():
+            source_term = spellings[key]
+            # max保留并列最大值中的第一个，即先出现的译法
+            merged[source_term] = max(counts, key=counts.get)
+            frequencies[source_term] = sum(counts.values())
+            if len(counts) > 1:
+                conflicts[source_term] = dict(counts)
+        return {
+            "terms": merged,
+            "frequencies": frequencies,
+            "conflicts": conflicts,
+            "chunks": chunk_count,
+            "failed_chunks": chunk_count - len(chunk_terms),
+        }
+
+
+class ExtractionBatcher:
+    """
+    AI术语提取的合批器
+
+    在短时间窗口内收集相同语言对和领域的短文本块，打包为一个带编号的提示语，一次调用提取全部条目的术语，
+    再按编号把结果分发给各调用方，减少短文本逐条调用时提示语开销占主导的上游请求。
+    各评估请求在各自的线程和事件循环中提取术语，合批器在独立的后台事件循环中收集和发送请求。
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        # (源语言, 目标语言, 领域) -> 等待发送的条目
+        self._pending: Dict[Tuple[str, str, Optional[str]], List[Dict[str, Any]]] = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {"items": 0, "upstream_calls": 0, "batched_calls": 0}
+
+    @staticmethod
+    def enabled() -> bool:
+        """是否启用合批"""
+        return settings.TERM_EXTRACTION_BATCH_WINDOW_MS > 0 and settings.TERM_EXTRACTION_BATCH_MAX_ITEMS > 1
+
+    async def submit(self,
+                     source_text: str,
+                     translated_text: str,
+                     source_language: str,
+                     target_language: str,
+                     domain: Optional[str] = None,
+                     timeout: float = 60.0) -> Dict[str, str]:
+        """
+        提交一个文本块，等待所在批次的提取结果
+
+        Args:
+            source_text: 源文本块
+            translated_text: 译文块
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            timeout: 等待结果的超时时间（秒）
+
+        Returns:
+            该文本块的术语对照表
+
+        Raises:
+            RuntimeError: 批次调用失败
+            ValueError: 返回内容无法解析，或结果中缺少该文本块
+            asyncio.TimeoutError: 超时
+        """
+        future: Future = Future()
+        item = {
+            "source_text": source_text,
+            "translated_text": translated_text,
+            "timeout": timeout,
+            "future": future,
+        }
+        key = (source_language, target_language, domain)
+        self._ensure_loop().call_soon_threadsafe(self._enqueue, key, item)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取合批统计：提交的条目数、实际的上游调用数、其中合并了多个条目的调用数
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["items_per_call"] = stats["items"] / stats["upstream_calls"] if stats["upstream_calls"] else 0.0
+        return stats
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """首次使用时启动后台事件循环线程"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="term-extraction-batcher", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _enqueue(self, key: Tuple[str, str, Optional[str]], item: Dict[str, Any]) -> None:
+        """加入等待队列（在后台事件循环中执行），批次的第一个条目启动收集窗口，条目数达到上限时立即发送"""
+        pending = self._pending.setdefault(key, [])
+        pending.append(item)
+        if len(pending) == 1:
+            self._loop.call_later(settings.TERM_EXTRACTION_BATCH_WINDOW_MS / 1000, self._flush, key, pending)
+        if len(pending) >= settings.TERM_EXTRACTION_BATCH_MAX_ITEMS:
+            self._flush(key, pending)
+
+    def _flush(self, key: Tuple[str, str, Optional[str]], pending: List[Dict[str, Any]]) -> None:
+        """发送批次；窗口到期时批次已因条目数达到上限发送过则忽略"""
+        if self._pending.get(key) is not pending:
+            return
+        del self._pending[key]
+        self._loop.create_task(self._run_batch(key, pending))
+
+    async def _run_batch(self, key: Tuple[str, str, Optional[str]], items: List[Dict[str, Any]]) -> None:
+        """调用一次AI提取批次内全部条目的术语，并把结果或异常分发给各条目"""
+        source_language, target_language, domain = key
+        with self._stats_lock:
+            self._stats["items"] += len(items)
+            self._stats["upstream_calls"] += 1
+            if len(items) > 1:
+                self._stats["batched_calls"] += 1
+
+        try:
+            timeout = max(item["timeout"] for item in items)
+            if len(items) == 1:
+                item = items[0]
+                prompt = TermExtractionService._build_prompt(
+                    item["source_text"], item["translated_text"], source_language, target_language, domain
+                )
+                content = await llm_service.request_completion(prompt, timeout=timeout)
+                results = {"1": TermExtractionService._parse_terms(content)}
+            else:
+                prompt = self._build_batch_prompt(items, source_language, target_language, domain)
+                content = await llm_service.request_completion(prompt, timeout=timeout)
+                results = self._parse_batch(content)
+            logger.debug(f"合批提取术语: {len(items)}个文本块，1次调用")
+        except Exception as e:
+            for item in items:
+                self._resolve(item["future"], error=e)
+            return
+
+        for index, item in enumerate(items, 1):
+            terms = results.get(str(index))
+            if terms is None:
+                self._resolve(item["future"], error=ValueError(f"合批结果中缺少第{index}项"))
+            else:
+                self._resolve(item["future"], result=terms)
+
+    @staticmethod
+    def _resolve(future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """设置条目的结果，调用方已超时取消的条目忽略"""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    @staticmethod
+    def _build_batch_prompt(items: List[Dict[str, Any]],
+                            source_language: str,
+                            target_language: str,
+                            domain: Optional[str]) -> str:
+        """构建带编号的多条目术语提取提示语"""
+        domain_line = f"领域: {domain}\n" if domain else ""
+        sections = "\n".join(
+            f"""[{index}]
+源文本（{source_language}）:
+{item["source_text"]}
+
+译文（{target_language}）:
+{item["translated_text"]}
+"""
+            for index, item in enumerate(items, 1)
+        )
+        return f"""
+以下是{len(items)}组编号的{source_language}源文本和{target_language}译文，请分别从每组中提取专业术语及其对应的翻译。
+输出格式为JSON，以编号为键，格式为：{{"1": {{"源语言术语": "目标语言术语", ...}}, "2": {{...}}, ...}}
+每个编号都要出现在结果中，没有术语的组对应空对象。只返回JSON格式，不要添加其他说明。
+{domain_line}
+{sections}
+            """
+
+    @staticmethod
+    def _parse_batch(content: str) -> Dict[str, Dict[str, str]]:
+        """
+        解析多条目提取的结果，格式不正确的条目略过（由调用方单独重试）
+
+        Raises:
+            ValueError: 内容中没有JSON对象
+        """
+        json_match = re.search(r'({[\s\S]*})', content)
+        if json_match:
+            content = json_match.group(1)
+        results = json.loads(content)
+        if not isinstance(results, dict):
+            raise ValueError(f"合批结果不是字典格式: {type(results)}")
+        parsed = {}
+        for index, terms in results.items():
+            try:
+                parsed[str(index).strip("[] ")] = TermExtractionService._clean_terms(terms)
+            except ValueError:
+                logger.warning(f"合批结果中第{index}项格式不正确: {terms!r}")
+        return parsed
+
+
+# 单例实例
+term_extraction_service = TermExtractionService()
+extraction_batcher = ExtractionBatcher()
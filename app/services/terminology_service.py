@@ -4,6 +4,8 @@ from typing import Dict, List, Optional, Tuple, Any
 
 from app.db.database import db
 from app.models.schemas import TerminologyEntry
+from app.services.data_service import data_service
+from app.services.user_dictionary_service import user_dictionary_service
 
 logger = logging.getLogger(__name__)
 
@@ -114,6 +116,11 @@ class TerminologyService:
                 db.execute(insert_query, (source_term, target_term, domain, source_lang, target_lang, definition))
                 logger.info(f"添加新术语: {source_term} -> {target_term}")
             
+            # 中文术语加入jieba词典
+            user_dictionary_service.add_term(source_term, target_term, source_lang, target_lang)
+            
+            # 通知依赖该术语库的缓存失效
+            data_service.invalidate_terminology(domain, source_lang, target_lang)
             return True
         except Exception as e:
             logger.error(f"添加/更新术语失败: {str(e)}")
@@ -130,9 +137,17 @@ class TerminologyService:
             是否成功
         """
         try:
+            existing = db.fetch_one(
+                "SELECT domain, source_language, target_language FROM terminology WHERE id = ?", (term_id,)
+            )
             query = "DELETE FROM terminology WHERE id = ?"
             db.execute(query, (term_id,))
             logger.info(f"删除术语ID: {term_id}")
+            
+            if existing:
+                data_service.invalidate_terminology(
+                    existing['domain'], existing['source_language'], existing['target_language']
+                )
             return True
         except Exception as e:
             logger.error(f"删除术语失败: {str(e)}")
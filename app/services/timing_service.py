@@ -0,0 +1,152 @@
+import bisect
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+
+# 延迟直方图的桶上界（毫秒），最后一个桶收集所有更慢的请求
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+# 当前请求的计时器，评估服务的各个辅助方法通过timing_service.stage记录子阶段耗时
+_current_timer: ContextVar[Optional["StageTimer"]] = ContextVar("current_stage_timer", default=None)
+
+
+class StageTimer:
+    """
+    单次请求的分阶段计时器
+
+    各阶段耗时以毫秒为单位按首次出现顺序保存，同名阶段多次执行时累加。
+    可在多个线程中同时记录（并发计算的各项指标）。
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """记录with代码块的耗时"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        """累加阶段耗时（毫秒）"""
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed_ms
+
+    @contextmanager
+    def activate(self) -> Iterator["StageTimer"]:
+        """将本计时器设为当前上下文的计时器"""
+        token = _current_timer.set(self)
+        try:
+            yield self
+        finally:
+            _current_timer.reset(token)
+
+    def server_timing(self) -> str:
+        """
+        生成Server-Timing响应头的值
+
+        Returns:
+            形如"bleu;dur=12.3, terminology;dur=4.5"的字符串
+        """
+        return ", ".join(
+            f"{re.sub(r'[^A-Za-z0-9_.-]', '', name)};dur={elapsed:.1f}" for name, elapsed in self.timings.items()
+        )
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.bucket_counts[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """按桶上界估计分位数（落在最后一个桶时返回最大值）"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return float(HISTOGRAM_BUCKETS_MS[index]) if index < len(HISTOGRAM_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.bucket_counts)),
+        }
+
+
+class TimingService:
+    """汇总各请求的分阶段耗时，按阶段维护延迟直方图"""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        在当前请求的计时器上记录一个阶段，没有活动的计时器时不做任何事
+
+        Args:
+            name: 阶段名称，子阶段用点号分隔，如bleu.corpus
+        """
+        timer = _current_timer.get()
+        if timer is None:
+            yield
+            return
+        with timer.stage(name):
+            yield
+
+    def record(self, timings: Dict[str, float]) -> None:
+        """
+        将一次请求的各阶段耗时计入直方图
+
+        Args:
+            timings: 阶段名称 -> 耗时（毫秒）
+        """
+        with self._lock:
+            for name, elapsed in timings.items():
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    histogram = self._histograms[name] = LatencyHistogram()
+                histogram.observe(elapsed)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各阶段的延迟统计"""
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        with self._lock:
+            self._histograms.clear()
+
+
+# 单例实例
+timing_service = TimingService()
@@ -0,0 +1,252 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.models.schemas import EvaluationResponse, TranslateAndEvaluateResponse, TranslationResponse
+from app.services.evaluation_cache import normalize_text
+from app.services.evaluation_service import METRICS, evaluation_service
+from app.services.evaluation_session_service import EvaluationSession, evaluation_session_service
+from app.services.llm_service import llm_service
+from app.services.timing_service import StageTimer, timing_service
+from app.utils.segmenter import IncrementalSegmenter
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationPipelineService:
+    """
+    翻译并评估的流水线服务
+
+    调用大模型翻译的同时，在线程池中完成源文本术语查找、参考译文分句分词等评分前的准备工作；
+    译文返回后立即在准备好的共享分析上评分，总耗时接近max(翻译, 准备) + 评分。
+    """
+
+    async def translate_and_evaluate(self,
+                                     source_text: str,
+                                     reference_texts: List[str],
+                                     source_language: str = "zh",
+                                     target_language: str = "en",
+                                     domain: str = "materials_science",
+                                     model: Optional[str] = None,
+                                     metrics: Optional[List[str]] = None) -> Tuple[TranslateAndEvaluateResponse, StageTimer]:
+        """
+        翻译源文本并评估译文
+
+        Args:
+            source_text: 源文本
+            reference_texts: 参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            model: 可选的模型名称
+            metrics: 需要计算的评估指标，默认计算全部已注册指标
+
+        Returns:
+            翻译和评估结果，以及记录了各阶段耗时的计时器（用于生成Server-Timing响应头）
+
+        Raises:
+            ValueError: 请求了未注册的评估指标
+        """
+        metrics = evaluation_service.metric_registry.resolve(metrics)
+        timer = StageTimer()
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        with timer.activate():
+            # 评分前的准备在线程池中与翻译请求同时进行，复制当前上下文使耗时记录到本请求的计时器
+            prepare_future = loop.run_in_executor(
+                None, contextvars.copy_context().run, evaluation_service.build_shared_context,
+                source_text, reference_texts, source_language, target_language, domain, metrics
+            )
+            translation_result, shared_context = await asyncio.gather(
+                self._translate(timer, source_text, source_language, target_language, model),
+                prepare_future
+            )
+
+            with timer.stage("score"):
+                evaluation = await loop.run_in_executor(
+                    None, contextvars.copy_context().run, evaluation_service.evaluate_candidate,
+                    shared_context, translation_result["translated_text"], metrics
+                )
+
+        timer.add("total", (time.perf_counter() - started) * 1000)
+        timing_service.record(timer.timings)
+        logger.info(f"翻译并评估完成，各阶段耗时(ms): {timer.timings}")
+
+        response = TranslateAndEvaluateResponse(
+            translation=TranslationResponse(
+                source_text=source_text,
+                translated_text=translation_result["translated_text"],
+                model=translation_result["model_used"],
+                source_language=source_language,
+                target_language=target_language,
+                domain=domain
+            ),
+            evaluation=evaluation,
+            simulated=bool(translation_result.get("simulated")),
+            timings=dict(timer.timings)
+        )
+        return response, timer
+
+    async def stream_translate_and_evaluate(self,
+                                            source_text: str,
+                                            reference_texts: List[str],
+                                            source_language: str = "zh",
+                                            target_language: str = "en",
+                                            domain: str = "materials_science",
+                                            model: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式翻译并逐句评估
+        
+        大模型的输出逐段到达时增量分句，每确认一个句子就在线程池中计算该句的句子级BLEU和术语使用情况，
+        并更新整篇的滚动得分。评分与接收输出同时进行：评分尚未完成时到达的句子合并到下一批。
+        译文结束时只剩最后几句需要分析，整篇得分随即产出。评估基于评估会话，结束后可以继续按会话修改译文。
+        
+        Args:
+            source_text: 源文本
+            reference_texts: 参考译文列表
+            source_language: 源语言代码
+            target_language: 目标语言代码
+            domain: 领域名称
+            model: 可选的模型名称
+            
+        Yields:
+            事件字典：每段输出一个{"event": "delta", ...}；每个确认的句子一个{"event": "sentence", ...}，
+            包含句子在译文中的区间、句子级BLEU和出现的目标术语；每批句子评分后一个{"event": "scores", ...}，
+            包含当前已完成部分的各项得分；最后一个{"event": "result", ...}，包含完整译文、整篇评估结果和会话ID
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        
+        # 源文本和参考译文在等待模型输出时分析
+        session_future = loop.run_in_executor(
+            None, evaluation_session_service.open_session,
+            source_text, reference_texts, source_language, target_language, domain
+        )
+        segmenter = IncrementalSegmenter(target_language)
+        chunks = llm_service.stream_translation(source_text, source_language, target_language, model).__aiter__()
+        next_chunk: Optional[asyncio.Future] = asyncio.ensure_future(chunks.__anext__())
+        scoring: Optional[asyncio.Future] = None
+        closed_spans = []
+        scored = 0
+        first_token_ms = None
+        
+        try:
+            while next_chunk is not None or scoring is not None or scored < len(closed_spans):
+                if scoring is None and scored < len(closed_spans) and session_future.done():
+                    # 评分空闲时提交所有待评分的句子
+                    scoring = loop.run_in_executor(
+                        None, self._score_sentences, await session_future, segmenter.text, closed_spans[scored:]
+                    )
+                    scored = len(closed_spans)
+                
+                waiting = [future for future in (next_chunk, scoring) if future is not None]
+                if scored < len(closed_spans) and scoring is None:
+                    waiting.append(session_future)
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                
+                if next_chunk in done:
+                    try:
+                        chunk = next_chunk.result()
+                    except StopAsyncIteration:
+                        next_chunk = None
+                        closed_spans.extend(segmenter.close())
+                    else:
+                        if first_token_ms is None:
+                            first_token_ms = (time.perf_counter() - started) * 1000
+                        yield {"event": "delta", "text": chunk}
+                        closed_spans.extend(segmenter.feed(chunk))
+                        next_chunk = asyncio.ensure_future(chunks.__anext__())
+                
+                if scoring is not None and scoring in done:
+                    events = scoring.result()
+                    scoring = None
+                    for event in events:
+                        yield event
+        finally:
+            if next_chunk is not None:
+                next_chunk.cancel()
+        
+        llm_ms = (time.perf_counter() - started) * 1000
+        session = await session_future
+        translated_text = segmenter.text
+        response = await loop.run_in_executor(None, self._finish_session, session, translated_text)
+        total_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"流式翻译并评估完成，模型输出耗时{llm_ms:.0f}ms，总耗时{total_ms:.0f}ms")
+        
+        yield {
+            "event": "result",
+            "translation": TranslationResponse(
+                source_text=source_text,
+                translated_text=translated_text,
+                model=model,
+                source_language=source_language,
+                target_language=target_language,
+                domain=domain
+            ).model_dump(),
+            "evaluation": response.model_dump(),
+            "session_id": session.session_id,
+            "timings": {"first_token": first_token_ms, "llm": llm_ms, "total": total_ms},
+        }
+    
+    @staticmethod
+    def _score_sentences(session: EvaluationSession,
+                         text: str,
+                         spans: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """
+        评估新确认的句子并更新滚动得分（在线程池中执行）
+        
+        Args:
+            session: 评估会话
+            text: 当前已收到的译文
+            spans: 新确认的句子在译文中的区间
+            
+        Returns:
+            各句的sentence事件和一个scores事件
+        """
+        with session.lock:
+            # 会话中的译文为截至最后一个确认句子的部分，未确认的句子不参与评分
+            session.update(normalize_text(text[:spans[-1][1]]))
+            events = []
+            for start, end in spans:
+                events.append({
+                    "event": "sentence",
+                    "start": start,
+                    "end": end,
+                    "text": text[start:end],
+                    **session.sentence_details(normalize_text(text[start:end])),
+                })
+            response = session.evaluate()
+        
+        events.append({
+            "event": "scores",
+            "sentence_count": len(session.records),
+            "overall_score": response.overall_score.score,
+            **{f"{name}_score": getattr(response, f"{name}_score").score for name in METRICS},
+        })
+        return events
+    
+    @staticmethod
+    def _finish_session(session: EvaluationSession, translated_text: str) -> EvaluationResponse:
+        """用完整译文评估会话并登记，之前评分过的句子直接复用分析结果"""
+        with session.lock:
+            session.update(normalize_text(translated_text))
+            response = session.evaluate()
+        evaluation_session_service.register_session(session)
+        return response
+    
+    @staticmethod
+    async def _translate(timer: StageTimer,
+                         source_text: str,
+                         source_language: str,
+                         target_language: str,
+                         model: Optional[str]) -> Dict[str, Any]:
+        """调用大模型翻译并记录耗时"""
+        with timer.stage("llm"):
+            return await llm_service.translate_text(source_text, source_language, target_language, model)
+
+
+# 单例实例
+translation_pipeline_service = TranslationPipelineService()
@@ -0,0 +1,162 @@
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.database import db
+from app.services.data_service import data_service
+from app.services.term_alignment_service import term_alignment_service
+from app.utils.nlp_resources import jieba
+
+logger = logging.getLogger(__name__)
+
+_CJK_PATTERN = re.compile(r"[一-鿿]")
+
+# 术语加入jieba时的词性（其他专有名词），词性标注后作为名词参与候选术语提取
+TERM_TAG = "nz"
+
+
+class UserDictionaryService:
+    """
+    与术语库同步的jieba用户词典
+
+    术语库（数据库和JSON术语库文件）中的中文术语加入jieba词典，使“晶格常数”“热导率”等多字术语
+    在分词和词性标注中保持完整。启动预热时加载全部术语，之后数据库新增的术语直接加入，
+    JSON术语库文件变更时按文件重新读取。词典每加入新词版本号加1，评估结果缓存键包含该版本号，
+    参考文本库对齐索引随之重建。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._words = set()
+        self._version = 0
+        # JSON术语库文件 -> 上次读取时的修改时间
+        self._file_mtimes: Dict[str, float] = {}
+
+    def get_version(self) -> int:
+        """分词词典版本号，加入新词后加1"""
+        return self._version
+
+    def load_all(self) -> int:
+        """
+        加载数据库和全部JSON术语库文件中的中文术语
+
+        Returns:
+            新加入的词数
+        """
+        words = []
+        try:
+            rows = db.fetch_all("SELECT source_term, target_term, source_language, target_language FROM terminology")
+            for row in rows:
+                words.extend(self._chinese_terms(
+                    row["source_term"], row["target_term"], row["source_language"], row["target_language"]
+                ))
+        except Exception as e:
+            logger.error(f"读取数据库术语失败: {str(e)}")
+
+        if os.path.isdir(settings.TERMINOLOGY_DIR):
+            for file_name in sorted(os.listdir(settings.TERMINOLOGY_DIR)):
+                termbase = self._parse_termbase_name(file_name)
+                if termbase:
+                    words.extend(self._termbase_file_words(*termbase, force=True))
+        return self.add_words(words)
+
+    def add_term(self, source_term: str, target_term: str, source_lang: str, target_lang: str) -> int:
+        """
+        加入一条术语的中文部分
+
+        Returns:
+            新加入的词数
+        """
+        return self.add_words(self._chinese_terms(source_term, target_term, source_lang, target_lang))
+
+    def sync_termbase(self, domain: str, source_lang: str, target_lang: str) -> None:
+        """
+        术语变更监听器：对应的JSON术语库文件有变化时重新读取并加入新术语
+
+        数据库中的术语由add_term直接加入，文件未变化时不重复读取
+        """
+        words = self._termbase_file_words(domain, source_lang, target_lang)
+        if words:
+            self.add_words(words)
+
+    def add_words(self, words: Iterable[str]) -> int:
+        """
+        把词加入jieba词典（已加入的词忽略）
+
+        Args:
+            words: 中文词语
+
+        Returns:
+            新加入的词数
+        """
+        with self._lock:
+            new_words = []
+            for word in words:
+                word = word.strip()
+                if len(word) >= 2 and word not in self._words:
+                    self._words.add(word)
+                    new_words.append(word)
+            if not new_words:
+                return 0
+            for word in new_words:
+                jieba.add_word(word, tag=TERM_TAG)
+            self._version += 1
+
+        # 对齐索引的候选术语依赖分词结果，下次查询时重新扫描参考文本
+        term_alignment_service.reset()
+        logger.info(f"jieba用户词典加入{len(new_words)}个术语，共{len(self._words)}个，词典版本{self._version}")
+        return len(new_words)
+
+    def get_words(self) -> List[str]:
+        """已加入的全部词语，供并行分词的子进程加载"""
+        with self._lock:
+            return sorted(self._words)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取用户词典统计"""
+        with self._lock:
+            return {"words": len(self._words), "version": self._version}
+
+    def _termbase_file_words(self, domain: str, source_lang: str, target_lang: str, force: bool = False) -> List[str]:
+        """JSON术语库文件中的中文术语，文件自上次读取后未变化时返回空列表"""
+        file_path = os.path.join(settings.TERMINOLOGY_DIR, f"{domain}_{source_lang}_{target_lang}.json")
+        try:
+            mtime = os.path.getmtime(file_path)
+        except OSError:
+            return []
+        if not force and self._file_mtimes.get(file_path) == mtime:
+            return []
+        self._file_mtimes[file_path] = mtime
+
+        words = []
+        for entry in data_service.load_terminology(domain, source_lang, target_lang):
+            words.extend(self._chinese_terms(entry.source_term, entry.target_term, source_lang, target_lang))
+        return words
+
+    @staticmethod
+    def _chinese_terms(source_term: str, target_term: str, source_lang: str, target_lang: str) -> List[str]:
+        """术语对中的中文术语（源语言或目标语言为中文的一侧）"""
+        terms = []
+        if source_lang == "zh" and source_term and _CJK_PATTERN.search(source_term):
+            terms.append(source_term)
+        if target_lang == "zh" and target_term and _CJK_PATTERN.search(target_term):
+            terms.append(target_term)
+        return terms
+
+    @staticmethod
+    def _parse_termbase_name(file_name: str) -> Optional[Tuple[str, str, str]]:
+        """由术语库文件名{domain}_{source_lang}_{target_lang}.json解析领域和语言对，不符合格式时返回None"""
+        if not file_name.endswith(".json"):
+            return None
+        parts = file_name[:-len(".json")].rsplit("_", 2)
+        if len(parts) != 3 or not all(parts):
+            return None
+        return parts[0], parts[1], parts[2]
+
+
+# 单例实例
+user_dictionary_service = UserDictionaryService()
+data_service.add_terminology_listener(user_dictionary_service.sync_termbase)
@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.data_service import data_service
+from app.services.evaluation_service import evaluation_service
+from app.services.term_alignment_service import term_alignment_service
+from app.services.user_dictionary_service import user_dictionary_service
+from app.utils.document_analysis import tokenize_sentence
+from app.utils.nlp_resources import jieba, nltk, pseg
+
+logger = logging.getLogger(__name__)
+
+# 模拟评估使用的中英文对照样例
+SAMPLE_ZH = "氧化铝陶瓷具有优异的耐高温性能。烧结温度对材料的致密度和力学性能有显著影响。"
+SAMPLE_EN = ("Alumina ceramics have excellent high-temperature resistance. "
+             "The sintering temperature has a significant effect on the density and mechanical properties of the material.")
+
+
+class WarmupService:
+    """
+    启动预热服务
+
+    应用启动后在后台线程中依次加载nltk、jieba（前缀词典和词性标注模型）、术语库中文术语组成的用户词典、
+    BLEU计算器、术语库匹配自动机和参考文本库对齐索引，并用中英双向样例各执行一次完整评估，
+    使首批请求不再承担这些初始化开销。各组件的状态和耗时供就绪检查使用。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        for name, _ in self._steps():
+            self._components[name] = {"name": name, "status": "pending", "duration_ms": None, "error": None}
+
+    def _steps(self) -> List[Tuple[str, Callable[[], None]]]:
+        """预热步骤，按顺序执行"""
+        return [
+            ("nltk", self._warm_nltk),
+            ("jieba", self._warm_jieba),
+            ("user_dictionary", user_dictionary_service.load_all),
+            ("bleu", self._warm_bleu),
+            ("terminology", self._warm_terminology),
+            ("reference_alignment", term_alignment_service.load),
+            ("evaluation", self._warm_evaluation),
+        ]
+
+    def start(self) -> None:
+        """在后台线程中开始预热（只执行一次），未启用预热时不执行"""
+        if not settings.WARMUP_ENABLED:
+            logger.info("未启用启动预热")
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def run(self) -> None:
+        """依次执行各预热步骤，单个步骤失败时记录错误并继续"""
+        self._started_at = time.perf_counter()
+        logger.info("开始启动预热...")
+        for name, step in self._steps():
+            self._update(name, status="running")
+            started = time.perf_counter()
+            try:
+                step()
+                self._update(name, status="ready", duration_ms=(time.perf_counter() - started) * 1000)
+            except Exception as e:
+                logger.error(f"预热{name}失败: {str(e)}", exc_info=True)
+                self._update(name, status="failed", duration_ms=(time.perf_counter() - started) * 1000, error=str(e))
+        self._finished_at = time.perf_counter()
+        logger.info(
+            f"启动预热完成，耗时{(self._finished_at - self._started_at) * 1000:.0f}ms: "
+            + ", ".join(f"{component['name']}={component['status']}" for component in self.get_status()["components"])
+        )
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取预热状态
+
+        Returns:
+            {"ready": 是否可以接收流量, "status": disabled/pending/warming/ready/degraded,
+             "components": 各组件的状态、耗时和错误, "warmup_ms": 预热总耗时}
+            预热完成后即视为就绪，有组件失败时状态为degraded（失败的组件在首次使用时再初始化）
+        """
+        with self._lock:
+            components = [dict(component) for component in self._components.values()]
+        if not settings.WARMUP_ENABLED:
+            status = "disabled"
+        elif self._finished_at is not None:
+            status = "degraded" if any(component["status"] == "failed" for component in components) else "ready"
+        elif self._started_at is not None:
+            status = "warming"
+        else:
+            status = "pending"
+
+        warmup_ms = None
+        if self._started_at is not None:
+            warmup_ms = ((self._finished_at or time.perf_counter()) - self._started_at) * 1000
+        return {
+            "ready": status in ("disabled", "ready", "degraded"),
+            "status": status,
+            "components": components,
+            "warmup_ms": warmup_ms,
+        }
+
+    def _update(self, name: str, **fields: Any) -> None:
+        with self._lock:
+            self._components[name].update(fields)
+
+    @staticmethod
+    def _warm_nltk() -> None:
+        """导入nltk并完成一次英文分词"""
+        nltk.load()
+        tokenize_sentence(SAMPLE_EN, "en")
+
+    @staticmethod
+    def _warm_jieba() -> None:
+        """加载jieba前缀词典和词性标注模型"""
+        jieba.initialize()
+        list(pseg.cut(SAMPLE_ZH))
+
+    @staticmethod
+    def _warm_bleu() -> None:
+        """创建sacrebleu和nltk的BLEU计算器"""
+        evaluation_service.bleu.corpus_score([SAMPLE_EN], [[SAMPLE_EN]])
+        evaluation_service.smooth_methods
+
+    @staticmethod
+    def _warm_terminology() -> None:
+        """加载术语库并构建双向的术语匹配自动机"""
+        for source_lang, target_lang in (("zh", "en"), ("en", "zh")):
+            data_service.get_term_automaton(settings.WARMUP_DOMAIN, source_lang, target_lang)
+
+    @staticmethod
+    def _warm_evaluation() -> None:
+        """
+        用样例执行中译英和英译中的完整评估（不使用也不写入评估缓存，耗时不计入评估耗时统计）
+
+        术语评估需要调用AI时跳过术语指标，预热不产生外部API请求
+        """
+        metrics = None
+        if settings.TERMINOLOGY_EVALUATION_MODE in ("ai_extraction", "cascade"):
+            metrics = [name for name in evaluation_service.metric_registry.names() if name != "terminology"]
+        evaluation_service.evaluate_translation(
+            SAMPLE_ZH, SAMPLE_EN, [SAMPLE_EN], "zh", "en", settings.WARMUP_DOMAIN, use_cache=False, metrics=metrics,
+            record_timings=False
+        )
+        evaluation_service.evaluate_translation(
+            SAMPLE_EN, SAMPLE_ZH, [SAMPLE_ZH], "en", "zh", settings.WARMUP_DOMAIN, use_cache=False, metrics=metrics,
+            record_timings=False
+        )
+
+
+# 单例实例
+warmup_service = WarmupService()
@@ -0,0 +1,159 @@
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+
+class TermMatch:
+    """自动机匹配结果，记录命中的模式及其在原文中的位置"""
+
+    __slots__ = ("start", "end", "pattern", "value")
+
+    def __init__(self, start: int, end: int, pattern: str, value: Any):
+        self.start = start
+        self.end = end
+        self.pattern = pattern
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"TermMatch({self.start}, {self.end}, {self.pattern!r})"
+
+
+def _lower_preserving_offsets(text: str) -> str:
+    """转为小写，并保证结果与原文逐字符对齐（个别字符小写后长度改变时保留原字符）"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class AhoCorasickAutomaton:
+    """
+    Aho-Corasick多模式匹配自动机
+
+    一次扫描文本即可找出所有模式的出现位置，匹配耗时与文本长度成正比，
+    与模式数量无关。构建完成后自动机只读，可在多个线程间共享。
+    """
+
+    def __init__(self, ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        # 每个状态的转移表、失败指针和输出（模式编号列表）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._patterns: List[str] = []
+        self._values: List[Any] = []
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, pattern: str, value: Any = None) -> None:
+        """
+        添加一个模式
+
+        Args:
+            pattern: 模式字符串，空串会被忽略
+            value: 命中时随结果返回的附加值
+        """
+        if not pattern:
+            return
+        key = _lower_preserving_offsets(pattern) if self.ignore_case else pattern
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(len(self._patterns))
+        self._patterns.append(pattern)
+        self._values.append(value)
+        self._built = False
+
+    def build(self) -> "AhoCorasickAutomaton":
+        """按广度优先顺序计算失败指针，并合并输出链"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def find_all(self,
+                 text: str,
+                 longest_only: bool = False,
+                 word_boundary: bool = False) -> List[TermMatch]:
+        """
+        在文本中查找所有模式的出现位置
+
+        Args:
+            text: 要扫描的文本
+            longest_only: 是否只保留从左到右、互不重叠的最长匹配
+            word_boundary: 是否要求匹配两端为单词边界（用于英文等以空格分词的语言）
+
+        Returns:
+            按起始位置排序的匹配结果列表
+        """
+        if not self._built:
+            self.build()
+        if not text or not self._patterns:
+            return []
+
+        haystack = _lower_preserving_offsets(text) if self.ignore_case else text
+        goto, fail, output = self._goto, self._fail, self._output
+        patterns = self._patterns
+
+        raw: List[Tuple[int, int, int]] = []
+        state = 0
+        for index, char in enumerate(haystack):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = index + 1
+                for pattern_id in output[state]:
+                    raw.append((end - len(patterns[pattern_id]), end, pattern_id))
+
+        if word_boundary:
+            raw = [item for item in raw if self._is_word_bounded(text, item[0], item[1])]
+
+        # 按起始位置升序、长度降序排列
+        raw.sort(key=lambda item: (item[0], -item[1]))
+
+        if longest_only:
+            selected = []
+            last_end = 0
+            for start, end, pattern_id in raw:
+                if start >= last_end:
+                    selected.append((start, end, pattern_id))
+                    last_end = end
+            raw = selected
+
+        return [TermMatch(start, end, patterns[pid], self._values[pid]) for start, end, pid in raw]
+
+    @staticmethod
+    def _is_word_bounded(text: str, start: int, end: int) -> bool:
+        """判断匹配两端是否满足与正则\\b一致的单词边界"""
+        def is_word_char(char: str) -> bool:
+            return char.isalnum() or char == "_"
+
+        if start > 0 and is_word_char(text[start - 1]) and is_word_char(text[start]):
+            return False
+        if end < len(text) and is_word_char(text[end - 1]) and is_word_char(text[end]):
+            return False
+        return True
@@ -0,0 +1,233 @@
+import math
+from collections import Counter
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.nlp_resources import nltk_bleu
+
+def count_ngrams(tokens: Sequence[str], max_order: int = 4) -> Counter:
+    """
+    统计1至max_order阶n-gram
+
+    Args:
+        tokens: 词元序列
+        max_order: 最高阶数
+
+    Returns:
+        n-gram计数（键为词元元组，阶数即元组长度）
+    """
+    counts = Counter()
+    for n in range(1, max_order + 1):
+        for start in range(len(tokens) - n + 1):
+            counts[tuple(tokens[start:start + n])] += 1
+    return counts
+
+
+def order_totals(counts: Dict[Tuple[str, ...], int], max_order: int = 4) -> List[int]:
+    """各阶n-gram总数"""
+    totals = [0] * max_order
+    for ngram, count in counts.items():
+        totals[len(ngram) - 1] += count
+    return totals
+
+
+def clipped_matches(hypothesis_counts: Dict[Tuple[str, ...], int],
+                    reference_counts: Dict[Tuple[str, ...], int],
+                    max_order: int = 4) -> List[int]:
+    """各阶截断匹配数：每个n-gram的匹配次数不超过其在参考中的出现次数"""
+    matches = [0] * max_order
+    for ngram, count in hypothesis_counts.items():
+        reference_count = reference_counts.get(ngram)
+        if reference_count:
+            matches[len(ngram) - 1] += min(count, reference_count)
+    return matches
+
+
+def closest_reference_length(hypothesis_length: int, reference_lengths: List[int]) -> int:
+    """与假设长度最接近的参考长度，距离相同时取较短者（与sacrebleu、nltk一致）"""
+    return min(reference_lengths, key=lambda length: (abs(hypothesis_length - length), length))
+
+
+class NgramMatchStats:
+    """
+    按单元增量维护的BLEU充分统计量
+
+    整篇译文的词元序列由若干单元（句子或句子组）依次拼接而成。每个单元保存自身内部的n-gram计数，
+    以及从该单元开始、延伸到后续单元的跨界n-gram计数；全文的n-gram计数是两者之和。
+    替换部分单元时只重新统计变化的单元和跨界n-gram受影响的前几个单元，
+    并按变化量更新各参考译文的截断匹配数，与对全文重新统计的结果完全一致。
+    """
+
+    def __init__(self, reference_counts: List[Dict[Tuple[str, ...], int]], max_order: int = 4):
+        """
+        Args:
+            reference_counts: 每份参考n-gram计数表一个（sacrebleu对多参考取最大值后只需一份）
+            max_order: 最高阶数
+        """
+        self.reference_counts = reference_counts
+        self.max_order = max_order
+        self.units: List[Tuple[str, ...]] = []
+        self.length = 0
+        # 各阶假设n-gram总数及各参考的截断匹配数
+        self.totals = [0] * max_order
+        self.matches = [[0] * max_order for _ in reference_counts]
+        self._counts = Counter()
+        self._internal: List[Counter] = []
+        self._crossing: List[Counter] = []
+
+    def set_units(self, units: List[Tuple[str, ...]]) -> int:
+        """
+        更新为新的单元序列，只重新统计与旧序列不同的部分
+
+        Args:
+            units: 各单元的词元元组
+
+        Returns:
+            重新统计的单元数
+        """
+        old_units = self.units
+        limit = min(len(old_units), len(units))
+        prefix = 0
+        while prefix < limit and old_units[prefix] == units[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old_units[-1 - suffix] == units[-1 - suffix]:
+            suffix += 1
+        if prefix == len(old_units) == len(units):
+            return 0
+
+        # 前面的单元中，跨界n-gram可能延伸进变化区域的需要重新统计
+        first = prefix
+        between = 0
+        while first > 0 and between < self.max_order - 1:
+            first -= 1
+            between += len(old_units[first])
+
+        old_end = len(old_units) - suffix
+        new_end = len(units) - suffix
+
+        delta = Counter()
+        for index in range(prefix, old_end):
+            delta.subtract(self._internal[index])
+            self.length -= len(old_units[index])
+        for index in range(first, old_end):
+            delta.subtract(self._crossing[index])
+
+        new_internal = [count_ngrams(unit, self.max_order) for unit in units[prefix:new_end]]
+        self.units = list(units)
+        self._internal[prefix:old_end] = new_internal
+        new_crossing = [self._crossing_ngrams(index) for index in range(first, new_end)]
+        self._crossing[first:old_end] = new_crossing
+
+        for counts in new_internal:
+            delta.update(counts)
+        for counts in new_crossing:
+            delta.update(counts)
+        for unit in units[prefix:new_end]:
+            self.length += len(unit)
+
+        self._apply(delta)
+        return new_end - prefix
+
+    def _crossing_ngrams(self, index: int) -> Counter:
+        """从第index个单元开始、延伸到后续单元的n-gram"""
+        tokens = self.units[index]
+        lookahead: List[str] = []
+        cursor = index + 1
+        while len(lookahead) < self.max_order - 1 and cursor < len(self.units):
+            lookahead.extend(self.units[cursor])
+            cursor += 1
+        sequence = list(tokens) + lookahead[:self.max_order - 1]
+
+        counts = Counter()
+        for n in range(2, self.max_order + 1):
+            for start in range(max(0, len(tokens) - n + 1), len(tokens)):
+                if start + n <= len(sequence):
+                    counts[tuple(sequence[start:start + n])] += 1
+        return counts
+
+    def _apply(self, delta: Counter) -> None:
+        """按n-gram计数的变化量更新总数和截断匹配数"""
+        counts = self._counts
+        for ngram, change in delta.items():
+            if not change:
+                continue
+            old_count = counts.get(ngram, 0)
+            new_count = old_count + change
+            order = len(ngram) - 1
+            self.totals[order] += change
+            for matches, reference in zip(self.matches, self.reference_counts):
+                reference_count = reference.get(ngram, 0)
+                if reference_count:
+                    matches[order] += min(new_count, reference_count) - min(old_count, reference_count)
+            if new_count:
+                counts[ngram] = new_count
+            else:
+                del counts[ngram]
+
+
+def exp_smoothed_bleu(matches: np.ndarray,
+                      totals: np.ndarray,
+                      hypothesis_length: np.ndarray,
+                      reference_length: np.ndarray) -> np.ndarray:
+    """
+    由充分统计量计算与sacrebleu语料级BLEU（exp平滑、不使用有效阶数）相同的分数，可一次计算多组统计量
+
+    统计量可以是加权汇总后的非整数值（如分层抽样的估计量）。
+
+    Args:
+        matches: 各阶截断匹配数，形状为(组数, 阶数)
+        totals: 各阶假设n-gram总数，形状同matches
+        hypothesis_length: 假设词元数，形状为(组数,)
+        reference_length: 参考词元数，形状为(组数,)
+
+    Returns:
+        各组的BLEU分数（0-1）
+    """
+    matches = np.atleast_2d(np.asarray(matches, dtype=float))
+    totals = np.atleast_2d(np.asarray(totals, dtype=float))
+    hypothesis_length = np.atleast_1d(np.asarray(hypothesis_length, dtype=float))
+    reference_length = np.atleast_1d(np.asarray(reference_length, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bp = np.where(
+            hypothesis_length < reference_length,
+            np.where(hypothesis_length > 0, np.exp(1 - reference_length / hypothesis_length), 0.0),
+            1.0
+        )
+        # exp平滑：第k个匹配数为0的阶，精度取1/(2^k·总数)
+        zero = matches == 0
+        precisions = np.where(zero, 1.0 / (2.0 ** np.cumsum(zero, axis=1) * totals), matches / totals)
+        # 某一阶总数为0时，该阶及更高阶的精度均为0，BLEU为0
+        valid = np.cumprod(totals > 0, axis=1).astype(bool)
+        log_precisions = np.where(valid, np.log(np.where(valid, precisions, 1.0)), -np.inf)
+        scores = bp * np.exp(log_precisions.mean(axis=1))
+    return np.where(matches.any(axis=1), scores, 0.0)
+
+
+def nltk_bleu_from_stats(matches: List[int],
+                         totals: List[int],
+                         hypothesis_length: int,
+                         reference_length: int,
+                         smoothing_function: Callable) -> float:
+    """
+    由充分统计量计算与nltk sentence_bleu（单参考、默认权重）相同的分数
+
+    Args:
+        matches: 各阶截断匹配数
+        totals: 各阶假设n-gram总数
+        hypothesis_length: 假设词元数
+        reference_length: 参考词元数
+        smoothing_function: nltk平滑函数
+
+    Returns:
+        BLEU分数
+    """
+    weights = (1 / len(matches),) * len(matches)
+    p_n = [nltk_bleu.Fraction(match, max(1, total), _normalize=False) for match, total in zip(matches, totals)]
+    if matches[0] == 0:
+        return 0
+    p_n = smoothing_function(p_n, references=None, hypothesis=None, hyp_len=hypothesis_length)
+    bp = nltk_bleu.brevity_penalty(reference_length, hypothesis_length)
+    s = (w_i * math.log(p_i) for w_i, p_i in zip(weights, p_n) if p_i > 0)
+    return bp * math.exp(math.fsum(s))
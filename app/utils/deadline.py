@@ -0,0 +1,73 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(Exception):
+    """时间预算已用完"""
+
+
+class Deadline:
+    """以time.monotonic计时的截止时间"""
+
+    def __init__(self, budget_ms: float):
+        """
+        Args:
+            budget_ms: 从现在起可用的时间（毫秒）
+        """
+        self.expires_at = time.monotonic() + budget_ms / 1000.0
+
+    def remaining(self) -> float:
+        """剩余时间（秒），已过期时为0"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+# 当前请求的截止时间，耗时较长的循环通过check_deadline在预算用完时中止
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """将截止时间设为当前上下文的截止时间，为None时表示不限时"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """当前上下文的截止时间，不限时时返回None"""
+    return _current_deadline.get()
+
+
+def check_deadline() -> None:
+    """
+    检查当前上下文的截止时间
+
+    Raises:
+        DeadlineExceeded: 时间预算已用完
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded()
+
+
+def remaining_timeout(default: float) -> float:
+    """
+    网络请求等操作的超时时间：不超过default，也不超过当前截止时间的剩余时间
+
+    Args:
+        default: 不限时时使用的超时时间（秒）
+
+    Returns:
+        超时时间（秒）
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return default
+    return min(default, deadline.remaining())
@@ -0,0 +1,233 @@
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.bleu_stats import count_ngrams
+from app.utils.lexical_scanner import lexical_scanner, LexicalProfile
+from app.utils.nlp_resources import jieba, nltk, pseg
+from app.utils.segmenter import segment_sentences
+from app.utils.text_index import TranslationIndex, split_phrase
+
+
+class DocumentAnalysis:
+    """
+    单篇文本的惰性分析结果
+
+    分句、分词、词性标注、偏移量和词汇特征在首次访问时计算，之后直接复用，
+    同一请求内每项分析最多计算一次。每项分析的耗时记录在timings中（单位：秒）。
+    """
+
+    def __init__(self, text: str, language: str):
+        self.text = text
+        self.language = language
+        self.timings: Dict[str, float] = {}
+        self._cache: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def get(self, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        获取命名的分析结果，不存在时计算并缓存
+
+        Args:
+            name: 分析名称
+            compute: 计算函数
+
+        Returns:
+            分析结果
+        """
+        if name in self._cache:
+            return self._cache[name]
+        with self._lock:
+            if name not in self._cache:
+                started = time.perf_counter()
+                self._cache[name] = compute()
+                self.timings[name] = time.perf_counter() - started
+        return self._cache[name]
+
+    @property
+    def sentences(self) -> List[str]:
+        """分句结果"""
+        return self.get("sentences", lambda: [self.text[start:end] for start, end in self.sentence_spans])
+
+    @property
+    def sentence_spans(self) -> List[Tuple[int, int]]:
+        """各句在原文中的(start, end)区间"""
+        return self.get("sentence_spans", lambda: segment_sentences(self.text, self.language))
+
+    @property
+    def tokens(self) -> List[str]:
+        """全文分词结果（中文使用jieba，其他语言使用nltk）"""
+        return [token for token, _ in self._tokens_with_spans]
+
+    @property
+    def token_spans(self) -> List[Tuple[int, int]]:
+        """各词元在原文中的(start, end)区间"""
+        return [span for _, span in self._tokens_with_spans]
+
+    @property
+    def _tokens_with_spans(self) -> List[Tuple[str, Tuple[int, int]]]:
+        return self.get("tokens", self._tokenize)
+
+    @property
+    def sentence_tokens(self) -> List[List[str]]:
+        """逐句分词结果"""
+        return self.get("sentence_tokens", lambda: [self._tokenize_text(sentence) for sentence in self.sentences])
+
+    @property
+    def sentence_ngrams(self) -> List[Counter]:
+        """逐句的1至4阶n-gram计数，供句子级BLEU复用"""
+        return self.get("sentence_ngrams", lambda: [count_ngrams(tokens) for tokens in self.sentence_tokens])
+
+    @property
+    def pos_tags(self) -> List[Tuple[str, str]]:
+        """词性标注结果，格式为[(词, 词性), ...]"""
+        return self.get("pos_tags", self._pos_tag)
+
+    @property
+    def lexical(self) -> LexicalProfile:
+        """词汇特征（连接词、代词、被动结构、主动句指示词等）"""
+        return self.get("lexical", lambda: lexical_scanner.scan(self.text, self.language))
+
+    def term_index(self, terms: Iterable[str]) -> TranslationIndex:
+        """
+        获取可查询给定术语的文本索引，已有索引覆盖所需n-gram长度时直接复用
+
+        Args:
+            terms: 待查询的术语
+
+        Returns:
+            文本索引
+        """
+        max_n = max((len(split_phrase(term, self.language)) for term in terms), default=1)
+        index = self._cache.get("term_index")
+        if index is not None and index.max_n >= max_n:
+            return index
+        with self._lock:
+            index = self._cache.get("term_index")
+            if index is None or index.max_n < max_n:
+                started = time.perf_counter()
+                index = TranslationIndex(self.text, self.language, max_n)
+                self._cache["term_index"] = index
+                self.timings["term_index"] = time.perf_counter() - started
+        return index
+
+    def _tokenize_text(self, text: str) -> List[str]:
+        return tokenize_sentence(text, self.language)
+
+    def _tokenize(self) -> List[Tuple[str, Tuple[int, int]]]:
+        if self.language == "zh":
+            if len(self.text) >= settings.SEGMENTATION_PARALLEL_MIN_CHARS:
+                # 长文档在句子边界处分片，由进程池并行分词
+                from app.services.segmentation_service import segmentation_service
+                return segmentation_service.tokenize(self.text, self.sentence_spans)
+            return [(word, (start, end)) for word, start, end in jieba.tokenize(self.text)]
+        # 全文词元由逐句分词结果拼接而成，偏移量按句子区间换算回原文
+        tokens_with_spans = []
+        for (sentence_start, _), sentence, tokens in zip(self.sentence_spans, self.sentences, self.sentence_tokens):
+            for token, (start, end) in zip(tokens, _locate(sentence, tokens)):
+                tokens_with_spans.append((token, (sentence_start + start, sentence_start + end)))
+        return tokens_with_spans
+
+    def _pos_tag(self) -> List[Tuple[str, str]]:
+        if self.language == "zh":
+            if len(self.text) >= settings.SEGMENTATION_PARALLEL_MIN_CHARS:
+                from app.services.segmentation_service import segmentation_service
+                return segmentation_service.pos_tag(self.text, self.sentence_spans)
+            return [(word, flag) for word, flag in pseg.cut(self.text)]
+        return nltk.pos_tag(self.tokens)
+
+
+class EvaluationContext:
+    """一次评估请求中源文本、译文和参考译文的共享分析结果"""
+
+    def __init__(self,
+                 source_text: str,
+                 translated_text: str,
+                 reference_texts: List[str],
+                 source_language: str = "zh",
+                 target_language: str = "en",
+                 domain: str = "materials_science",
+                 source: Optional[DocumentAnalysis] = None,
+                 references: Optional[List[DocumentAnalysis]] = None):
+        self.source_language = source_language
+        self.target_language = target_language
+        self.domain = domain
+        self.source = source or DocumentAnalysis(source_text, source_language)
+        self.translation = DocumentAnalysis(translated_text, target_language)
+        self.references = references if references is not None else [
+            DocumentAnalysis(text, target_language) for text in reference_texts
+        ]
+
+    @property
+    def source_text(self) -> str:
+        return self.source.text
+
+    @property
+    def translated_text(self) -> str:
+        return self.translation.text
+
+    @property
+    def reference_texts(self) -> List[str]:
+        return [reference.text for reference in self.references]
+
+    def with_translation(self, translated_text: str) -> "EvaluationContext":
+        """
+        为另一份译文创建上下文，源文本和参考译文的分析结果直接共享
+
+        Args:
+            translated_text: 新的译文
+
+        Returns:
+            新的评估上下文
+        """
+        return EvaluationContext(
+            self.source_text, translated_text, [],
+            self.source_language, self.target_language, self.domain,
+            source=self.source, references=self.references
+        )
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """所有已完成分析的耗时，键名形如source.tokens、reference[0].sentences"""
+        timings = {}
+        documents = [("source", self.source), ("translation", self.translation)]
+        documents += [(f"reference[{i}]", reference) for i, reference in enumerate(self.references)]
+        for role, document in documents:
+            for name, elapsed in document.timings.items():
+                timings[f"{role}.{name}"] = elapsed
+        return timings
+
+
+def tokenize_sentence(text: str, language: str) -> List[str]:
+    """
+    对单句（或任意文本片段）分词
+
+    Args:
+        text: 文本片段
+        language: 语言代码
+
+    Returns:
+        词元列表
+    """
+    if language == "zh":
+        # 中文使用jieba分词
+        return list(jieba.cut(text))
+    # 其他语言使用nltk分词，分句已由segment_sentences完成，不再依赖punkt模型
+    return nltk.word_tokenize(text, preserve_line=True)
+
+
+def _locate(text: str, pieces: List[str]) -> List[Tuple[int, int]]:
+    """按顺序定位各片段在原文中的区间，找不到的片段（如被分词器改写的引号）记为零长度区间"""
+    spans = []
+    cursor = 0
+    for piece in pieces:
+        start = text.find(piece, cursor)
+        if start < 0:
+            spans.append((cursor, cursor))
+            continue
+        end = start + len(piece)
+        spans.append((start, end))
+        cursor = end
+    return spans
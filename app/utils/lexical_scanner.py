@@ -0,0 +1,210 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.aho_corasick import AhoCorasickAutomaton
+
+
+# 连接词按逻辑关系分类
+COHESION_CATEGORIES: Dict[str, List[str]] = {
+    "causality": ["because", "since", "therefore", "thus", "consequently", "as a result",
+                  "hence", "so", "accordingly", "due to", "owing to", "for this reason"],
+    "contrast": ["however", "nevertheless", "yet", "although", "though", "but", "despite",
+                 "in contrast", "on the other hand", "conversely", "whereas", "while",
+                 "on the contrary", "nonetheless"],
+    "addition": ["furthermore", "moreover", "in addition", "additionally", "besides",
+                 "also", "what's more", "as well as", "not only...but also", "similarly"],
+    "sequence": ["first", "firstly", "second", "secondly", "third", "thirdly", "then",
+                 "next", "finally", "lastly", "subsequently", "afterward", "previously"],
+    "conclusion": ["in conclusion", "to conclude", "in summary", "to summarize", "overall",
+                   "ultimately", "in brief", "in short", "to sum up"],
+}
+
+# 人称代词和物主代词
+PRONOUNS = ["he", "she", "it", "they", "his", "her", "its", "their", "him", "them"]
+
+# 常用英文停用词
+STOPWORDS = {"the", "a", "an", "and", "in", "on", "at", "to", "for", "with", "by", "of",
+             "is", "are", "was", "were", "be", "been", "being", "have", "has", "had",
+             "do", "does", "did", "can", "could", "will", "would", "should", "may", "might",
+             "must", "that", "this", "these", "those", "it", "they", "them", "their", "there",
+             "here", "where", "when", "how", "why", "what", "who", "whom", "which"}
+
+# 被动语态助动词
+PASSIVE_AUXILIARIES = {"is", "are", "was", "were", "be", "been", "being"}
+
+# 主动句指示词（中文）
+ACTIVE_INDICATORS = ["我们", "作者", "研究者", "科学家", "本文", "本研究", "实验", "分析", "测试", "发现"]
+
+# 代词前这段距离内出现冠词即视为有指代对象
+PRONOUN_CONTEXT_CHARS = 50
+
+# 单词与标点分别作为词元
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# 单词（中文为连续的字词字符）
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class LexicalProfile:
+    """一段文本的词汇特征统计，各项计数可直接相加以合并多个片段"""
+
+    def __init__(self):
+        self.cohesion_counts: Dict[str, int] = {category: 0 for category in COHESION_CATEGORIES}
+        self.cohesion_word_counts: Dict[str, int] = {}
+        self.pronoun_positions: List[Tuple[str, int]] = []
+        self.pronoun_issues = 0
+        self.word_count = 0
+        self.content_word_counts: Dict[str, int] = {}
+        self.passive_positions: List[int] = []
+        self.active_indicator_positions: List[int] = []
+
+    @property
+    def total_cohesion_count(self) -> int:
+        return sum(self.cohesion_counts.values())
+
+    @property
+    def used_cohesion_words(self) -> List[str]:
+        return [word for word, count in self.cohesion_word_counts.items() if count > 0]
+
+    def merge(self, other: "LexicalProfile") -> "LexicalProfile":
+        """返回两个片段统计相加后的新对象"""
+        return LexicalProfile.combine([self, other])
+
+    @classmethod
+    def combine(cls, profiles: List["LexicalProfile"]) -> "LexicalProfile":
+        """按顺序合并多个片段的统计，词频的键顺序与整篇扫描时的首次出现顺序一致"""
+        merged = cls()
+        for profile in profiles:
+            for category, count in profile.cohesion_counts.items():
+                merged.cohesion_counts[category] += count
+            for word, count in profile.cohesion_word_counts.items():
+                merged.cohesion_word_counts[word] = merged.cohesion_word_counts.get(word, 0) + count
+            for word, count in profile.content_word_counts.items():
+                merged.content_word_counts[word] = merged.content_word_counts.get(word, 0) + count
+            merged.pronoun_positions.extend(profile.pronoun_positions)
+            merged.pronoun_issues += profile.pronoun_issues
+            merged.word_count += profile.word_count
+            merged.passive_positions.extend(profile.passive_positions)
+            merged.active_indicator_positions.extend(profile.active_indicator_positions)
+        return merged
+
+
+def count_spans_with_hits(spans: List[Tuple[int, int]], positions: List[int]) -> int:
+    """
+    统计包含至少一个命中位置的区间数量
+
+    Args:
+        spans: 按顺序排列、互不重叠的(start, end)区间，例如句子区间
+        positions: 命中位置
+
+    Returns:
+        包含命中的区间数量
+    """
+    positions = sorted(positions)
+    count = 0
+    cursor = 0
+    for start, end in spans:
+        while cursor < len(positions) and positions[cursor] < start:
+            cursor += 1
+        if cursor < len(positions) and positions[cursor] < end:
+            count += 1
+    return count
+
+
+class LexicalScanner:
+    """
+    预编译的词汇扫描器
+
+    对文本只做一次分词扫描，同时统计各类连接词、代词、停用词过滤后的词频、
+    被动结构以及中文主动句指示词，供语篇连贯性和句式转换评估共用。
+    """
+
+    def __init__(self):
+        # 连接词（含多词短语）按词元序列建立前缀树
+        self._phrase_trie: Dict = {}
+        for category, words in COHESION_CATEGORIES.items():
+            for word in words:
+                node = self._phrase_trie
+                for token in _TOKEN_PATTERN.findall(word):
+                    node = node.setdefault(token, {})
+                node.setdefault(None, []).append((category, word))
+        self._pronouns = set(PRONOUNS)
+
+        self._indicator_automaton = AhoCorasickAutomaton()
+        for indicator in ACTIVE_INDICATORS:
+            self._indicator_automaton.add(indicator)
+        self._indicator_automaton.build()
+
+    def scan(self, text: str, language: str = "en", start: int = 0, end: Optional[int] = None) -> LexicalProfile:
+        """
+        扫描文本区间并返回词汇特征
+
+        Args:
+            text: 完整文本
+            language: 文本语言代码，中文只统计词频和主动句指示词
+            start: 扫描起始位置
+            end: 扫描结束位置，默认到文本末尾（代词的上下文检查仍可回看区间之前的内容）
+
+        Returns:
+            词汇特征统计，所有位置均为在text中的偏移
+        """
+        profile = LexicalProfile()
+        if end is None:
+            end = len(text)
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+        if language == "zh":
+            # 中文按连续的字词字符统计词数和词频，用于重复词语检查
+            for match in _WORD_PATTERN.finditer(lowered, start, end):
+                self._count_word(profile, match.group())
+            for match in self._indicator_automaton.find_all(text[start:end]):
+                profile.active_indicator_positions.append(start + match.start)
+            return profile
+
+        tokens = [(match.group(), match.start()) for match in _TOKEN_PATTERN.finditer(lowered, start, end)]
+        trie = self._phrase_trie
+
+        for index, (token, position) in enumerate(tokens):
+            if token[0].isalnum() or token[0] == "_":
+                self._count_word(profile, token)
+
+            # 连接词：沿前缀树匹配从当前词元开始的所有短语
+            node = trie.get(token)
+            offset = index + 1
+            while node is not None:
+                for category, word in node.get(None, ()):
+                    profile.cohesion_counts[category] += 1
+                    profile.cohesion_word_counts[word] = profile.cohesion_word_counts.get(word, 0) + 1
+                if offset >= len(tokens):
+                    break
+                node = node.get(tokens[offset][0])
+                offset += 1
+
+            # 代词：检查前面一段文本中是否出现冠词
+            if token in self._pronouns:
+                profile.pronoun_positions.append((token, position))
+                prefix = lowered[max(0, position - PRONOUN_CONTEXT_CHARS):position]
+                if not any(article in prefix for article in ["the", "a", "an"]):
+                    profile.pronoun_issues += 1
+
+            # 被动结构：be动词后紧跟以-ed结尾的单词
+            if token in PASSIVE_AUXILIARIES and index + 1 < len(tokens):
+                next_token = tokens[index + 1][0]
+                if len(next_token) > 2 and next_token.endswith("ed") and (next_token[0].isalnum() or next_token[0] == "_"):
+                    profile.passive_positions.append(position)
+
+        return profile
+
+    @staticmethod
+    def _count_word(profile: LexicalProfile, word: str) -> None:
+        """计入总词数，并统计跳过短词和停用词后的词频"""
+        profile.word_count += 1
+        if len(word) > 3 and word not in STOPWORDS:
+            profile.content_word_counts[word] = profile.content_word_counts.get(word, 0) + 1
+
+
+# 单例实例
+lexical_scanner = LexicalScanner()
@@ -0,0 +1,131 @@
+import importlib
+import logging
+import os
+import threading
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 离线使用的NLTK数据包：英文词性标注和分句模型
+NLTK_RESOURCES = {
+    "averaged_perceptron_tagger_eng": "taggers/averaged_perceptron_tagger_eng",
+    "punkt_tab": "tokenizers/punkt_tab",
+}
+
+
+class LazyModule:
+    """
+    延迟导入的模块
+
+    首次访问属性时才导入模块并执行配置函数，之后的属性访问直接转发给已导入的模块。
+    nltk、jieba等导入耗时较长的模块通过它引用，使导入应用本身不再等待这些模块加载。
+    """
+
+    def __init__(self, name: str, configure: Optional[Callable[[ModuleType], None]] = None):
+        self._name = name
+        self._configure = configure
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> ModuleType:
+        """导入模块（只导入和配置一次）"""
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    if self._configure:
+                        self._configure(module)
+                    self._module = module
+                module = self._module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        """模块是否已导入"""
+        return self._module is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name} ({'loaded' if self.loaded else 'not loaded'})>"
+
+
+def _configure_nltk(module: ModuleType) -> None:
+    """优先从离线数据目录查找NLTK数据"""
+    if settings.NLTK_DATA_DIR not in module.data.path:
+        module.data.path.insert(0, settings.NLTK_DATA_DIR)
+
+
+def _configure_jieba(module: ModuleType) -> None:
+    """jieba的前缀词典缓存使用离线生成的缓存文件，不存在时首次初始化后写入该位置"""
+    module.setLogLevel(logging.WARNING)
+    cache_dir, cache_file = os.path.split(settings.JIEBA_CACHE_FILE)
+    module.dt.tmp_dir = cache_dir
+    module.dt.cache_file = cache_file
+
+
+def _configure_posseg(module: ModuleType) -> None:
+    # jieba.posseg共用jieba的默认分词器
+    jieba.load()
+
+
+nltk = LazyModule("nltk", _configure_nltk)
+jieba = LazyModule("jieba", _configure_jieba)
+pseg = LazyModule("jieba.posseg", _configure_posseg)
+sacrebleu_metrics = LazyModule("sacrebleu.metrics")
+sacrebleu_helpers = LazyModule("sacrebleu.metrics.helpers")
+nltk_bleu = LazyModule("nltk.translate.bleu_score", lambda module: nltk.load())
+
+
+def vendor_nltk_data(download: bool = True) -> Dict[str, bool]:
+    """
+    将NLTK_RESOURCES中的数据包下载到离线数据目录
+
+    Args:
+        download: 为False时只检查数据包是否已存在
+
+    Returns:
+        各数据包是否可用
+    """
+    os.makedirs(settings.NLTK_DATA_DIR, exist_ok=True)
+    status = {}
+    for package, resource in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(resource)
+            status[package] = True
+            continue
+        except LookupError:
+            pass
+        status[package] = bool(download) and bool(
+            nltk.download(package, download_dir=settings.NLTK_DATA_DIR, quiet=True, raise_on_error=False)
+        )
+        if not status[package]:
+            logger.warning(f"NLTK数据包{package}不可用")
+    return status
+
+
+def build_jieba_cache(force: bool = False) -> str:
+    """
+    初始化jieba并把前缀词典序列化到JIEBA_CACHE_FILE，之后的进程直接加载缓存而不再解析词典
+
+    Args:
+        force: 为True时删除已有的缓存文件并重新生成
+
+    Returns:
+        缓存文件路径
+    """
+    if force and os.path.exists(settings.JIEBA_CACHE_FILE):
+        os.remove(settings.JIEBA_CACHE_FILE)
+    os.makedirs(os.path.dirname(settings.JIEBA_CACHE_FILE), exist_ok=True)
+    jieba.initialize()
+    return settings.JIEBA_CACHE_FILE
+
+
+def loaded_modules() -> List[str]:
+    """已导入的延迟模块"""
+    return [module._name for module in (nltk, jieba, pseg, sacrebleu_metrics, sacrebleu_helpers, nltk_bleu) if module.loaded]
@@ -0,0 +1,222 @@
+from typing import List, Tuple
+
+
+# 中文句末标点（含全角分号）及可兼用的半角问号、感叹号
+ZH_TERMINATORS = "。！？；!?…"
+
+# 英文句末标点
+EN_TERMINATORS = ".!?"
+
+# 句末标点之后仍属于本句的右引号和右括号
+CLOSING_PUNCTUATION = "\"'”’」』）)]】》"
+
+# 以句点结尾但通常不表示句子结束的缩写（小写，不含末尾句点）
+ABBREVIATIONS = {
+    "e.g", "i.e", "etc", "vs", "cf", "al", "approx", "ca", "resp", "viz",
+    "fig", "figs", "eq", "eqs", "ref", "refs", "tab", "sec", "ch", "vol", "pp",
+    "dr", "mr", "mrs", "ms", "prof", "st", "jr", "inc", "ltd", "corp", "dept", "univ", "wt",
+}
+
+
+def segment_sentences(text: str, language: str = "en") -> List[Tuple[int, int]]:
+    """
+    按语言规则分句，返回各句在原文中的(start, end)区间
+
+    中文以。！？；等句末标点和换行分句；英文以.!?后接空白分句，并排除缩写（Fig.、e.g.、et al.）、
+    人名首字母、小数和化学式内部的句点（如3.5、Li1.2Ni0.8O2），化学式结尾的句点（如Fe2O3.）
+    仍视为句末。区间不包含句子首尾的空白。
+
+    Args:
+        text: 原文
+        language: 语言代码
+
+    Returns:
+        按顺序排列的句子区间列表
+    """
+    if not text:
+        return []
+
+    is_zh = language == "zh"
+    terminators = ZH_TERMINATORS if is_zh else EN_TERMINATORS
+    length = len(text)
+    spans = []
+    start = 0
+    index = 0
+
+    while index < length:
+        char = text[index]
+
+        if char == "\n":
+            # 中文每个换行都是句子边界，英文只在空行处分段
+            if is_zh or _next_line_is_blank(text, index):
+                _append_span(text, start, index, spans)
+                start = index + 1
+            index += 1
+            continue
+
+        is_terminator = char in terminators or (is_zh and char == ".")
+        if not is_terminator:
+            index += 1
+            continue
+
+        # 连续的句末标点（如?!、...）以及其后的右引号、右括号都归入本句
+        end = index + 1
+        while end < length and (text[end] in terminators or text[end] == "."):
+            end += 1
+        while end < length and text[end] in CLOSING_PUNCTUATION:
+            end += 1
+
+        if char == "." and not _is_period_boundary(text, index, end, is_zh):
+            index = end
+            continue
+        if not is_zh and end < length and not text[end].isspace():
+            # 英文句末标点后必须是空白，避免切开小数、网址和化学式
+            index = end
+            continue
+
+        _append_span(text, start, end, spans)
+        start = end
+        index = end
+
+    _append_span(text, start, length, spans)
+    return spans
+
+
+def split_sentences(text: str, language: str = "en") -> List[str]:
+    """
+    分句并返回句子文本
+
+    Args:
+        text: 原文
+        language: 语言代码
+
+    Returns:
+        句子列表
+    """
+    return [text[start:end] for start, end in segment_sentences(text, language)]
+
+
+class IncrementalSegmenter:
+    """
+    流式文本的增量分句
+
+    文本分段到达（如大模型逐词输出）时，只对最后一个未结束的句子重新分句。一个句子之后出现了
+    下一句的内容时才确认为结束，此时句末标点、缩写和换行的判断都不再受后续文本影响，
+    确认的句子与对全文调用segment_sentences的结果一致。
+    """
+
+    def __init__(self, language: str = "en"):
+        """
+        Args:
+            language: 语言代码
+        """
+        self.language = language
+        self.text = ""
+        # 第一个未确认句子的起始位置，之前的文本已全部分句
+        self._pending_start = 0
+
+    def feed(self, chunk: str) -> List[Tuple[int, int]]:
+        """
+        追加一段文本
+
+        Args:
+            chunk: 新到达的文本
+
+        Returns:
+            本次确认结束的句子在全文中的(start, end)区间
+        """
+        self.text += chunk
+        spans = self._pending_spans()
+        closed = spans[:-1]
+        if closed:
+            self._pending_start = spans[-1][0]
+        return closed
+
+    def close(self) -> List[Tuple[int, int]]:
+        """
+        文本结束，确认剩余的句子
+
+        Returns:
+            剩余句子的(start, end)区间
+        """
+        spans = self._pending_spans()
+        self._pending_start = len(self.text)
+        return spans
+
+    def _pending_spans(self) -> List[Tuple[int, int]]:
+        """未确认部分的分句结果（换算为全文中的区间）"""
+        offset = self._pending_start
+        return [
+            (start + offset, end + offset)
+            for start, end in segment_sentences(self.text[offset:], self.language)
+        ]
+
+
+def _append_span(text: str, start: int, end: int, spans: List[Tuple[int, int]]) -> None:
+    """去掉区间首尾空白后加入结果，空区间忽略"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if start < end:
+        spans.append((start, end))
+
+
+def _next_line_is_blank(text: str, index: int) -> bool:
+    """判断index处的换行之后是否紧跟一个空行"""
+    cursor = index + 1
+    while cursor < len(text) and text[cursor] in " \t\r":
+        cursor += 1
+    return cursor >= len(text) or text[cursor] == "\n"
+
+
+def _is_period_boundary(text: str, index: int, end: int, is_zh: bool) -> bool:
+    """
+    判断句点是否为句末
+
+    Args:
+        text: 原文
+        index: 句点位置
+        end: 句点及其后的标点、右引号结束的位置
+        is_zh: 是否为中文文本
+
+    Returns:
+        是否为句子边界
+    """
+    # 句点紧跟数字或字母（小数、化学式、网址）时不是句末
+    if index + 1 < len(text) and text[index + 1].isalnum():
+        return False
+    # 省略号在中文里也作句末，在英文里按普通句点处理
+    if end - index > 1 and is_zh:
+        return True
+
+    # 句点前的词（可含内部句点，如e.g、U.S）；词前紧接数字等字符时（如Fe2O3）不按缩写处理
+    word_start = index
+    while word_start > 0 and (text[word_start - 1].isascii() and text[word_start - 1].isalpha() or text[word_start - 1] == "."):
+        word_start -= 1
+    word = text[word_start:index].strip(".")
+    if word and (word_start == 0 or not text[word_start - 1].isalnum()):
+        if word.lower() in ABBREVIATIONS:
+            return False
+        # 带内部句点的缩写（U.S.）
+        if "." in word:
+            return False
+        # 人名首字母（J. Smith），数字后的单位（500 K.）除外
+        if len(word) == 1 and word.isupper() and not _previous_token_is_number(text, word_start):
+            return False
+
+    # 下一个非空白字符为小写字母时多半是句中缩写
+    cursor = end
+    while cursor < len(text) and text[cursor] in " \t":
+        cursor += 1
+    if cursor < len(text) and text[cursor].islower():
+        return False
+    return True
+
+
+def _previous_token_is_number(text: str, position: int) -> bool:
+    """判断position之前（跳过空白和度数符号）的字符是否为数字"""
+    cursor = position
+    while cursor > 0 and text[cursor - 1] in " \t°":
+        cursor -= 1
+    return cursor > 0 and text[cursor - 1].isdigit()
@@ -0,0 +1,243 @@
+import re
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from app.utils.aho_corasick import AhoCorasickAutomaton
+from app.utils.lexical_scanner import STOPWORDS
+
+# 英文候选术语的单词划分（允许连字符连接的复合词）
+_ENGLISH_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def chinese_noun_phrases(pos_tags: Iterable[Tuple[str, str]], min_length: int = 2) -> List[str]:
+    """
+    将词性标注结果中连续的名词（n、ng、nz、vn等）合并为名词短语
+
+    Args:
+        pos_tags: 词性标注结果 [(词, 词性), ...]
+        min_length: 短语的最小字符数
+
+    Returns:
+        按出现顺序排列的名词短语（可含重复）
+    """
+    nouns = []
+    current_phrase = []
+
+    for word, flag in pos_tags:
+        if flag.startswith('n') or flag == 'vn':
+            current_phrase.append(word)
+        elif current_phrase:
+            if len(''.join(current_phrase)) >= min_length:
+                nouns.append(''.join(current_phrase))
+            current_phrase = []
+
+    if current_phrase and len(''.join(current_phrase)) >= min_length:
+        nouns.append(''.join(current_phrase))
+
+    return nouns
+
+
+def english_term_candidates(text: str, max_words: int = 3, min_length: int = 3) -> List[str]:
+    """
+    提取英文候选术语：不以停用词或数字开头、结尾的1至max_words个连续单词（小写）
+
+    Args:
+        text: 英文文本
+        max_words: 候选术语的最大单词数
+        min_length: 候选术语的最小字符数
+
+    Returns:
+        去重后的候选术语，按首次出现顺序排列
+    """
+    candidates = {}
+    # 标点处断开，候选术语不跨越标点
+    for chunk in re.split(r"[^\w\s-]+", text.lower()):
+        words = _ENGLISH_WORD_PATTERN.findall(chunk)
+        boundary = [word not in STOPWORDS and not word.isdigit() for word in words]
+        for start in range(len(words)):
+            if not boundary[start]:
+                continue
+            for end in range(start + 1, min(start + max_words, len(words)) + 1):
+                if not boundary[end - 1]:
+                    continue
+                candidate = " ".join(words[start:end])
+                if len(candidate) >= min_length:
+                    candidates[candidate] = None
+    return list(candidates)
+
+
+class OccurrenceIndex:
+    """
+    候选术语在文本中的出现位置
+
+    用一个多模式自动机扫描一次文本，得到所有候选术语的出现位置。每个术语的位置
+    与re.finditer(re.escape(term), text)的结果一致（从左到右、互不重叠），
+    并以相对位置（位置/文本长度）的有序数组保存，供最近位置查找使用。
+    """
+
+    def __init__(self, text: str, terms: Iterable[str], ignore_case: bool = False):
+        self.text_length = len(text)
+        automaton = AhoCorasickAutomaton(ignore_case=ignore_case)
+        for term in dict.fromkeys(terms):
+            automaton.add(term, term)
+
+        spans: Dict[str, List[Tuple[int, int]]] = {}
+        for match in automaton.find_all(text):
+            spans.setdefault(match.value, []).append((match.start, match.end))
+
+        self.positions: Dict[str, np.ndarray] = {}
+        for term, term_spans in spans.items():
+            starts = []
+            last_end = 0
+            for start, end in term_spans:
+                if start >= last_end:
+                    starts.append(start)
+                    last_end = end
+            self.positions[term] = np.array(starts, dtype=np.int64) / self.text_length
+
+    def relative_positions(self, term: str) -> np.ndarray:
+        """术语出现位置的相对值（升序），未出现时为空数组"""
+        return self.positions.get(term, np.empty(0))
+
+
+def match_term_candidates(queries: List[str],
+                          query_index: OccurrenceIndex,
+                          candidates: List[str],
+                          candidate_index: OccurrenceIndex,
+                          query_length_unit: float,
+                          candidate_length_unit: float,
+                          min_query_length: int,
+                          min_candidate_length: int,
+                          threshold: float = 0.5) -> Dict[str, str]:
+    """
+    按相对位置和长度比例为每个查询术语挑选最匹配的候选译法
+
+    得分 = 位置相似度 * 0.7 + 长度比例 * 0.3，其中位置相似度 = max(0, 1 - 2 * 最近相对位置差)，
+    长度比例 = min(查询长度/query_length_unit, 候选长度/candidate_length_unit) / max(...)。
+    查询按给定顺序处理，得分最高且超过阈值的候选被选中（同分时取列表中靠前的候选），
+    选中后从候选列表中移除一次。每个查询只需对全部候选做一次向量化的最近位置查找。
+
+    Args:
+        queries: 查询术语列表（按处理顺序，可含重复）
+        query_index: 查询术语所在文本的出现位置索引
+        candidates: 候选译法列表（可含重复）
+        candidate_index: 候选译法所在文本的出现位置索引
+        query_length_unit: 查询术语长度的换算单位
+        candidate_length_unit: 候选译法长度的换算单位
+        min_query_length: 查询术语的最小长度
+        min_candidate_length: 候选译法的最小长度
+        threshold: 最低得分
+
+    Returns:
+        术语对照表 {查询术语: 候选译法}
+    """
+    # 合并重复候选，记录每个候选在列表中剩余的出现序号，序号最小者决定同分时的先后
+    occurrences: Dict[str, deque] = {}
+    for order, candidate in enumerate(candidates):
+        if len(candidate) < min_candidate_length or not len(candidate_index.relative_positions(candidate)):
+            continue
+        occurrences.setdefault(candidate, deque()).append(order)
+
+    extracted_terms: Dict[str, str] = {}
+    if not occurrences:
+        return extracted_terms
+
+    unique_candidates = list(occurrences)
+    first_order = np.array([occurrences[candidate][0] for candidate in unique_candidates], dtype=np.int64)
+    alive = np.ones(len(unique_candidates), dtype=bool)
+    candidate_lengths = np.array([len(candidate) for candidate in unique_candidates]) / candidate_length_unit
+
+    # 所有候选的出现位置拼接为一个数组，用reduceat按候选求最小位置差
+    position_arrays = [candidate_index.relative_positions(candidate) for candidate in unique_candidates]
+    candidate_positions = np.concatenate(position_arrays)
+    group_starts = np.cumsum([0] + [len(positions) for positions in position_arrays[:-1]])
+
+    for query in queries:
+        if len(query) < min_query_length:
+            continue
+        query_positions = query_index.relative_positions(query)
+        if not len(query_positions):
+            continue
+
+        # 对每个候选出现位置找到最近的查询位置
+        right = np.searchsorted(query_positions, candidate_positions)
+        left = np.clip(right - 1, 0, len(query_positions) - 1)
+        right = np.clip(right, 0, len(query_positions) - 1)
+        distances = np.minimum(
+            np.abs(query_positions[left] - candidate_positions),
+            np.abs(query_positions[right] - candidate_positions)
+        )
+        min_distances = np.minimum.reduceat(distances, group_starts)
+
+        position_scores = np.maximum(0, 1 - min_distances * 2)
+        query_length = len(query) / query_length_unit
+        length_ratios = np.minimum(query_length, candidate_lengths) / np.maximum(query_length, candidate_lengths)
+        scores = position_scores * 0.7 + length_ratios * 0.3
+
+        eligible = alive & (scores > threshold)
+        if not eligible.any():
+            continue
+        best_score = scores[eligible].max()
+        tied = np.flatnonzero(eligible & (scores == best_score))
+        best = tied[np.argmin(first_order[tied])]
+
+        best_match = unique_candidates[best]
+        extracted_terms[query] = best_match
+
+        # 从候选列表中移除一次，避免重复使用
+        remaining = occurrences[best_match]
+        remaining.popleft()
+        if remaining:
+            first_order[best] = remaining[0]
+        else:
+            alive[best] = False
+
+    return extracted_terms
+
+
+def match_nearby_words(words: List[str],
+                       source_text: str,
+                       anchors: List[Tuple[str, int]],
+                       target_length: int,
+                       max_distance: float = 0.2,
+                       min_anchor_length: int = 3) -> Dict[str, str]:
+    """
+    基于相对位置的简单匹配：为每个词找到相对位置差小于max_distance的第一个锚点词
+
+    Args:
+        words: 源文本中的词（按顺序，可含重复）
+        source_text: 源文本
+        anchors: 目标文本中的候选词及其位置，按位置升序
+        target_length: 目标文本长度
+        max_distance: 最大相对位置差
+        min_anchor_length: 锚点词的最小长度
+
+    Returns:
+        术语对照表 {词: 锚点词}
+    """
+    extracted_terms: Dict[str, str] = {}
+    anchors = [(anchor, position / target_length) for anchor, position in anchors if len(anchor) >= min_anchor_length]
+    anchor_positions = [position for _, position in anchors]
+
+    for word in words:
+        if len(word) < 2:
+            continue
+        word_position = source_text.find(word) / len(source_text)
+
+        # 满足条件的锚点在有序位置上是连续的一段，二分查找后向前回退到这段的开头
+        index = bisect_left(anchor_positions, word_position - max_distance)
+        while index > 0 and abs(word_position - anchor_positions[index - 1]) < max_distance:
+            index -= 1
+        while index < len(anchors):
+            anchor, anchor_position = anchors[index]
+            if abs(word_position - anchor_position) < max_distance:
+                extracted_terms[word] = anchor
+                break
+            if anchor_position > word_position:
+                break
+            index += 1
+
+    return extracted_terms
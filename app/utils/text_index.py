@@ -0,0 +1,163 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+
+# 单词与标点分别作为词元，与正则\b\w+\b的单词划分保持一致
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def tokenize_lower(text: str) -> List[str]:
+    """将文本切分为小写词元"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def split_phrase(phrase: str, language: str = "en") -> List[str]:
+    """按索引的粒度切分短语：中文按字符，其他语言按小写词元"""
+    if language == "zh":
+        return list(phrase.lower())
+    return tokenize_lower(phrase)
+
+
+class TranslationIndex:
+    """
+    译文的单次扫描索引
+
+    构建时记录小写词元的位置及长度不超过max_n的n-gram哈希，
+    之后每个术语（以及术语中单个单词的部分匹配）都只需常数次哈希查找。
+    中文等不以空格分词的语言按字符建立n-gram。
+    """
+
+    def __init__(self, text: str, language: str = "en", max_n: int = 1):
+        self.language = language
+        self.max_n = max(1, max_n)
+        self.tokens = split_phrase(text, language)
+
+        # 词元 -> 出现位置列表
+        self.positions: Dict[str, List[int]] = {}
+        for index, token in enumerate(self.tokens):
+            self.positions.setdefault(token, []).append(index)
+
+        # 长度为2..max_n的n-gram哈希（单个词元直接查positions）
+        self._ngram_hashes: Set[int] = set()
+        tokens = self.tokens
+        for n in range(2, self.max_n + 1):
+            for start in range(len(tokens) - n + 1):
+                self._ngram_hashes.add(hash(tuple(tokens[start:start + n])))
+
+    @classmethod
+    def for_terms(cls, text: str, terms: Iterable[str], language: str = "en") -> "TranslationIndex":
+        """
+        按待查术语的最大长度构建索引
+
+        Args:
+            text: 译文
+            terms: 待查的目标语言术语
+            language: 译文语言代码
+
+        Returns:
+            译文索引
+        """
+        max_n = max((len(split_phrase(term, language)) for term in terms), default=1)
+        return cls(text, language, max_n)
+
+    def contains(self, phrase: str) -> bool:
+        """
+        判断短语是否完整出现在译文中（忽略大小写，按词边界匹配）
+
+        Args:
+            phrase: 术语或单词
+
+        Returns:
+            是否出现
+        """
+        return self.contains_parts(split_phrase(phrase, self.language))
+
+    def contains_parts(self, parts: List[str]) -> bool:
+        """
+        判断已切分的词元序列是否完整出现在译文中
+
+        Args:
+            parts: 按split_phrase切分的词元
+
+        Returns:
+            是否出现
+        """
+        if not parts:
+            return False
+        if len(parts) == 1:
+            return parts[0] in self.positions
+        if len(parts) <= self.max_n:
+            return hash(tuple(parts)) in self._ngram_hashes
+        return self._verify(parts)
+
+    def _verify(self, parts: List[str]) -> bool:
+        """超出max_n的短语利用首个词元的位置逐一比对"""
+        tokens = self.tokens
+        length = len(parts)
+        for start in self.positions.get(parts[0], ()):
+            if tokens[start:start + length] == parts:
+                return True
+        return False
+
+    def word_match_ratio(self, phrase: str, min_word_length: int = 0) -> Tuple[int, int]:
+        """
+        统计短语中按空格划分的单词有多少个出现在译文中，用于部分匹配判断
+
+        Args:
+            phrase: 术语
+            min_word_length: 只统计长度大于该值的单词
+
+        Returns:
+            (匹配的单词数, 单词总数)
+        """
+        words = phrase.lower().split()
+        matched = sum(1 for word in words if len(word) > min_word_length and self.contains(word))
+        return matched, len(words)
+
+
+class SegmentedTermIndex:
+    """
+    按句维护的术语命中索引
+
+    只记录给定短语（术语及其中的单词）是否出现在每一句中，整篇的查询结果由各句的命中合并得到，
+    修改一句译文时只需重新检查这一句。查询接口与TranslationIndex一致，
+    未登记的短语一律视为未出现。
+    """
+
+    def __init__(self, phrases: Iterable[str], language: str = "en"):
+        self.language = language
+        self._keys: Set[Tuple[str, ...]] = set()
+        for phrase in phrases:
+            for part in [phrase] + phrase.lower().split():
+                key = tuple(split_phrase(part, language))
+                if key:
+                    self._keys.add(key)
+        self.max_n = max((len(key) for key in self._keys), default=1)
+        self._hits: Set[Tuple[str, ...]] = set()
+
+    def scan(self, sentence: str) -> FrozenSet[Tuple[str, ...]]:
+        """
+        检查登记的短语在一句中的出现情况
+
+        Args:
+            sentence: 句子文本
+
+        Returns:
+            该句中出现的短语
+        """
+        index = TranslationIndex(sentence, self.language, self.max_n)
+        return frozenset(key for key in self._keys if index.contains_parts(list(key)))
+
+    def set_sentence_hits(self, sentence_hits: Iterable[FrozenSet[Tuple[str, ...]]]) -> None:
+        """用各句的命中结果更新整篇的查询结果"""
+        self._hits = set().union(*sentence_hits)
+
+    def contains(self, phrase: str) -> bool:
+        """判断短语是否出现在任意一句中"""
+        return tuple(split_phrase(phrase, self.language)) in self._hits
+
+    def word_match_ratio(self, phrase: str, min_word_length: int = 0) -> Tuple[int, int]:
+        """统计短语中按空格划分的单词有多少个出现在译文中，与TranslationIndex.word_match_ratio一致"""
+        words = phrase.lower().split()
+        matched = sum(1 for word in words if len(word) > min_word_length and self.contains(word))
+        return matched, len(words)
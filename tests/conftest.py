@@ -0,0 +1,28 @@
+import pytest
+
+# 多句中译英样例，包含术语库中的术语（材料科学、纳米材料、复合材料、晶格常数、热导率）
+SOURCE_ZH = (
+    "材料科学研究材料的结构、性质和性能。纳米材料至少有一个维度在1到100纳米之间。"
+    "研究人员制备了一种新型复合材料，并测量了它的晶格常数。\n"
+    "实验结果表明，这种复合材料的热导率明显高于传统材料。该材料被广泛应用于电子器件的散热。"
+)
+TRANSLATION_EN = (
+    "Materials science studies the structure, properties and performance of materials. "
+    "Nanomaterials have at least one dimension between 1 and 100 nanometers. "
+    "The researchers prepared a new composite material and measured its lattice constant.\n"
+    "The results show that the thermal conductivity of this composite is much higher than that of "
+    "conventional materials. The material is widely used for heat dissipation in electronic devices."
+)
+REFERENCES_EN = [
+    "Materials science studies the structure, properties and performance of materials. "
+    "Nanomaterials have at least one dimension in the range of 1 to 100 nanometers. "
+    "Researchers prepared a novel composite material and measured its lattice constant.\n"
+    "Experimental results show that the thermal conductivity of the composite materials is significantly "
+    "higher than that of traditional materials. The material is widely used for heat dissipation of electronic devices."
+]
+
+
+@pytest.fixture
+def zh_en_sample():
+    """多句中译英样例：源文本、译文和参考译文列表"""
+    return SOURCE_ZH, TRANSLATION_EN, list(REFERENCES_EN)
@@ -0,0 +1,44 @@
+import pytest
+
+from app.core.config import settings
+from app.services.evaluation_service import evaluation_service
+from app.services.evaluation_session_service import evaluation_session_service
+
+
+def _full_evaluation(source_text, translated_text, reference_texts, metrics=None):
+    """不使用缓存的整篇评估结果"""
+    return evaluation_service.evaluate_translation(
+        source_text, translated_text, reference_texts, use_cache=False, metrics=metrics
+    ).model_dump()
+
+
+@pytest.mark.parametrize("terminology_mode", ["database", "reference"])
+def test_incremental_scores_match_full_evaluation(monkeypatch, zh_en_sample, terminology_mode):
+    monkeypatch.setattr(settings, "TERMINOLOGY_EVALUATION_MODE", terminology_mode)
+    source_text, translated_text, reference_texts = zh_en_sample
+
+    session = evaluation_session_service.create_session(source_text, translated_text, reference_texts)
+    try:
+        assert session.response.model_dump() == _full_evaluation(source_text, translated_text, reference_texts)
+
+        # 修改一句、删除一句，只有变化的句子重新分析
+        edits = [
+            {"index": 1, "text": "Nanomaterials have at least one dimension in the range of 1 to 100 nanometers."},
+            {"index": 3, "text": ""},
+        ]
+        session = evaluation_session_service.update_session(session.session_id, edits=edits)
+        assert session.last_changed == 1
+        assert session.response.model_dump() == _full_evaluation(source_text, session.text, reference_texts)
+    finally:
+        evaluation_session_service.delete_session(session.session_id)
+
+
+@pytest.mark.parametrize("metrics", [["bleu"], ["terminology", "discourse"], ["sentence_structure"]])
+def test_session_scores_only_selected_metrics(zh_en_sample, metrics):
+    source_text, translated_text, reference_texts = zh_en_sample
+
+    session = evaluation_session_service.create_session(source_text, translated_text, reference_texts, metrics=metrics)
+    try:
+        assert session.response.model_dump() == _full_evaluation(source_text, translated_text, reference_texts, metrics)
+    finally:
+        evaluation_session_service.delete_session(session.session_id)
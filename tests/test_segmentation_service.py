@@ -0,0 +1,23 @@
+import pytest
+
+from app.core.config import settings
+from app.services.segmentation_service import segmentation_service
+from app.utils.nlp_resources import jieba, pseg
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    """让样例文本也走多进程分片路径：每个分片约40字，2个进程"""
+    monkeypatch.setattr(settings, "SEGMENTATION_PARALLEL_MIN_CHARS", 1)
+    monkeypatch.setattr(settings, "SEGMENTATION_SHARD_CHARS", 40)
+    monkeypatch.setattr(settings, "SEGMENTATION_WORKERS", 2)
+    yield
+    segmentation_service.shutdown()
+
+
+def test_sharded_segmentation_equals_single_pass(sharded, zh_en_sample):
+    text = zh_en_sample[0] * 3
+    assert len(segmentation_service.shard(text)) > 1
+
+    assert segmentation_service.tokenize(text) == [(word, (start, end)) for word, start, end in jieba.tokenize(text)]
+    assert segmentation_service.pos_tag(text) == [(pair.word, pair.flag) for pair in pseg.cut(text)]
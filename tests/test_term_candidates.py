@@ -0,0 +1,85 @@
+import re
+
+import pytest
+
+from app.utils.nlp_resources import pseg
+from app.utils.term_candidates import OccurrenceIndex, chinese_noun_phrases, match_term_candidates
+
+
+def _reference_match(queries, query_text, candidates, candidate_text,
+                     query_length_unit, candidate_length_unit, min_query_length, min_candidate_length,
+                     ignore_case=False):
+    """逐个查询、逐个候选比较所有出现位置的参考实现"""
+    candidates = list(candidates)
+    flags = re.IGNORECASE if ignore_case else 0
+    extracted_terms = {}
+    for query in queries:
+        if len(query) < min_query_length:
+            continue
+        query_positions = [m.start() / len(query_text) for m in re.finditer(re.escape(query), query_text, flags)]
+        if not query_positions:
+            continue
+
+        best_match = None
+        max_score = 0
+        for candidate in candidates:
+            if len(candidate) < min_candidate_length:
+                continue
+            candidate_positions = [
+                m.start() / len(candidate_text) for m in re.finditer(re.escape(candidate), candidate_text)
+            ]
+            if not candidate_positions:
+                continue
+            position_score = max(
+                max(0, 1 - abs(query_position - candidate_position) * 2)
+                for query_position in query_positions for candidate_position in candidate_positions
+            )
+            query_length = len(query) / query_length_unit
+            candidate_length = len(candidate) / candidate_length_unit
+            length_ratio = min(query_length, candidate_length) / max(query_length, candidate_length)
+            score = position_score * 0.7 + length_ratio * 0.3
+            if score > max_score and score > 0.5:
+                max_score = score
+                best_match = candidate
+
+        if best_match:
+            extracted_terms[query] = best_match
+            candidates.remove(best_match)
+    return extracted_terms
+
+
+def _chinese_candidates(text):
+    nouns = chinese_noun_phrases((pair.word, pair.flag) for pair in pseg.cut(text))
+    seen_nouns = set(nouns)
+    nouns.extend(noun for noun in re.findall(r"[\u4e00-\u9fa5]{2,5}", text) if noun not in seen_nouns)
+    nouns.sort(key=len, reverse=True)
+    return nouns
+
+
+def _english_candidates(text):
+    return (re.findall(r"\b[A-Z][a-z]*(?:\s+[a-z]+){0,3}\b", text)
+            + re.findall(r"\b\w+(?:-\w+)+\b", text)
+            + re.findall(r"\b[a-z]+(?:ics|ity|tion|sion|ment|logy|graphy|meter)\b", text, re.IGNORECASE))
+
+
+@pytest.mark.parametrize("direction", ["zh-en", "en-zh"])
+def test_vectorized_matching_equals_reference_loop(zh_en_sample, direction):
+    source_text, _, reference_texts = zh_en_sample
+    if direction == "zh-en":
+        query_text, candidate_text = source_text, reference_texts[0]
+        queries, candidates = _chinese_candidates(query_text), _english_candidates(candidate_text)
+        units, ignore_case = (2, 2, 2, 3), False
+    else:
+        query_text, candidate_text = reference_texts[0], source_text
+        queries = sorted(dict.fromkeys(_english_candidates(query_text)), key=len, reverse=True)
+        candidates = _chinese_candidates(candidate_text)
+        units, ignore_case = (3, 2, 3, 2), True
+
+    fast = match_term_candidates(
+        queries, OccurrenceIndex(query_text, queries, ignore_case=ignore_case),
+        candidates, OccurrenceIndex(candidate_text, candidates),
+        *units
+    )
+    expected = _reference_match(queries, query_text, candidates, candidate_text, *units, ignore_case=ignore_case)
+    assert fast
+    assert fast == expected